@@ -1,7 +1,9 @@
 from .singleton import Singleton
 from .ping_port import ping
 from .config import *
-from ._logging import getLogger, LoggingHandler, getLevel, stopwatch
+from ._logging import getLogger, LoggingHandler, getLevel, stopwatch, reload_logging, forward_logs, receive_logs
+from .startup_profiler import StartupProfiler, StartupStep
+from .debounce import DebouncedFlush
 from .bash import Bash
 from .bot import Inu, BotResponseError # needs `Bash`
 from .db import Table, Database  # needs `Inu`
@@ -0,0 +1,247 @@
+"""
+Background writer for `LoggingHandler`.
+
+Records are put into a bounded queue on the calling thread (usually the event loop)
+and formatted and written in batches by a daemon thread.
+"""
+from typing import *
+from collections import deque
+from datetime import datetime
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+
+__all__: Final[List[str]] = ["LogWriter", "RotatingLogFile", "ForwardingLogWriter", "LogReceiver"]
+
+
+class RotatingLogFile:
+    """
+    A log file which stays open and is rotated when it's bigger than <max_bytes>
+    or when the day changed (<rotate_daily>). Rotated files are called `<path>.1` to `<path>.<backups>`
+    """
+    def __init__(self, path: str, max_bytes: int = 0, rotate_daily: bool = False, backups: int = 5) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.backups = backups
+        self._file: Optional[TextIO] = None
+        self._size = 0
+        self._day = datetime.now().date()
+
+    def _open(self) -> TextIO:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._size = self._file.tell()
+        return self._file
+
+    def _should_rotate(self, upcoming: int) -> bool:
+        if self.max_bytes and self._size and self._size + upcoming > self.max_bytes:
+            return True
+        return self.rotate_daily and datetime.now().date() != self._day
+
+    def _rotate(self) -> None:
+        self.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups and os.path.exists(self.path):
+            os.replace(self.path, f"{self.path}.1")
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self._day = datetime.now().date()
+
+    def write(self, text: str) -> None:
+        if self._should_rotate(len(text)):
+            self._rotate()
+        f = self._open()
+        f.write(text)
+        f.flush()
+        self._size += len(text.encode("utf-8"))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LogWriter:
+    """
+    Queue based log output.
+
+    - `put` only appends the record to a bounded deque; formatting and I/O happen in a daemon thread
+    - records are only formatted for the outputs (console, file) which want their level
+    - when the queue is full, the oldest records are dropped (`overflow="drop_oldest"`);
+      with `overflow="sample"` only every <sample_rate>th record below WARNING is kept
+      while the queue is more than half full
+    - dropped records are counted and reported in the output
+    """
+    FLUSH_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        format_console: Callable[[logging.LogRecord], str],
+        format_file: Callable[[logging.LogRecord], str],
+        log_file: Optional[RotatingLogFile],
+        console_level: int = 0,
+        file_level: int = 0,
+        queue_size: int = 10_000,
+        overflow: str = "drop_oldest",
+        sample_rate: int = 10,
+    ) -> None:
+        self.format_console = format_console
+        self.format_file = format_file
+        self.log_file = log_file
+        self.console_level = console_level
+        self.file_level = file_level if log_file else sys.maxsize
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.sample_rate = max(sample_rate, 1)
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._sampled = 0
+        # deque.append and popleft are thread safe; maxlen drops the oldest record
+        self._queue: Deque[logging.LogRecord] = deque(maxlen=queue_size)
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @property
+    def min_level(self) -> int:
+        """the lowest level any output wants"""
+        return min(self.console_level, self.file_level)
+
+    def put(self, record: logging.LogRecord) -> None:
+        if record.levelno < self.min_level:
+            return
+        queued = len(self._queue)
+        if (
+            self.overflow == "sample"
+            and record.levelno < logging.WARNING
+            and queued > self.queue_size // 2
+        ):
+            self._sampled += 1
+            if self._sampled % self.sample_rate:
+                self.dropped += 1
+                return
+        if queued >= self.queue_size:
+            self.dropped += 1
+        self._queue.append(record)
+        if queued >= self.queue_size // 4:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wakeup.wait(self.FLUSH_INTERVAL)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """formats and writes all queued records"""
+        console: List[str] = []
+        file: List[str] = []
+        while True:
+            try:
+                record = self._queue.popleft()
+            except IndexError:
+                break
+            try:
+                if record.levelno >= self.console_level:
+                    console.append(self.format_console(record))
+                if record.levelno >= self.file_level:
+                    file.append(self.format_file(record))
+            except Exception:
+                # never let a broken record stop the writer
+                console.append(f"log record of {record.name} can't be formatted: {record.msg!r}")
+        if self.dropped != self._reported_dropped:
+            note = f"WARN  dropped {self.dropped - self._reported_dropped} log records (queue full)"
+            self._reported_dropped = self.dropped
+            console.append(note)
+            file.append(note)
+        if console:
+            try:
+                sys.stdout.write("\n".join(console) + "\n")
+                sys.stdout.flush()
+            except Exception:
+                pass
+        if file and self.log_file:
+            try:
+                self.log_file.write("\n".join(file) + "\n")
+            except Exception:
+                pass
+
+    def stop(self) -> None:
+        """writes the remaining records and stops the thread"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join(timeout=2)
+        self.flush()
+        if self.log_file:
+            self.log_file.close()
+
+
+class ForwardingLogWriter:
+    """
+    Log output of a worker process.
+
+    `put` sends the record through <queue> to the main process, where a `LogReceiver`
+    passes it to the `LogWriter`; hence only the main process writes and rotates the log file.
+    `multiprocessing.Queue` sends records right away and flushes them when the process exits.
+    """
+    def __init__(self, queue: Any, min_level: int = 0) -> None:
+        self.queue = queue
+        self.min_level = min_level
+
+    def put(self, record: logging.LogRecord) -> None:
+        if record.levelno < self.min_level:
+            return
+        # tracebacks and arguments can't be pickled
+        try:
+            record.msg = record.getMessage()
+        except Exception:
+            record.msg = str(record.msg)
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        try:
+            self.queue.put_nowait(record)
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        pass
+
+
+class LogReceiver:
+    """
+    Passes the records, which worker processes send through <queue> (see `ForwardingLogWriter`),
+    to <writer>. Runs in a daemon thread until `stop` is called
+    """
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, queue: Any, writer: LogWriter) -> None:
+        self.queue = queue
+        self.writer = writer
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="log-receiver", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            try:
+                record = self.queue.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            self.writer.put(record)
+
+    def stop(self) -> None:
+        self._stopped = True
@@ -15,6 +15,7 @@ OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 """
 # edited
 from typing import *
+import atexit
 import logging
 import os
 import inspect
@@ -26,6 +27,7 @@ import asyncio
 
 from colorama import init, Fore, Style
 from . import ConfigProxy, ConfigType
+from ._log_writer import LogWriter, RotatingLogFile, ForwardingLogWriter, LogReceiver
 import colorlog
 
 
@@ -98,6 +100,118 @@ aliases = [
     ("core.db.DB", "DB"), ("db", "DB"), ("rest", "REST")
 ]
 
+def _module_name(record: logging.LogRecord) -> str:
+    module = record.name
+    for alias in aliases:
+        module = module.replace(*alias)
+    return module
+
+
+def _level_name(record: logging.LogRecord) -> str:
+    return record.levelname.replace("WARNING", "WARN").replace("CRITICAL", "CRIT")
+
+
+def _message(record: logging.LogRecord) -> str:
+    try:
+        return record.msg % record.args
+    except Exception:
+        return record.msg
+
+
+def _time_stamp(record: logging.LogRecord) -> str:
+    # date formatting like this:
+    # Oct 22 13:46:27:90
+    return (datetime.fromtimestamp(record.created).strftime("%b %d %H:%M:%S:%f"))[:-7]
+
+
+def _get_color(name: str) -> str:
+    """get color for the module name"""
+    if name in color_patterns_cache:
+        return color_patterns_cache[name]
+    for nm, color in color_patterns.items():
+        if name.startswith(nm):
+            color_patterns_cache[name] = color
+            return color
+    return color_patterns[""]
+
+
+def format_console(record: logging.LogRecord) -> str:
+    module = _module_name(record)
+    level_name = _level_name(record)
+    return (
+        f"{level_color[level_name]}{level_style[level_name]}{level_name:<6}{Style.RESET_ALL}"
+        f"{_get_color('datetime')}{_time_stamp(record):<8}{Style.RESET_ALL}: "
+        f"{Style.BRIGHT}{_get_color(module)}{module[:12]:<12}{Style.RESET_ALL} "
+        f"» "
+        f"{msg_colors[level_name]}{_message(record)}{Style.RESET_ALL}"
+    )
+
+
+def format_file(record: logging.LogRecord) -> str:
+    module = _module_name(record)
+    return f"{_level_name(record):<6}{_time_stamp(record):<8}: {module[:12]:<12}| {str(_message(record))}"
+
+
+def _log_output_options() -> Dict[str, Any]:
+    try:
+        return config.log_output.options
+    except AttributeError:
+        return {}
+
+
+def _output_level(options: Dict[str, Any], key: str) -> int:
+    value = logging.getLevelName(str(options.get(key, "TRACE")).upper())
+    return value if isinstance(value, int) else 0
+
+
+def _create_writer() -> LogWriter:
+    """
+    Config (optional section `log_output`):
+    --------------------------------------
+        - console_level / file_level: lowest level written to the console / `inu/inu.log`
+        - queue_size: records which are buffered before the oldest ones are dropped
+        - overflow: `drop_oldest` or `sample` (keep every <sample_rate>th record below WARNING under load)
+        - max_bytes: size after which the log file is rotated; 0 to disable
+        - rotate_daily: whether the log file is rotated every day
+        - backups: amount of rotated log files to keep
+    """
+    options = _log_output_options()
+    return LogWriter(
+        format_console=format_console,
+        format_file=format_file,
+        log_file=RotatingLogFile(
+            f"{os.getcwd()}/inu/inu.log",
+            max_bytes=int(options.get("max_bytes", 0)),
+            rotate_daily=bool(options.get("rotate_daily", False)),
+            backups=int(options.get("backups", 5)),
+        ),
+        console_level=_output_level(options, "console_level"),
+        file_level=_output_level(options, "file_level"),
+        queue_size=int(options.get("queue_size", 10_000)),
+        overflow=str(options.get("overflow", "drop_oldest")),
+        sample_rate=int(options.get("sample_rate", 10)),
+    )
+
+
+log_writer = _create_writer()
+
+
+def forward_logs(queue: Any) -> None:
+    """
+    Used in worker processes (e.g. render workers): records are sent through <queue>
+    to the main process, which writes them with its writer (see `receive_logs`).
+    A forked worker inherits the queue of the writer, but not its thread, hence it can't write itself
+    """
+    global log_writer
+    atexit.unregister(log_writer.stop)
+    log_writer = ForwardingLogWriter(queue, log_writer.min_level)  # type: ignore
+
+
+def receive_logs(queue: Any) -> LogReceiver:
+    """writes the records, which worker processes send through <queue> with `forward_logs`"""
+    return LogReceiver(queue, log_writer)
+
+
 class LoggingHandler(logging.Logger):
     def trace(self, message: str):
         self.log(5, message)
@@ -118,6 +232,8 @@ class LoggingHandler(logging.Logger):
         self._pre_log(logging.CRITICAL, message, multiline=multiline, prefix=prefix, **kwargs)
 
     def _pre_log(self, level: int, message: str, prefix: str = "", multiline: bool = False, **kwargs):
+        if level < log_writer.min_level or not self.isEnabledFor(level):
+            return
         if multiline:
             for line in message.splitlines():
                 self.log(level=level, msg=f"{self._convert_prefix(prefix)}{line}")
@@ -129,39 +245,13 @@ class LoggingHandler(logging.Logger):
     def handle(self, record: logging.LogRecord) -> None:
         # if record.msg in ignored.get(record.name, ()):
         #     return
-        module = record.name
-        for alias in aliases:
-            module = module.replace(*alias)
-        #level = record.levelno  # noqa F841
-        level_name = record.levelname.replace("WARNING", "WARN").replace("CRITICAL", "CRIT")
-        try:
-            message = record.msg % record.args
-        except Exception:
-            message = record.msg
-        date = datetime.now()
-        # date formatting like this:
-        # Oct 22 13:46:27:90
-        time_stamp = (date.strftime("%b %d %H:%M:%S:%f"))[:-7]
-        print(f"{level_color[level_name]}{level_style[level_name]}{level_name:<6}{Style.RESET_ALL}"
-              f"{self._get_color('datetime')}{time_stamp:<8}{Style.RESET_ALL}: "
-              f"{Style.BRIGHT}{self._get_color(module)}{module[:12]:<12}{Style.RESET_ALL} "
-              f"» "
-              f"{msg_colors[level_name]}{message}{Style.RESET_ALL}")
-
-        with open(f"{os.getcwd()}/inu/inu.log", "a", encoding="utf-8") as log_file:
-            log_entry = f"{level_name:<6}{time_stamp:<8}: {module[:12]:<12}| {str(message)}\n"
-            log_file.write(log_entry)
+        # formatted and written by the writer thread
+        log_writer.put(record)
 
     # noinspection PyMethodMayBeStatic
     def _get_color(self, name: str) -> str:
         """get color for the module name"""
-        if name in color_patterns_cache:
-            return color_patterns_cache[name]
-        for nm, color in color_patterns.items():
-            if name.startswith(nm):
-                color_patterns_cache[name] = color
-                return color
-        return color_patterns[""]
+        return _get_color(name)
 
 def stopwatch(
     note: Optional[str | Callable[[], str]] = None, 
@@ -220,7 +310,13 @@ def stopwatch(
             
 
 
-logs = set()
+# resolved loggers and levels; only invalidated when the config is reloaded
+_loggers: Dict[str, LoggingHandler] = {}
+_levels: Dict[Tuple[str, bool, bool], Union[str, int]] = {}
+# logger name -> the level which was set from the config; loggers with another level were set by hand
+_config_levels: Dict[str, int] = {}
+
+
 def getLogger(*names) -> LoggingHandler:
     """
     returns the logger and the level from the corresponding config.ini file
@@ -230,18 +326,36 @@ def getLogger(*names) -> LoggingHandler:
         - func over class
         - class over file
         - file over global
+
+    Note:
+    -----
+        - loggers are cached by name; their level is only resolved again by `reload_logging`,
+          unless it was changed with `setLevel`
     """
     name = f"{'.'.join(names)}"
+    log = _loggers.get(name)
+    if log is not None:
+        return log
     logging.setLoggerClass(LoggingHandler)
-    log = logging.getLogger(name)
+    log = logging.getLogger(name)  # type: ignore
     level = getLevel(list(name.split(".")))
     log.setLevel(level)
-    if name not in logs:
-        logs.add(name)
-        main_log.debug(f"set level for {name} to {level}")
+    _loggers[name] = log
+    _config_levels[name] = log.level
+    main_log.debug(f"set level for {name} to {level}")
     return log
 
+
 def getLevel(name_s: Union[List, str], log4file: bool = False):
+    is_list = isinstance(name_s, list)
+    key = (".".join(name_s) if is_list else name_s, is_list, log4file)
+    level = _levels.get(key)  # type: ignore
+    if level is None:
+        level = _levels[key] = _resolve_level(name_s, log4file)  # type: ignore
+    return level
+
+
+def _resolve_level(name_s: Union[List, str], log4file: bool = False):
     # to implement:
     # level will be min(logging, file_logging)
     # recheck logging level in Logger.handle()
@@ -263,6 +377,30 @@ def getLevel(name_s: Union[List, str], log4file: bool = False):
         level = logging_section.GLOBAL
     return level
 
+
+@config.on_reload
+def _apply_levels(_: ConfigProxy) -> None:
+    _levels.clear()
+    for name, log in _loggers.items():
+        if log.level != _config_levels.get(name):
+            # set by hand, e.g. `main_log.setLevel("INFO")`
+            continue
+        log.setLevel(getLevel(list(name.split("."))))
+        _config_levels[name] = log.level
+    options = _log_output_options()
+    log_writer.console_level = _output_level(options, "console_level")
+    if log_writer.log_file:
+        log_writer.file_level = _output_level(options, "file_level")
+
+
+def reload_logging() -> None:
+    """
+    Reads the config again and applies the levels of the `logging` and `log_output`
+    sections to all loggers created with `getLogger` at once
+    """
+    config.reload()
+    main_log.info(f"reloaded levels of {len(_loggers)} loggers")
+
 colorlog.getLogger = getLogger
 log = colorlog.getLogger("colorlog")
 log.setLevel("INFO")
@@ -1,12 +1,184 @@
 import asyncio
 from typing import *
 import traceback
+import random
+import re
 
 from ._logging import getLogger
+from .config import ConfigProxy, ConfigType
 log = getLogger(__name__)
+# messages of qalc, which are written to stderr
+ERROR_LINE = re.compile(r"^\s*(error|warning):", re.IGNORECASE)
+# interactive qalc treats lines starting with these words as commands, which change the
+# state of the process (base, precision, definitions, ...) or write to disk
+QALC_COMMANDS: Final[FrozenSet[str]] = frozenset({
+    "approximate", "assume", "base", "clear", "convert", "copy", "delete", "exact", "exit",
+    "exrates", "expand", "factor", "find", "function", "help", "info", "keep", "list", "mc",
+    "mode", "mr", "ms", "m+", "m-", "partial", "pop", "quit", "rcl", "rotate", "rpn", "save",
+    "set", "stack", "store", "swap", "to", "unkeep", "unset", "variable",
+})
+QALC_COMMAND = re.compile(r"^\s*/?(?P<word>[a-z]+[+-]?)(\s|$)", re.IGNORECASE)
+# definitions (`x := 5`) and functions which store, load or execute something
+QALC_SIDE_EFFECT = re.compile(r":=|\b(save|load|export|command)\s*\(", re.IGNORECASE)
+
+
+def check_qalc_query(query: str) -> None:
+    """
+    Raises:
+    -------
+    ValueError:
+        if <query> is not a plain expression, but a qalc command or a definition
+    """
+    if (match := QALC_COMMAND.match(query)) and match.group("word").lower() in QALC_COMMANDS:
+        raise ValueError(f"`{match.group('word')}` is a qalc command - only expressions can be calculated")
+    if QALC_SIDE_EFFECT.search(query):
+        raise ValueError("definitions and `save`, `load`, `export` or `command` can't be used")
+
+
+class QalcWorker:
+    """
+    A long living `qalc` process in interactive mode.
+
+    Every request is written to stdin followed by a random number (the sentinel).
+    Everything qalc prints until the sentinel is echoed back is the result.
+    stderr is merged into stdout, so that errors are part of the output of their request;
+    lines starting with `error:` or `warning:` are returned as stderr.
+    """
+    def __init__(self, args: Sequence[str] = ()):
+        self.args = list(args)
+        self.proc: asyncio.subprocess.Process | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def start(self) -> None:
+        self.proc = await asyncio.create_subprocess_exec(
+            "qalc", *self.args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+
+    def kill(self) -> None:
+        if self.alive:
+            self.proc.kill()  # type: ignore
+        self.proc = None
+
+    async def restart(self) -> None:
+        self.kill()
+        await self.start()
+
+    @staticmethod
+    def _normalize(line: str) -> str:
+        # qalc may group digits of bigger numbers
+        return re.sub(r"[^0-9]", "", line)
+
+    async def calculate(self, query: str) -> Tuple[str, str]:
+        """
+        Returns:
+        --------
+        Tuple[str, str]
+            stdout and stderr of the calculation
+        """
+        if not self.alive:
+            await self.start()
+        assert self.proc and self.proc.stdin and self.proc.stdout
+        sentinel = str(random.randint(10**11, 10**12 - 1))
+        # one request has to be one line
+        query = " ".join(query.splitlines())
+        self.proc.stdin.write(f"{query}\n{sentinel}\n".encode("utf-8"))
+        await self.proc.stdin.drain()
+        lines: List[str] = []
+        errors: List[str] = []
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                raise RuntimeError("qalc exited")
+            decoded = line.decode("utf-8").rstrip("\n")
+            if self._normalize(decoded) == sentinel:
+                break
+            # prompt, in case qalc thinks it runs in a terminal
+            if decoded.startswith("> "):
+                decoded = decoded[2:]
+            if ERROR_LINE.match(decoded):
+                errors.append(f"{decoded}\n")
+            elif decoded.strip():
+                lines.append(decoded)
+        return "\n".join(lines) + "\n", "".join(errors)
+
+
+class QalcPool:
+    """
+    Pool of `QalcWorker`s, so that the startup (and currency loading)
+    of qalc isn't paid for every calculation.
+
+    Note:
+    -----
+        - the amount of workers is also the maximum of concurrent calculations
+        - workers which time out or crash are restarted
+    """
+    def __init__(self, size: int, timeout: float):
+        self.size = size
+        self.timeout = timeout
+        self._workers: List[QalcWorker] = [QalcWorker() for _ in range(size)]
+        self._idle: asyncio.Queue[QalcWorker] = asyncio.Queue()
+        for worker in self._workers:
+            self._idle.put_nowait(worker)
+
+    async def calculate(self, query: str) -> Tuple[str, str]:
+        """
+        Raises:
+        -------
+        ValueError:
+            if <query> is not a plain expression (see `check_qalc_query`) or took too long
+        """
+        # workers are shared, hence nothing may change their state
+        check_qalc_query(query)
+        worker = await self._idle.get()
+        try:
+            return await asyncio.wait_for(worker.calculate(query), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            log.warning(f"qalc took longer than {self.timeout}s for `{query}` - restarting worker")
+            worker.kill()
+            raise ValueError(f"calculation took longer than {self.timeout} seconds")
+        except Exception:
+            log.error(f"qalc worker failed - restarting it:\n{traceback.format_exc()}")
+            worker.kill()
+            raise
+        finally:
+            self._idle.put_nowait(worker)
+
+    async def restart(self) -> None:
+        """
+        restarts every worker one after another, so that they load updated definitions.
+        Calculations can still be made in the meantime
+        """
+        for _ in range(self.size):
+            worker = await self._idle.get()
+            try:
+                await worker.restart()
+            except Exception:
+                log.error(f"failed to restart qalc worker:\n{traceback.format_exc()}")
+                worker.kill()
+            finally:
+                self._idle.put_nowait(worker)
 
 
 class Bash:
+    _qalc_pool: QalcPool | None = None
+
+    @classmethod
+    def qalc_pool(cls) -> QalcPool:
+        """the pool for `qalc` calls without extra arguments"""
+        if cls._qalc_pool is None:
+            commands = ConfigProxy(ConfigType.YAML).commands
+            cls._qalc_pool = QalcPool(
+                size=int(commands.get("qalc_workers", 3)),
+                timeout=float(commands.get("qalc_timeout", 10)),
+            )
+        return cls._qalc_pool
+
     @classmethod
     async def execute(cls, query: List[str]) -> Tuple[str, str]:
         """
@@ -47,7 +219,19 @@ class Bash:
         -------
         ValueError: 
             If the query could not be calculated (error contains stderr)
+            or if it's a qalc command instead of an expression
+
+        Note:
+        -----
+            - calls without <base> and <terse> use the worker pool,
+              others start their own qalc process
         """
+        check_qalc_query(query)
+        if not base and not terse:
+            out, err = await cls.qalc_pool().calculate(query)
+            if err:
+                raise ValueError(err)
+            return out
         args = ["qalc"]
         #args.append(f"--base={base}")
         if base:
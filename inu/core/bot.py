@@ -9,7 +9,6 @@ import traceback
 import typing
 from typing import *
 import logging
-from asyncpraw.config import Config
 from hikari.events.interaction_events import InteractionCreateEvent
 from hikari.interactions.component_interactions import ComponentInteraction
 from hikari import GatewayBot, ModalInteraction
@@ -25,15 +24,14 @@ from dotenv import dotenv_values
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from colorama import Fore, Style
-from matplotlib.colors import cnames
 import miru
 import miru.client
-from numpy import mod, tri
 import tabulate
 
 from .singleton import Singleton
 
 from ._logging import LoggingHandler, getLogger, getLevel 
+from .startup_profiler import StartupProfiler
 from . import ConfigProxy, ConfigType
 from . import Bash
 
@@ -190,6 +188,7 @@ class Inu(hikari.GatewayBot):
         """
         `self.conf.bot.color` as hikari.Color
         """
+        from matplotlib.colors import cnames  # imported on first use
         color = self.conf.bot.color
         hex_ = cnames.get(str(color), None)
         if not isinstance(hex_, str):
@@ -225,26 +224,36 @@ class Inu(hikari.GatewayBot):
             return False
 
         
-        modules: Dict[str, bool] = defaultdict(lambda: True)
-        for extension in os.listdir(os.path.join(os.getcwd(), folder_path)):
+        # extension -> [loaded, import time, load time]
+        modules: Dict[str, List[Any]] = {}
+        for extension in sorted(os.listdir(os.path.join(os.getcwd(), folder_path))):
             if (
                 extension == "__init__.py" 
                 or not extension.endswith(".py")
                 or extension.startswith("_")
             ):
                 continue
+            trimmed_name = f"{folder_path.replace('/', '.')[4:]}{extension[:-3]}"
+            if not is_allowed(trimmed_name):
+                modules[trimmed_name] = [False, "", ""]
+                continue
+            imported = loaded = None
             try:
-                trimmed_name = f"{folder_path.replace('/', '.')[4:]}{extension[:-3]}"
-                modules[trimmed_name]
-                if not is_allowed(trimmed_name):
-                    modules[trimmed_name] = False
-                    continue
-                module = importlib.import_module(trimmed_name)
-                await self.client.load_extensions(trimmed_name)
-
+                with StartupProfiler.measure("import", trimmed_name) as imported:
+                    importlib.import_module(trimmed_name)
+                with StartupProfiler.measure("load", trimmed_name) as loaded:
+                    await self.client.load_extensions(trimmed_name)
             except Exception:
                 self.log.critical(f"can't load {extension}\n{traceback.format_exc()}", exc_info=True)
-        table = tabulate.tabulate(modules.items(), headers=["Extension", "Loaded"])
+            modules[trimmed_name] = [
+                bool(loaded and loaded.ok),
+                f"{imported.ms:.0f} ms" if imported else "",
+                f"{loaded.ms:.0f} ms" if loaded else "",
+            ]
+        table = tabulate.tabulate(
+            [[name, *row] for name, row in modules.items()], 
+            headers=["Extension", "Loaded", "Import", "Load"]
+        )
         self.log.info(table, multiline=True, prefix="init")
 
 
@@ -84,8 +84,28 @@ class ConfigProxy(metaclass=Singleton):
     ):
         if config_type is None:
             raise RuntimeError("config_type cannot be None when initialized first time")
+        self._config_type = config_type
+        self._path = path
+        self._reload_callbacks: List[Callable[["ConfigProxy"], None]] = []
         self.sections, self._config = config_type(path)  #type: ignore
 
+    def reload(self) -> None:
+        """
+        Reads the config file again and calls all callbacks registered with `on_reload`
+
+        Note:
+        -----
+            - sections which were fetched before stay unchanged; fetch them again after reloading
+        """
+        self.sections, self._config = self._config_type(self._path)  #type: ignore
+        for callback in self._reload_callbacks:
+            callback(self)
+
+    def on_reload(self, callback: Callable[["ConfigProxy"], None]) -> Callable[["ConfigProxy"], None]:
+        """registers <callback> to be called with the config after every `reload`"""
+        self._reload_callbacks.append(callback)
+        return callback
+
     def __getattr__(self, name: str) -> str:
         name = name.lower()
         sections = [s for s in self.sections if s.name == name]
@@ -2,10 +2,13 @@ import asyncio
 import os
 import typing
 from typing import *
-from functools import wraps, update_wrapper
+from functools import wraps, update_wrapper, lru_cache
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 import traceback
 from datetime import datetime, timedelta
 import re
+import time
 from collections import OrderedDict
 
 import aiofiles
@@ -14,6 +17,7 @@ import pandas as pd
 
 from core import Inu
 from . import Singleton, ConfigProxy, ConfigType
+from .db_metrics import QueryMetrics, QuerySnapshot, count_rows
 if TYPE_CHECKING:
 
     from lightbulb import Bot
@@ -27,6 +31,11 @@ conf = ConfigProxy(ConfigType.YAML)
 table_logging = conf.db.SQL_logging
 log.info(f"DB table DEBUG logging: {table_logging}")
 db_calls: Dict[datetime, int] = {}
+# hourly counters older than this are dropped
+DB_CALLS_RETENTION = timedelta(days=31)
+MIGRATION_DIR = os.path.join(os.getcwd(), "inu/data/bot/sql/migrations")
+MIGRATION_PATTERN = re.compile(r"^(?P<version>\d+)_(?P<name>\w+)\.sql$")
+MIGRATION_LOCK_ID = 0x696E75  # "inu"
 
 def add_call():
     now = datetime.now()
@@ -35,8 +44,53 @@ def add_call():
         db_calls[time] += 1
     except KeyError:
         db_calls[time] = 1
+        for old in [t for t in db_calls if t < time - DB_CALLS_RETENTION]:
+            del db_calls[old]
+
+
+def _query_label(func: Callable[..., Any], args: Sequence[Any]) -> str:
+    """the query of a `Database` call, used as key for `QueryMetrics`"""
+    if func.__name__ == "execute_script":
+        return f"script {os.path.basename(args[0])}"
+    if args and isinstance(args[0], str):
+        return args[0]
+    return func.__name__
+
+
+# connection and task of the current `Database.unit_of_work`
+_unit_of_work: ContextVar[Optional[Tuple[asyncpg.Connection, Optional[asyncio.Task]]]] = ContextVar(
+    "_unit_of_work", default=None
+)
+
+
+def _unit_of_work_connection() -> Optional[asyncpg.Connection]:
+    """
+    the connection of the unit of work, in which the current task runs.
+    Tasks created inside a unit of work inherit the context, but must not use its connection
+    """
+    unit = _unit_of_work.get()
+    if unit is None or unit[1] is not asyncio.current_task():
+        return None
+    return unit[0]
+
+
+def acquire(func: Optional[Callable[..., Any]] = None, *, transaction: bool = False) -> Callable[..., Any]:
+    """
+    Passes a pool connection as `_cxn` to the decorated `Database` method.
+
+    Args:
+    -----
+    transaction : bool
+        whether to wrap the call into a transaction. Not needed for single statements,
+        since Postgres runs them atomically anyway; it only costs a BEGIN/COMMIT round trip
+
+    Note:
+    -----
+        - inside `Database.unit_of_work` the connection of the unit of work is used
+    """
+    if func is None:
+        return lambda f: acquire(f, transaction=transaction)
 
-def acquire(func: Callable[..., Any]) -> Callable[..., Any]:
     @wraps(func)
     async def wrapper(self: "Database", *args: Any, **kwargs: Any) -> Any:
         add_call()
@@ -46,9 +100,32 @@ def acquire(func: Callable[..., Any]) -> Callable[..., Any]:
         assert self.is_connected, "Not connected."
         self.calls += 1
         cxn: asyncpg.Connection
-        async with self._pool.acquire() as cxn:
-            async with cxn.transaction():
-                return await func(self, *args, _cxn=cxn, **kwargs)
+        start = time.perf_counter()
+        acquire_ms = 0.0
+        result = None
+        error = True
+        try:
+            if (cxn := _unit_of_work_connection()) is not None:
+                # already in the transaction of the unit of work
+                result = await func(self, *args, _cxn=cxn, **kwargs)
+            else:
+                async with self._pool.acquire() as cxn:
+                    acquire_ms = (time.perf_counter() - start) * 1000
+                    if transaction:
+                        async with cxn.transaction():
+                            result = await func(self, *args, _cxn=cxn, **kwargs)
+                    else:
+                        result = await func(self, *args, _cxn=cxn, **kwargs)
+            error = False
+            return result
+        finally:
+            QueryMetrics.record(
+                _query_label(func, args),
+                latency_ms=(time.perf_counter() - start) * 1000 - acquire_ms,
+                acquire_ms=acquire_ms,
+                rows=len(args[1]) if func.__name__ == "execute_many" and not error else count_rows(result),
+                error=error,
+            )
 
     return wrapper
 
@@ -123,17 +200,111 @@ class Database(metaclass=Singleton):
         self.log.info("Closed database connection.")
 
     async def sync(self) -> None:
+        """
+        Creates the base schema (`script.sql`) and applies pending migrations.
+        """
         await self.execute_script(os.path.join(os.getcwd(), "inu/data/bot/sql/script.sql"), self.bot.conf.bot.DEFAULT_PREFIX)
-
+        await self.migrate()
 
         self.log.info("Synchronised database.", prefix="init")
 
+    @staticmethod
+    def _migration_files(directory: str = MIGRATION_DIR) -> List[Tuple[int, str, str]]:
+        """
+        Returns:
+        --------
+            - (List[Tuple[int, str, str]]) version, name and path of every
+              `<version>_<name>.sql` file in <directory>, sorted by version
+        """
+        migrations = []
+        if not os.path.isdir(directory):
+            return migrations
+        for file in os.listdir(directory):
+            match = MIGRATION_PATTERN.match(file)
+            if not match:
+                continue
+            migrations.append((int(match.group("version")), match.group("name"), os.path.join(directory, file)))
+        return sorted(migrations)
+
+    async def migrate(self, directory: str = MIGRATION_DIR) -> List[int]:
+        """
+        Applies all migrations of <directory>, which are not yet recorded in `schema_migrations`.
+        Every migration runs in its own transaction.
+
+        Returns:
+        --------
+            - (List[int]) the versions which were applied
+        """
+        applied: List[int] = []
+        async with self._pool.acquire() as cxn:
+            # prevent other instances from migrating at the same time
+            await cxn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+            try:
+                await cxn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_migrations (
+                        "version" INT NOT NULL PRIMARY KEY,
+                        "name" TEXT NOT NULL,
+                        applied_on TIMESTAMP NOT NULL DEFAULT NOW()
+                    )
+                    """
+                )
+                done = {r["version"] for r in await cxn.fetch("SELECT version FROM schema_migrations")}
+                for version, name, path in self._migration_files(directory):
+                    if version in done:
+                        continue
+                    async with aiofiles.open(path, "r") as f:
+                        script = await f.read()
+                    async with cxn.transaction():
+                        await cxn.execute(script)
+                        await cxn.execute(
+                            "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                            version, name
+                        )
+                    applied.append(version)
+                    self.log.info(f"Applied migration {version:04d} ({name})", prefix="init")
+            finally:
+                await cxn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+        return applied
+
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator["Database"]:
+        """
+        Pins one connection and runs all `Database` and `Table` calls of the current task
+        in one transaction. The transaction is rolled back, if an exception is raised.
+
+        Example:
+        --------
+        ```py
+        async with Database().unit_of_work() as uow:
+            record = await uow.row("INSERT INTO polls ... RETURNING *", ...)
+            await Table("poll_options").insert(...)
+        ```
+
+        Note:
+        -----
+            - nested units of work join the outer one
+            - calls inside the unit of work must not run concurrently (e.g. with `asyncio.gather`),
+              since they share one connection; tasks created inside use their own connections
+        """
+        if _unit_of_work_connection() is not None:
+            yield self
+            return
+        assert self.is_connected, "Not connected."
+        async with self._pool.acquire() as cxn:
+            async with cxn.transaction():
+                token = _unit_of_work.set((cxn, asyncio.current_task()))
+                try:
+                    yield self
+                finally:
+                    _unit_of_work.reset(token)
+
     @acquire
     async def execute(self, query: str, *values: Any, _cxn: asyncpg.Connection) -> Optional[asyncpg.Record]:
         return await _cxn.execute(query, *values)
         
 
-    @acquire
+    @acquire(transaction=True)
     async def execute_many(self, query: str, valueset: List[Any], _cxn: asyncpg.Connection) -> None:
         await _cxn.executemany(query, valueset)
 
@@ -158,7 +329,7 @@ class Database(metaclass=Singleton):
         """Executes and returns (if specified) a given `query`"""
         return await _cxn.fetch(query, *values)
 
-    @acquire
+    @acquire(transaction=True)
     async def execute_script(self, path: str, *args: Any, _cxn: asyncpg.Connection) -> None:
         async with aiofiles.open(path, "r") as script:
             await _cxn.execute((await script.read()) % args)
@@ -182,30 +353,43 @@ class Database(metaclass=Singleton):
         daily = hourly.resample("1d")["calls"].sum()
         return daily
 
+    @staticmethod
+    def query_stats(since: Optional[timedelta] = None) -> List["QuerySnapshot"]:
+        """latency, rows and errors per normalized query; see `QueryMetrics.snapshot`"""
+        return QueryMetrics.snapshot(since)
+
 ######Database
 #### tables
 ## guilds: guildid
 ####
 ## tags: id INT, tag_key - TEXT; tag_value - List[TEXT]; creator_id - INT; guild_id - INT
 
+# (sql, values) of the current `Table` call. Lives in the context of the call,
+# hence concurrent calls on the same `Table` don't overwrite each other
+_current_query: ContextVar[Optional[Tuple[str, List[Any]]]] = ContextVar("_current_query", default=None)
+
+
 def logging(reraise_exc: bool = True):
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             self = args[0]
-            log = getLogger(__name__, self.name, func.__name__)
+            token = _current_query.set(None)
             try:
                 return_value = await func(*args, **kwargs)
                 if self.do_log:
-                    log.debug(f"{self._executed_sql}\n->{return_value}")
+                    getLogger(__name__, self.name, func.__name__).debug(f"{self._executed_sql}\n->{return_value}")
                 return return_value
             except Exception as e:
                 if self._error_logging:
+                    log = getLogger(__name__, self.name, func.__name__)
                     log.error(f"{self._executed_sql}")
                     log.exception(f"{traceback.format_exc()}")
                     if reraise_exc:
                         raise e
                     return None
+            finally:
+                _current_query.reset(token)
         update_wrapper(wrapper, func)
         return wrapper
     return decorator
@@ -233,13 +417,87 @@ def formatter(func: Callable):
 
 
 
+# The SQL of `Table` only depends on the table, the operation and the columns.
+# It's compiled once per combination; the identical strings also let asyncpg
+# reuse its prepared statements
+@lru_cache(maxsize=1024)
+def _where_sql(columns: Tuple[str, ...], dollar_start: int = 1) -> str:
+    return " AND ".join(f"{column}=${i}" for i, column in enumerate(columns, dollar_start))
+
+
+@lru_cache(maxsize=1024)
+def _insert_sql(table: str, columns: Tuple[str, ...], returning: str, on_conflict: str) -> str:
+    values_chain = [f'${num}' for num in range(1, len(columns)+1)]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)})\n"
+        f"VALUES ({', '.join(values_chain)})\n" 
+    )
+    if on_conflict:
+        sql += f"ON CONFLICT {on_conflict}\n"
+    if returning:
+        sql += f"RETURNING {returning}\n"
+    return sql
+
+
+@lru_cache(maxsize=1024)
+def _upsert_sql(table: str, columns: Tuple[str, ...], compound_of: int, returning: str) -> str:
+    values_chain = [f'${num}' for num in range(1, len(columns)+1)]
+    update_set_query = ", ".join(
+        f"{column}={value}" for column, value in zip(columns[1:], values_chain[1:])
+    )
+    on_conflict_values = columns[0]
+    if compound_of:
+        on_conflict_values = ", ".join(c for c in columns[:compound_of])
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) \n"
+        f"VALUES ({', '.join(values_chain)}) \n"
+        f"ON CONFLICT ({on_conflict_values}) DO UPDATE \n"
+        f"SET {update_set_query} \n"
+    )
+    if returning:
+        sql += f"RETURNING {returning} \n"
+    return sql
+
+
+@lru_cache(maxsize=1024)
+def _update_sql(table: str, set_columns: Tuple[str, ...], where_columns: Tuple[str, ...], returning: str) -> str:
+    update_set_query = ", ".join(f"{column}=${i}" for i, column in enumerate(set_columns, 1))
+    sql = (
+        f"UPDATE {table} \n"
+        f"SET {update_set_query} \n"
+        f"WHERE {_where_sql(where_columns, len(set_columns) + 1)}\n"
+    )
+    if returning:
+        sql += f"RETURNING {returning} \n"
+    return sql
+
+
+@lru_cache(maxsize=1024)
+def _delete_sql(table: str, columns: Tuple[str, ...]) -> str:
+    return (
+        f"DELETE FROM {table}\n"
+        f"WHERE {_where_sql(columns)}\n"
+        f"RETURNING *"
+    )
+
+
+@lru_cache(maxsize=1024)
+def _select_sql(table: str, columns: Tuple[str, ...], order_by: Optional[str], select: str) -> str:
+    sql = (
+        f"SELECT {select} FROM {table}\n"
+        f"WHERE {_where_sql(columns)}"
+    )
+    if order_by:
+        sql += f"\nORDER BY {order_by}"
+    return sql
+
+
 class Table():
     do_log = table_logging
     def __init__(self, table_name: str, debug_log: bool = table_logging, error_log: bool = True):
         self.name = table_name
         self.db = Database()
         self.do_log = debug_log
-        self._executed_sql = ""
         self._as_dataframe: bool = False
         self._error_logging = error_log
     def return_as_dataframe(self, b: bool) -> None:
@@ -279,15 +537,7 @@ class Table():
                 new_columns.append(k)
             values, which_columns = new_values, new_columns
 
-        values_chain = [f'${num}' for num in range(1, len(values)+1)]
-        sql = (
-            f"INSERT INTO {self.name} ({', '.join(which_columns)})\n"
-            f"VALUES ({', '.join(values_chain)})\n" 
-        )
-        if on_conflict:
-            sql += f"ON CONFLICT {on_conflict}\n"
-        if returning:
-            sql += f"RETURNING {returning}\n"
+        sql = _insert_sql(self.name, tuple(which_columns), returning, on_conflict)
         self._create_sql_log_message(sql, values)
         return_values = await self.db.fetch(sql, *values)
         return return_values
@@ -313,24 +563,7 @@ class Table():
         if where:
             which_columns = list(where.keys())
             values = list(where.values())
-        values_chain = [f'${num}' for num in range(1, len(values)+1)]
-        update_set_query = ""
-        for i, item in enumerate(zip(which_columns, values_chain)):
-            if i == 0:
-                continue
-            update_set_query += f"{item[0]}={item[1]}, "
-        update_set_query = update_set_query[:-2]  # remove last ","
-        on_conflict_values = which_columns[0]
-        if compound_of:
-            on_conflict_values = ", ".join(c for c in which_columns[:compound_of])
-        sql = (
-            f"INSERT INTO {self.name} ({', '.join(which_columns)}) \n"
-            f"VALUES ({', '.join(values_chain)}) \n"
-            f"ON CONFLICT ({on_conflict_values}) DO UPDATE \n"
-            f"SET {update_set_query} \n"
-        )
-        if returning:
-            sql += f"RETURNING {returning} \n"
+        sql = _upsert_sql(self.name, tuple(which_columns), compound_of, returning)
         self._create_sql_log_message(sql, values)
         return_values = await self.db.execute(sql, *values)
         return return_values   
@@ -349,16 +582,7 @@ class Table():
         set : Dict[str, Any]
             the
         """
-        num_gen = (num for num in range(1,100))
-        update_set_query = ", ".join([f'{col_name}=${i}' for i, col_name in zip(num_gen, set.keys())])
-        next_ = next(num_gen) -1  # otherwise it would be one to high - python bug?
-        sql = (
-            f"UPDATE {self.name} \n"
-            f"SET {update_set_query} \n"
-            f"WHERE {self.__class__.create_where_statement([*where.keys()], dollar_start=next_)}\n"
-        )
-        if returning:
-            sql += f"RETURNING {returning} \n"
+        sql = _update_sql(self.name, tuple(set.keys()), tuple(where.keys()), returning)
         values = [*set.values(), *where.values()]
         self._create_sql_log_message(sql, values)
         return_values = await self.db.execute(sql, *values)
@@ -380,13 +604,7 @@ class Table():
         if where:
             columns = [*where.keys()]
             matching_values = [*where.values()]
-        where = self.__class__.create_where_statement(columns)
-
-        sql = (
-            f"DELETE FROM {self.name}\n"
-            f"WHERE {where}\n"
-            f"RETURNING *"
-        )
+        sql = _delete_sql(self.name, tuple(columns))
         self._create_sql_log_message(sql, matching_values)
 
         records = await self.db.fetch(sql, *matching_values)
@@ -426,15 +644,9 @@ class Table():
             for k, v in where.items():
                 columns.append(k)
                 matching_values.append(v)
-        where_stmt = self.__class__.create_where_statement(columns)
-        sql = (
-            f"SELECT {select} FROM {self.name}\n"
-            f"WHERE {where_stmt}"
-        )
-        if order_by:
-            sql += f"\nORDER BY {order_by}"
+        sql = _select_sql(self.name, tuple(columns), order_by, select)
         if additional_values:
-            matching_values.extend(additional_values)
+            matching_values = [*matching_values, *additional_values]
         self._create_sql_log_message(sql, matching_values)
 
         records = await self.db.fetch(sql, *matching_values)
@@ -478,13 +690,20 @@ class Table():
 
     @staticmethod
     def create_where_statement(columns: List[str], dollar_start: int = 1) -> str:
-        where = ""
-        for i, item in zip(range(dollar_start, dollar_start+len(columns)+1),columns):
-            where += f"{'AND ' if i > 0 else ''}{item}=${i} "
-        return where[4:]  # cut first and
+        return _where_sql(tuple(columns), dollar_start)
     
     def _create_sql_log_message(self, sql:str, values: List):
-        self._executed_sql = (
+        """stores the query of the current call; it's only formatted when it's logged"""
+        _current_query.set((sql, values))
+
+    @property
+    def _executed_sql(self) -> str:
+        """the query of the current call"""
+        query = _current_query.get()
+        if query is None:
+            return ""
+        sql, values = query
+        return (
             f"SQL:\n"
             f"{sql}\n"
             f"WITH VALUES: {values}"
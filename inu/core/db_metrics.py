@@ -0,0 +1,212 @@
+"""
+Latency histograms and slow-query log for `Database` queries.
+"""
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+import re
+from typing import *
+
+from . import ConfigProxy, ConfigType
+from ._logging import getLogger
+
+log = getLogger(__name__)
+
+__all__: Final[List[str]] = ["QueryMetrics", "QuerySnapshot", "SlowQuery", "LatencyHistogram"]
+
+# upper bounds of the histogram buckets in ms: 0.1 ms to ~100 s, 10 buckets per decade
+BUCKET_BOUNDS: Final[List[float]] = [0.1 * 10 ** (i / 10) for i in range(61)]
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+
+
+@lru_cache(maxsize=4096)
+def normalize_query(query: str) -> str:
+    """collapses whitespace and replaces literals with `?`, so that equal queries share their stats"""
+    query = _STRING_LITERAL.sub("?", query)
+    query = _NUMBER_LITERAL.sub("?", query)
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+class LatencyHistogram:
+    """Histogram with logarithmic buckets; quantiles are accurate to one bucket (~26%)"""
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def __len__(self) -> int:
+        return sum(self.counts)
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKET_BOUNDS, ms)] += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """the upper bound of the bucket containing the <q> quantile in ms"""
+        amount = len(self)
+        if not amount:
+            return 0.0
+        rank = q * amount
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+
+@dataclass
+class _QueryStats:
+    count: int = 0
+    errors: int = 0
+    rows: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    acquire_wait: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def merge(self, other: "_QueryStats") -> None:
+        self.count += other.count
+        self.errors += other.errors
+        self.rows += other.rows
+        self.latency.merge(other.latency)
+        self.acquire_wait.merge(other.acquire_wait)
+
+
+@dataclass(frozen=True)
+class QuerySnapshot:
+    """stats of one normalized query; latencies in ms"""
+    query: str
+    count: int
+    errors: int
+    rows: int
+    total_ms: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    acquire_p95: float
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    when: datetime
+    query: str
+    ms: float
+
+
+class QueryMetrics:
+    """
+    Collects stats per normalized query in time windows.
+
+    - only the windows of the last `RETENTION` are kept
+    - per window at most `MAX_QUERIES` different queries are tracked;
+      further queries are counted as `OTHER`
+    - queries slower than `db.slow_query_ms` (config) are logged and kept in `slow_queries`
+    """
+    WINDOW: timedelta = timedelta(minutes=5)
+    RETENTION: timedelta = timedelta(hours=24)
+    MAX_QUERIES: int = 500
+    OTHER: Final[str] = "<other queries>"
+    slow_query_ms: float = float(ConfigProxy(ConfigType.YAML).db.get("slow_query_ms", 500))
+    # (window start, normalized query -> stats)
+    _windows: Deque[Tuple[datetime, Dict[str, _QueryStats]]] = deque()
+    slow_queries: Deque[SlowQuery] = deque(maxlen=100)
+
+    @classmethod
+    def _current_window(cls) -> Dict[str, _QueryStats]:
+        now = datetime.now()
+        if not cls._windows or now - cls._windows[-1][0] >= cls.WINDOW:
+            cls._windows.append((now, {}))
+            while now - cls._windows[0][0] > cls.RETENTION:
+                cls._windows.popleft()
+        return cls._windows[-1][1]
+
+    @classmethod
+    def record(
+        cls,
+        query: str,
+        latency_ms: float,
+        acquire_ms: float,
+        rows: int = 0,
+        error: bool = False,
+    ) -> None:
+        query = normalize_query(query)
+        window = cls._current_window()
+        if (stats := window.get(query)) is None:
+            if len(window) >= cls.MAX_QUERIES:
+                query = cls.OTHER
+            stats = window.setdefault(query, _QueryStats())
+        stats.count += 1
+        stats.errors += error
+        stats.rows += rows
+        stats.latency.add(latency_ms)
+        stats.acquire_wait.add(acquire_ms)
+        if latency_ms >= cls.slow_query_ms:
+            cls.slow_queries.append(SlowQuery(datetime.now(), query, latency_ms))
+            log.warning(f"slow query ({latency_ms:.0f} ms): {query}")
+
+    @classmethod
+    def snapshot(cls, since: timedelta | None = None) -> List[QuerySnapshot]:
+        """
+        Args:
+        -----
+        since : timedelta | None
+            only windows of this timespan are included; all retained windows if None
+
+        Returns:
+        --------
+        List[QuerySnapshot]
+            stats per normalized query, ordered by total time spent
+        """
+        merged: Dict[str, _QueryStats] = {}
+        start = datetime.now() - since if since else datetime.min
+        for window_start, window in cls._windows:
+            if window_start + cls.WINDOW < start:
+                continue
+            for query, stats in window.items():
+                merged.setdefault(query, _QueryStats()).merge(stats)
+        snapshots = [
+            QuerySnapshot(
+                query=query,
+                count=stats.count,
+                errors=stats.errors,
+                rows=stats.rows,
+                total_ms=stats.latency.total,
+                p50=stats.latency.quantile(0.5),
+                p95=stats.latency.quantile(0.95),
+                p99=stats.latency.quantile(0.99),
+                max=stats.latency.max,
+                acquire_p95=stats.acquire_wait.quantile(0.95),
+            )
+            for query, stats in merged.items()
+        ]
+        snapshots.sort(key=lambda s: s.total_ms, reverse=True)
+        return snapshots
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._windows.clear()
+        cls.slow_queries.clear()
+
+
+def count_rows(result: Any) -> int:
+    """rows of an asyncpg result: records, a record or a status like `INSERT 0 5`"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, str):
+        last = result.rsplit(" ", 1)[-1]
+        return int(last) if last.isdigit() else 0
+    return 0 if result is None else 1
+
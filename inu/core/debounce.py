@@ -0,0 +1,96 @@
+"""
+Debounced, retrying flushes for write-behind buffers.
+"""
+import asyncio
+import traceback
+from typing import *
+
+from ._logging import getLogger
+
+log = getLogger(__name__)
+
+__all__: Final[List[str]] = ["DebouncedFlush"]
+
+
+class DebouncedFlush:
+    """
+    Writes a buffer <delay> seconds after the first item was queued.
+
+    - `schedule` is called after queueing items; it starts a flush, if none is scheduled or running
+    - only one flush runs at a time
+    - if items are pending after a flush (queued while it ran, or kept after it failed),
+      the next flush is scheduled right away (after a failure: after <retry_delay>)
+    - `flush_all` flushes every buffer, e.g. when the bot stops
+
+    Args:
+    -----
+    name : str
+        the name of the buffer, used in the log
+    flush : Callable[[], Awaitable[None]]
+        writes the pending items; has to keep them pending when it raises
+    has_pending : Callable[[], bool]
+        whether items are pending
+    delay : float
+        seconds to collect items before they are written
+    retry_delay : float
+        seconds to wait after a failed flush
+    """
+    _instances: List["DebouncedFlush"] = []
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[], Awaitable[None]],
+        has_pending: Callable[[], bool],
+        delay: float,
+        retry_delay: float = 30,
+    ) -> None:
+        self.name = name
+        self._flush = flush
+        self._has_pending = has_pending
+        self.delay = delay
+        self.retry_delay = retry_delay
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._instances.append(self)
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # created lazily, since the buffers are created at import time without a running loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def schedule(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        delay = self.delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.flush()
+                delay = self.delay
+            except Exception:
+                log.error(f"flush of {self.name} failed - retrying in {self.retry_delay}s:\n{traceback.format_exc()}")
+                delay = self.retry_delay
+            # no await between this check and the end of the task,
+            # hence `schedule` either sees the items here or a finished task
+            if not self._has_pending():
+                return
+
+    async def flush(self) -> None:
+        """writes the pending items now"""
+        async with self.lock:
+            if self._has_pending():
+                await self._flush()
+
+    @classmethod
+    async def flush_all(cls) -> None:
+        """flushes every buffer once; failures are logged"""
+        for buffer in cls._instances:
+            try:
+                await buffer.flush()
+            except Exception:
+                log.error(f"flush of {buffer.name} failed:\n{traceback.format_exc()}")
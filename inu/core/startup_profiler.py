@@ -0,0 +1,106 @@
+"""
+Timeline of the startup: imports and loads of the extensions and the init steps of the bot.
+"""
+from dataclasses import dataclass
+from contextlib import contextmanager
+import time
+from typing import *
+
+import tabulate
+
+from . import ConfigProxy, ConfigType
+from ._logging import getLogger
+
+log = getLogger(__name__)
+
+__all__: Final[List[str]] = ["StartupProfiler", "StartupStep"]
+
+
+@dataclass
+class StartupStep:
+    """one step of the startup; times in seconds since `StartupProfiler.start`"""
+    group: str
+    name: str
+    start: float
+    duration: float = 0.0
+    ok: bool = False
+
+    @property
+    def ms(self) -> float:
+        return self.duration * 1000
+
+
+class StartupProfiler:
+    """
+    Records how long the steps of the startup take.
+
+    - `measure` records one step; steps which run concurrently overlap in the timeline
+    - `ready` logs the time from `start` (import of `core` or the last `reset`) to ready
+      and warns when it's above `bot.startup_target_s` (config)
+    """
+    start: float = time.perf_counter()
+    steps: List[StartupStep] = []
+    target: float = float(ConfigProxy(ConfigType.YAML).bot.get("startup_target_s", 30))
+
+    @classmethod
+    def reset(cls) -> None:
+        """starts a new timeline, e.g. when the bot reboots"""
+        cls.start = time.perf_counter()
+        cls.steps = []
+
+    @classmethod
+    @contextmanager
+    def measure(cls, group: str, name: str) -> Iterator[StartupStep]:
+        """
+        Args:
+        -----
+        group : str
+            the kind of step, e.g. `import`, `load` or `init`
+        name : str
+            the name of the step, e.g. the extension
+
+        Returns:
+        --------
+        Iterator[StartupStep]
+            the step; `duration` and `ok` are set when the block is left
+        """
+        begin = time.perf_counter()
+        step = StartupStep(group, name, begin - cls.start)
+        cls.steps.append(step)
+        try:
+            yield step
+            step.ok = True
+        finally:
+            step.duration = time.perf_counter() - begin
+
+    @classmethod
+    def table(cls, group: str) -> str:
+        """tabulated steps of <group> in the order they were started"""
+        rows = [
+            [step.name, step.ok, f"{step.start:.2f} s", f"{step.ms:.0f} ms"]
+            for step in cls.steps if step.group == group
+        ]
+        return tabulate.tabulate(rows, headers=["Step", "Ok", "Started", "Took"])
+
+    @classmethod
+    def ready(cls, slowest: int = 5) -> float:
+        """
+        Logs the time until ready and the slowest steps
+
+        Returns:
+        --------
+        float
+            seconds from `start` until now
+        """
+        total = time.perf_counter() - cls.start
+        text = f"ready after {total:.2f} s (target: {cls.target:.0f} s)"
+        if total > cls.target:
+            log.warning(text, prefix="init")
+        else:
+            log.info(text, prefix="init")
+        rows = [
+            [step.group, step.name, f"{step.ms:.0f} ms"]
+            for step in sorted(cls.steps, key=lambda s: s.duration, reverse=True)[:slowest]
+        ]
+        log.info(tabulate.tabulate(rows, headers=["Group", "Slowest steps", "Took"]), multiline=True, prefix="init")
+        return total
@@ -0,0 +1,8 @@
+-- array membership of tags is checked with `&&` and `@>`, which GIN indexes support
+CREATE INDEX IF NOT EXISTS tags_guild_ids_gin_idx ON tags USING GIN (guild_ids);
+CREATE INDEX IF NOT EXISTS tags_author_ids_gin_idx ON tags USING GIN (author_ids);
+CREATE INDEX IF NOT EXISTS tags_aliases_gin_idx ON tags USING GIN (aliases);
+
+-- trigram index for similarity searches on tag names
+CREATE INDEX IF NOT EXISTS tags_tag_key_trgm_idx ON tags USING GIN (tag_key gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS tags_last_use_idx ON tags (last_use DESC);
@@ -0,0 +1,7 @@
+-- range queries per guild over time
+CREATE INDEX IF NOT EXISTS current_games_guild_id_timestamp_idx ON current_games (guild_id, "timestamp");
+CREATE INDEX IF NOT EXISTS music_history_guild_id_played_on_idx ON music_history (guild_id, played_on DESC);
+
+-- polling of due entries
+CREATE INDEX IF NOT EXISTS reminders_remind_time_idx ON reminders (remind_time);
+CREATE INDEX IF NOT EXISTS polls_expires_idx ON polls (expires);
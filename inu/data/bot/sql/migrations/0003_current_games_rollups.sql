@@ -0,0 +1,75 @@
+-- pre-aggregated activity of `current_games`
+CREATE TABLE IF NOT EXISTS current_games_hourly (
+    guild_id BIGINT NOT NULL,
+    game VARCHAR(100) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    user_minutes BIGINT NOT NULL,
+    PRIMARY KEY (guild_id, bucket, game)
+);
+
+CREATE TABLE IF NOT EXISTS current_games_daily (
+    guild_id BIGINT NOT NULL,
+    game VARCHAR(100) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    user_minutes BIGINT NOT NULL,
+    PRIMARY KEY (guild_id, bucket, game)
+);
+
+-- everything before `rolled_until` is contained in the rollup table
+CREATE TABLE IF NOT EXISTS current_games_rollups (
+    name VARCHAR(20) PRIMARY KEY,
+    rolled_until TIMESTAMP NOT NULL
+);
+
+INSERT INTO current_games_rollups (name, rolled_until)
+VALUES ('hourly', '-infinity'), ('daily', '-infinity')
+ON CONFLICT DO NOTHING;
+
+-- rolls up all completed hours and days and compacts the older rows.
+-- <now_> is passed by the bot, since `current_games` uses the local time of the bot.
+-- <minutes_per_sample> is the sampling interval of `current_games`
+CREATE OR REPLACE FUNCTION rollup_current_games(
+    now_ TIMESTAMP,
+    minutes_per_sample INT,
+    raw_retention INTERVAL,
+    hourly_retention INTERVAL
+) RETURNS VOID AS $$
+DECLARE
+    hourly_from TIMESTAMP;
+    hourly_until TIMESTAMP := date_trunc('hour', now_);
+    daily_from TIMESTAMP;
+    daily_until TIMESTAMP := date_trunc('day', now_);
+BEGIN
+    -- only one rollup at a time
+    SELECT rolled_until INTO hourly_from FROM current_games_rollups WHERE name = 'hourly' FOR UPDATE;
+    SELECT rolled_until INTO daily_from FROM current_games_rollups WHERE name = 'daily' FOR UPDATE;
+
+    IF hourly_until > hourly_from THEN
+        INSERT INTO current_games_hourly (guild_id, game, bucket, user_minutes)
+        SELECT guild_id, game, date_trunc('hour', timestamp), SUM(user_amount) * minutes_per_sample
+        FROM current_games
+        WHERE timestamp >= hourly_from AND timestamp < hourly_until AND game IS NOT NULL
+        GROUP BY 1, 2, 3
+        ON CONFLICT (guild_id, bucket, game)
+        DO UPDATE SET user_minutes = current_games_hourly.user_minutes + EXCLUDED.user_minutes;
+        UPDATE current_games_rollups SET rolled_until = hourly_until WHERE name = 'hourly';
+    END IF;
+
+    IF daily_until > daily_from THEN
+        INSERT INTO current_games_daily (guild_id, game, bucket, user_minutes)
+        SELECT guild_id, game, date_trunc('day', bucket), SUM(user_minutes)
+        FROM current_games_hourly
+        WHERE bucket >= daily_from AND bucket < daily_until
+        GROUP BY 1, 2, 3
+        ON CONFLICT (guild_id, bucket, game)
+        DO UPDATE SET user_minutes = current_games_daily.user_minutes + EXCLUDED.user_minutes;
+        UPDATE current_games_rollups SET rolled_until = daily_until WHERE name = 'daily';
+    END IF;
+
+    -- compact rows which are rolled up and older than the retention
+    DELETE FROM current_games
+    WHERE timestamp < LEAST(hourly_until, now_ - raw_retention);
+    DELETE FROM current_games_hourly
+    WHERE bucket < LEAST(daily_until, now_ - hourly_retention);
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,9 @@
+-- Lavalink results of search queries and URLs, shared across guilds (see `TrackCache`)
+CREATE TABLE IF NOT EXISTS music_track_cache (
+    query TEXT PRIMARY KEY,  -- <search engine>:<normalized query or URL>
+    load_type VARCHAR(10) NOT NULL,  -- `track` or `search`
+    encoded TEXT [] NOT NULL,
+    resolved_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS music_track_cache_resolved_at_idx ON music_track_cache (resolved_at);
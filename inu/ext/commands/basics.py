@@ -31,7 +31,7 @@ from tmdb import route
 from utils import (
     Colors, Human, Paginator, GuildPaginator,
     Reddit, Urban, crumble, MyAnimeList, 
-    BoredAPI, IP, Facts, xkcdAPI,
+    BoredAPI, IP, Facts, xkcdAPI, HttpClient,
 )
 from utils.shortcuts import display_name_or_id
 
@@ -81,12 +81,10 @@ class RestDelay:
                 self.delay = (datetime.now() - start).total_seconds() * 1000
                 self.status = 400 if resp is False else 200
             else:
-                async with aiohttp.ClientSession() as session:
-                    start = datetime.now()
-                    async with session.get(self.url, params=self.params, headers=self.headers) as resp:
-                        self.delay = (datetime.now() - start).seconds * 1000
-                        self.status = resp.status
-                    await session.close()
+                start = datetime.now()
+                async with HttpClient().request("GET", self.url, params=self.params, headers=self.headers) as resp:
+                    self.delay = (datetime.now() - start).total_seconds() * 1000
+                    self.status = resp.status
         except Exception:
             self.delay = -1
             self.status = 400
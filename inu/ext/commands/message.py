@@ -14,6 +14,7 @@ from typing import (
 import time as tm
 import random
 import logging
+from io import BytesIO
 
 from pyparsing import ParseException
 import asyncpraw
@@ -29,7 +30,7 @@ import re
 from expiring_dict import ExpiringDict
 
 from core import getLogger, Inu, get_context, Bash, InuContext
-from utils import Human, calc, evaluation2image
+from utils import Human, calc, RenderService
 from utils import prepare_for_latex as replace_unsupported_chars, Paginator
 
 log = getLogger(__name__)
@@ -162,13 +163,14 @@ async def send_result(ctx: InuContext, result: str, calculation: str, base: str
     if base:
         embed.set_footer(f"result with base {base}")
     try:
-        image = evaluation2image(
+        image = await RenderService().render_evaluation(
             prepare_for_latex(
                 result, 
             ),
             multiline= (len(result) > 50)
         )
-        embed.set_image(image)
+        if image:
+            embed.set_image(BytesIO(image))
     except ParseException as e:
         log.warning(f"parsing failed:\n{e.explain()}")
     except Exception as e:
@@ -16,7 +16,8 @@ from lavalink_rs.model.track import TrackData, PlaylistData, TrackLoadType
 
 from .music_utils import (
     LavalinkVoice, MusicPlayerManager, HISTORY_PREFIX, 
-    MEDIA_TAG_PREFIX, MARKDOWN_URL_REGEX, DISCONNECT_AFTER
+    MEDIA_TAG_PREFIX, MARKDOWN_URL_REGEX, DISCONNECT_AFTER,
+    TrackCache
 )
 from utils import TagManager, TagType, MusicHistoryHandler
 from core import Inu, getLogger, get_context, InuContext
@@ -221,6 +222,7 @@ class Events(lavalink_rs.EventHandler):
 async def start_lavalink(event: hikari.ShardReadyEvent) -> None:
     """Event that triggers when the hikari gateway is ready."""
     MusicPlayerManager.set_bot(bot)
+    TrackCache.set_bot(bot)
     try:
         ip = bot.conf.lavalink.IP  # type: ignore
         password = bot.conf.lavalink.PASSWORD  # type: ignore
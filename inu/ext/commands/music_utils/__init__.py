@@ -4,5 +4,6 @@ from .helpers import *
 from .response_lock import ResponseLock
 from .components import MusicMessageComponents
 from .lavalink_voice import LavalinkVoice, LavalinkClient, TrackUserData
+from .track_cache import TrackCache, CachedTrack, normalize_track_query
 from .voice_states import VoiceState, BotIsLonelyState, BotIsActiveState
 from .player import MusicPlayer, MusicPlayerManager
\ No newline at end of file
@@ -27,13 +27,20 @@ from . import (
     LavalinkVoice, YouTubeHelper, TrackUserData, 
     ResponseLock, MusicMessageComponents, HISTORY_PREFIX,
     MEDIA_TAG_PREFIX, MARKDOWN_URL_REGEX, BotIsActiveState,
-    VoiceState
+    VoiceState, TrackCache, CachedTrack
 )
 from ..tags import get_tag
 from utils import Human, MusicHistoryHandler
-from core import Inu, get_context, InuContext, getLogger, InuContextBase
+from core import Inu, get_context, InuContext, getLogger, InuContextBase, ConfigProxy, ConfigType
 
 log = getLogger(__name__)
+_lavalink_conf = ConfigProxy(ConfigType.YAML).lavalink
+# how many lines of a playlist are searched at the same time
+TRACK_LOAD_CONCURRENCY: int = int(_lavalink_conf.get("track_load_concurrency", 4))
+# min. seconds between two edits of the "Searching Tracks" message
+PROGRESS_UPDATE_INTERVAL: float = float(_lavalink_conf.get("progress_update_interval", 2))
+# lines of the progress table which are shown
+PROGRESS_TABLE_LINES: int = 20
 
 class MusicPlayerManager:
     _instances: Dict[int, "MusicPlayer"] = {}
@@ -90,6 +97,7 @@ class MusicPlayer:
         self.response_lock = ResponseLock(timedelta(seconds=6))
         self._join_channel: hikari.PartialChannel | None = None
         self.voice_state: VoiceState = BotIsActiveState(self)  # Default state
+        self._last_progress_update: datetime = datetime.min
         
     def with_join_channel(self, channel: hikari.PartialChannel) -> "MusicPlayer":
         """
@@ -454,15 +462,22 @@ class MusicPlayer:
         silent = len(lines) > 1
         proxy = None
         progress: List[Tuple[int, str]] = []
-        for i, query in enumerate(lines):
-            try:
-                message, was_successfull = await self._add_track(player_ctx, query, silent, position)
-                progress.append((i+1, str(message)[:50]))
-                proxy = await self._communicate_parsing_progress(progress, proxy, silent)
-            except BotResponseError as e:
-                await self.ctx.respond(**e.context_kwargs)
-            except TimeoutError:
-                return False
+        # the lines are searched concurrently, but added in their order
+        loading = self._load_lines(lines) if silent else [None]
+        try:
+            for i, (query, load_task) in enumerate(zip(lines, loading)):
+                try:
+                    message, was_successfull = await self._add_track(player_ctx, query, silent, position, load_task)
+                    progress.append((i+1, str(message)[:50]))
+                    proxy = await self._communicate_parsing_progress(
+                        progress, proxy, silent, total=len(lines)
+                    )
+                except BotResponseError as e:
+                    await self.ctx.respond(**e.context_kwargs)
+                except TimeoutError:
+                    return False
+        finally:
+            self._stop_loading(loading)
             
         if len(lines) > 1:
             # when multiple tracks are added, the listener will trigger,
@@ -481,18 +496,72 @@ class MusicPlayer:
                 player_ctx.skip()
         return True
 
-    async def _communicate_parsing_progress(self, progress: List[Tuple[int, str]], proxy: None | ResponseProxy, silent: bool) -> None | ResponseProxy:
+    def _load_lines(self, lines: List[str]) -> List[asyncio.Task[Track | CachedTrack]]:
+        """
+        Starts searching all <lines> with at most `TRACK_LOAD_CONCURRENCY` Lavalink requests at once
+
+        Returns:
+        --------
+        List[asyncio.Task[Track | CachedTrack]]
+            one task per line, in the order of <lines>
+        """
+        semaphore = asyncio.Semaphore(TRACK_LOAD_CONCURRENCY)
+
+        async def load(query: str) -> Track | CachedTrack:
+            async with semaphore:
+                return await self._load_tracks(query)
+
+        return [asyncio.create_task(load(query)) for query in lines]
+
+    @staticmethod
+    def _stop_loading(loading: Sequence[Optional[asyncio.Task]]) -> None:
+        """
+        Cancels the searches of `_load_lines`, which are still running, e.g. when `play` returns early.
+        Exceptions of finished searches are retrieved, otherwise asyncio logs them as never retrieved
+        """
+        for load_task in loading:
+            if load_task is None:
+                continue
+            if not load_task.done():
+                load_task.cancel()
+            elif not load_task.cancelled():
+                load_task.exception()
+
+    async def _load_tracks(self, query: str) -> Track | CachedTrack:
+        """searches <query> with Lavalink or returns the cached result (see `TrackCache`)"""
+        log.debug(f"Search {query=}")
+        return await TrackCache.load_tracks(self.guild_id, query)
+
+    async def _communicate_parsing_progress(
+        self, 
+        progress: List[Tuple[int, str]], 
+        proxy: None | ResponseProxy, 
+        silent: bool,
+        total: int = 0,
+    ) -> None | ResponseProxy:
         """
         silent means in this case, that this message will be send und updated. Not silent means that this will be done 
         in another part of the code, hence here it will be ignored.
+
+        The message is edited at most every `PROGRESS_UPDATE_INTERVAL` seconds and when the last line is done.
         """
         if not silent:
             return None
-        table = tabulate(progress, headers=["Line", "Title"], tablefmt="rounded_outline")
+        now = datetime.now()
+        done = len(progress) >= total
+        if (
+            proxy 
+            and not done 
+            and now - self._last_progress_update < timedelta(seconds=PROGRESS_UPDATE_INTERVAL)
+        ):
+            return proxy
+        self._last_progress_update = now
+        table = tabulate(progress[-PROGRESS_TABLE_LINES:], headers=["Line", "Title"], tablefmt="rounded_outline")
+        content = f"Searching Tracks... ({len(progress)}/{total})\n```{table}```"
         if not proxy:
-            proxy = await self.ctx.respond(f"Searching Tracks...\n```{table}```")
+            proxy = await self.ctx.respond(content)
         else:
-            await proxy.edit(f"Searching Tracks...\n```{table}```")
+            await proxy.edit(content)
         return proxy
     
     async def _choose_track(self, tracks: List[TrackData], silent: bool) -> TrackData | None:
@@ -578,7 +647,14 @@ class MusicPlayer:
         return tracks[int(value_or_custom_id)]
     
     
-    async def _add_track(self, player_ctx: PlayerContext, query: str, silent: bool, position: int | None = None) -> Tuple[Optional[str], bool]:
+    async def _add_track(
+        self, 
+        player_ctx: PlayerContext, 
+        query: str, 
+        silent: bool, 
+        position: int | None = None,
+        loading: Optional[Awaitable[Track | CachedTrack]] = None,
+    ) -> Tuple[Optional[str], bool]:
         """Add a track or playlist to the queue based on the query.
 
         Parameters
@@ -589,6 +665,10 @@ class MusicPlayer:
             The search query or URL to load tracks from
         silent : bool
             Whether or not to supress responses to the user (e.g. track selection)
+        position : int | None
+            The position to insert the track(s) in the queue
+        loading : Awaitable[Track | CachedTrack] | None
+            The already started search of <query> (see `_load_lines`); searched here if None
 
         Returns
         -------
@@ -618,8 +698,7 @@ class MusicPlayer:
         user_data: TrackUserData = self._make_user_data(ctx)
         track_title: str | None = None
         try:
-            log.debug(f"Search {query=}")
-            tracks: Track = await ctx.bot.lavalink.load_tracks(self.guild_id, query)
+            tracks: Track | CachedTrack = await (loading or self._load_tracks(query))
             loaded_tracks = tracks.data
         except Exception as e:
             log.error(traceback.format_exc())
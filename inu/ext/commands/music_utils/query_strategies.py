@@ -3,7 +3,6 @@ from math import log
 from typing import *
 
 from hikari import Snowflakeish
-from matplotlib.pylab import f
 from core import InuContext
 from lavalink_rs.model.search import SearchEngines  # type: ignore
 from lavalink_rs.model.track import Track, TrackData, PlaylistData, TrackLoadType, PlaylistInfo  # type: ignore
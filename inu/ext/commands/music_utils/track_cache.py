@@ -0,0 +1,170 @@
+from typing import *
+from dataclasses import dataclass
+from datetime import timedelta
+from urllib.parse import urlsplit, urlunsplit
+import asyncio
+import re
+import traceback
+
+from cachetools import TTLCache
+from lavalink_rs.model.track import Track, TrackData, TrackLoadType  # type: ignore
+
+from core import Inu, getLogger, ConfigProxy, ConfigType, DebouncedFlush
+from utils import TrackCacheStore
+
+__all__: Final[List[str]] = ["TrackCache", "CachedTrack", "normalize_track_query"]
+
+log = getLogger(__name__)
+_conf = ConfigProxy(ConfigType.YAML).lavalink
+TRACK_CACHE_SIZE: int = int(_conf.get("track_cache_size", 2000))
+TRACK_CACHE_TTL: timedelta = timedelta(hours=float(_conf.get("track_cache_ttl_h", 24)))
+# whether resolved tracks are stored in `music_track_cache`
+TRACK_CACHE_PERSIST: bool = bool(_conf.get("track_cache_persist", True))
+TRACK_CACHE_FLUSH_DELAY = 5
+_SEARCH_PREFIX = re.compile(r"^(?P<engine>[a-z]+search):(?P<query>.*)$", re.IGNORECASE | re.DOTALL)
+
+
+def normalize_track_query(query: str) -> Tuple[str, str]:
+    """
+    Returns:
+    --------
+    Tuple[str, str]
+        the search engine (`url` for URLs) and the query with collapsed whitespace
+        (searches: lowercased; URLs: lowercased scheme and host, without fragment)
+    """
+    query = query.strip()
+    if (match := _SEARCH_PREFIX.match(query)):
+        return match.group("engine").lower(), " ".join(match.group("query").lower().split())
+    parts = urlsplit(query)
+    if parts.scheme and parts.netloc:
+        return "url", urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+    return "", " ".join(query.split())
+
+
+@dataclass
+class CachedTrack:
+    """
+    A `Track` restored from `music_track_cache`.
+    Like `Track` it has `load_type` and `data`, which is all the music player uses
+    """
+    load_type: Any
+    data: TrackData | List[TrackData]
+
+
+class TrackCache:
+    """
+    Cache of resolved Lavalink searches and URLs, shared across guilds.
+
+    - hits in memory need no Lavalink request
+    - with `lavalink.track_cache_persist` (config), tracks and search results are stored
+      in `music_track_cache`; restoring them only needs a decode request, no search
+    - concurrent loads of the same query share one Lavalink request
+    - playlists, errors and empty results are kept in memory only or not at all
+    """
+    bot: Inu
+    _cache: TTLCache = TTLCache(TRACK_CACHE_SIZE, TRACK_CACHE_TTL.total_seconds())
+    _loading: Dict[Tuple[str, str], asyncio.Task] = {}
+    # key -> load type and encoded tracks, which are not stored in the db yet
+    _pending: Dict[str, Tuple[str, List[str]]] = {}
+    store_flush: DebouncedFlush
+
+    @classmethod
+    def set_bot(cls, bot: Inu) -> None:
+        cls.bot = bot
+
+    @classmethod
+    async def load_tracks(cls, guild_id: int, query: str) -> Track | CachedTrack:
+        """
+        Args:
+        -----
+        guild_id : int
+            the guild, which is passed to Lavalink when the query is not cached
+        query : str
+            a search (e.g. `scsearch:<query>`) or a URL
+
+        Returns:
+        --------
+        Track | CachedTrack
+            the result of `LavalinkClient.load_tracks` or an equal cached result
+        """
+        key = normalize_track_query(query)
+        if (tracks := cls._cache.get(key)) is not None:
+            return tracks
+        if (task := cls._loading.get(key)) is None:
+            task = asyncio.create_task(cls._load(guild_id, query, key))
+            cls._loading[key] = task
+            task.add_done_callback(lambda _: cls._loading.pop(key, None))
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _load(cls, guild_id: int, query: str, key: Tuple[str, str]) -> Track | CachedTrack:
+        tracks: Track | CachedTrack | None = None
+        if TRACK_CACHE_PERSIST:
+            try:
+                tracks = await cls._load_stored(guild_id, key)
+            except Exception:
+                log.warning(f"can't restore cached tracks of {query}: {traceback.format_exc()}", prefix="cache")
+        if tracks is None:
+            tracks = await cls.bot.lavalink.load_tracks(guild_id, query)
+            cls._store(key, tracks)
+        if tracks.load_type in (TrackLoadType.Track, TrackLoadType.Search, TrackLoadType.Playlist) and tracks.data:
+            cls._cache[key] = tracks
+        return tracks
+
+    @classmethod
+    async def _load_stored(cls, guild_id: int, key: Tuple[str, str]) -> CachedTrack | None:
+        db_key = ":".join(key)
+        stored = cls._pending.get(db_key) or await TrackCacheStore.get(db_key, TRACK_CACHE_TTL)
+        if not stored:
+            return None
+        load_type, encoded = stored
+        if load_type == "track":
+            return CachedTrack(TrackLoadType.Track, await cls.bot.lavalink.decode_track(guild_id, encoded[0]))
+        return CachedTrack(TrackLoadType.Search, list(await cls.bot.lavalink.decode_tracks(guild_id, encoded)))
+
+    @classmethod
+    def _store(cls, key: Tuple[str, str], tracks: Track) -> None:
+        """Queues single tracks and search results to be stored in the db"""
+        if not TRACK_CACHE_PERSIST or not tracks.data:
+            return
+        if tracks.load_type == TrackLoadType.Track:
+            entry = ("track", [tracks.data.encoded])
+        elif tracks.load_type == TrackLoadType.Search:
+            entry = ("search", [track.encoded for track in tracks.data])
+        else:
+            return
+        cls._pending[":".join(key)] = entry
+        cls.store_flush.schedule()
+
+    @classmethod
+    async def flush(cls):
+        """writes all queued tracks to the db"""
+        await cls.store_flush.flush()
+
+    @classmethod
+    async def _write_pending(cls):
+        if not cls._pending:
+            return
+        pending, cls._pending = cls._pending, {}
+        try:
+            await TrackCacheStore.add_many(
+                [(key, load_type, encoded) for key, (load_type, encoded) in pending.items()]
+            )
+        except Exception:
+            # keep them for the next flush
+            cls._pending = {**pending, **cls._pending}
+            raise
+
+    @classmethod
+    async def clean(cls):
+        """removes expired tracks from the db"""
+        if TRACK_CACHE_PERSIST:
+            await TrackCacheStore.clean(TRACK_CACHE_TTL)
+
+
+TrackCache.store_flush = DebouncedFlush(
+    "track cache",
+    TrackCache._write_pending,
+    lambda: bool(TrackCache._pending),
+    delay=TRACK_CACHE_FLUSH_DELAY,
+)
@@ -1,6 +1,6 @@
 from typing import *
 import contextlib
-from datetime import datetime
+from datetime import datetime, timedelta
 from inspect import getmembers, getsource
 import io
 import os
@@ -18,6 +18,7 @@ from lightbulb.context import Context
 from lightbulb import AutocompleteContext, SlashCommand, invoke
 from expiring_dict import ExpiringDict
 import lightbulb.prefab.checks
+from tabulate import tabulate
 
 from utils import crumble
 from utils import Paginator
@@ -25,7 +26,8 @@ from utils.tree import tree as tree_
 from core import Inu, InuContext
 from utils import BaseReminder, HikariReminder, Reminders, Human, Multiple
 from utils.string_crumbler import NumberWordIterator as NWI
-from core import getLogger, get_context
+from core import getLogger, get_context, reload_logging
+from core.db_metrics import QueryMetrics
 
 
 log = getLogger(__name__)
@@ -211,6 +213,71 @@ class LogCommand(
 
 
 
+@loader.command
+class DbStatsCommand(
+    lightbulb.SlashCommand,
+    name="db-stats",
+    description="Shows latency and rows of the DB queries",
+    contexts=[ApplicationContextType.GUILD, ApplicationContextType.PRIVATE_CHANNEL],
+    hooks=[lightbulb.prefab.checks.owner_only]
+):
+    hours = lightbulb.number("hours", "the timespan to show", default=1, min_value=0.1, max_value=24)
+    limit = lightbulb.integer("limit", "the amount of queries to show", default=15, min_value=1, max_value=100)
+
+    @lightbulb.invoke
+    async def callback(self, _: lightbulb.Context, ctx: InuContext):
+        snapshots = QueryMetrics.snapshot(timedelta(hours=self.hours))[:self.limit]
+        embeds: List[hikari.Embed] = []
+        for i, s in enumerate(snapshots):
+            table = tabulate(
+                [
+                    ["calls", s.count, "errors", s.errors],
+                    ["rows", s.rows, "total", f"{s.total_ms:.0f} ms"],
+                    ["p50", f"{s.p50:.1f} ms", "p95", f"{s.p95:.1f} ms"],
+                    ["p99", f"{s.p99:.1f} ms", "max", f"{s.max:.1f} ms"],
+                    ["pool wait p95", f"{s.acquire_p95:.1f} ms", "", ""],
+                ],
+                tablefmt="rounded_outline",
+            )
+            embeds.append(hikari.Embed(
+                title=f"{i+1}. query by total time",
+                description=f"```sql\n{Human.short_text(s.query, 1500)}```\n```\n{table}```",
+            ))
+        if QueryMetrics.slow_queries:
+            slow = "\n".join(
+                f"{q.when:%H:%M:%S} {q.ms:.0f} ms: {Human.short_text(q.query, 150)}" 
+                for q in list(QueryMetrics.slow_queries)[-15:]
+            )
+            embeds.append(hikari.Embed(
+                title=f"Slow queries (>= {QueryMetrics.slow_query_ms:.0f} ms)", 
+                description=f"```\n{slow}```"
+            ))
+        if not embeds:
+            embeds.append(hikari.Embed(description=f"No queries in the last {self.hours}h"))
+        await Paginator(page_s=embeds, timeout=10*60).start(ctx)
+
+
+
+@loader.command
+class ReloadConfigCommand(
+    lightbulb.SlashCommand,
+    name="reload-config",
+    description="Reads the config again and applies the log levels",
+    contexts=[ApplicationContextType.GUILD, ApplicationContextType.PRIVATE_CHANNEL],
+    hooks=[lightbulb.prefab.checks.owner_only]
+):
+    @lightbulb.invoke
+    async def callback(self, _: lightbulb.Context, ctx: InuContext):
+        try:
+            reload_logging()
+        except Exception as e:
+            log.error(traceback.format_exc())
+            await ctx.respond(f"Config couldn't be reloaded: `{e}`", ephemeral=True)
+            return
+        await ctx.respond("Config reloaded", ephemeral=True)
+
+
+
 @loader.command
 class ExecuteCommand(
     lightbulb.SlashCommand,
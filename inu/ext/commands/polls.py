@@ -18,8 +18,6 @@ import lightbulb.utils as lightbulb_utils
 from lightbulb import commands, context, SlashCommand, invoke, Loader
 from lightbulb.context import Context
 import hikari
-from matplotlib.style import available
-from numpy import full, isin
 from fuzzywuzzy import fuzz
 from pytimeparse.timeparse import timeparse
 from hikari import TextInputStyle
@@ -56,39 +54,29 @@ async def on_interaction_create(event: hikari.InteractionCreateEvent):
         return
     if not (custom_id := ictx.custom_id).startswith("vote_add"):
         return
+    if custom_id == "vote_add_menu" and event.interaction.values:
+        # select menu with more than 10 options
+        custom_id = event.interaction.values[0]
     letter = custom_id[-1]
-    ctx_message_id = (await ictx.message()).id
+    ctx_message_id = event.interaction.message.id
     if not ctx_message_id in PollManager.message_id_cache:
         log.debug("message id not in cache")
         return
 
-    record = await PollManager.fetch_poll(message_id=ctx_message_id)
-    if not record:
+    # votes are applied in memory; the db and the message are updated in background
+    await ictx.defer(update=True)
+    poll = await Poll.from_message_id(ctx_message_id, bot)
+    if not poll:
         log.debug("no poll record found")
         return
 
-    option_id = await PollManager.fetch_option_id(
-        record["poll_id"], 
-        letter
-    )
+    option_id = poll.option_id_by_reaction(letter)
     if not option_id:
         log.debug("no option id found")
         return
     
-    await PollManager.remove_vote(record["poll_id"], ictx.author.id)
-    # check if option in fetched record
-    # if yes update poll and insert to votes
-    await PollManager.add_vote(
-        poll_id=record["poll_id"], 
-        user_id=ictx.author.id, 
-        option_id=option_id,
-    )
-    # create poll object
-    poll = Poll(record, bot)
-    # update all poll values to the current status
-    await poll.fetch()
-    # dispatch the message
-    await poll.dispatch_embed(ictx)
+    if poll.vote(ictx.author.id, option_id):
+        poll.schedule_embed_update()
 
 
 
@@ -208,13 +196,14 @@ class PollCommand(
         message = await (await ctx.respond("Wait...")).message()
         dummy_record["message_id"] = message.id
 
-        record = await PollManager.add_poll(**dummy_record)
-        for letter, option in zip("ABCDEFGHIJKLMNOPQRSTUVWXYZ", options):
-            await PollManager.add_poll_option(
-                poll_id=record["poll_id"], 
-                reaction=letter, 
-                description=option
-            )
+        async with bot.db.unit_of_work():
+            record = await PollManager.add_poll(**dummy_record)
+            for letter, option in zip("ABCDEFGHIJKLMNOPQRSTUVWXYZ", options):
+                await PollManager.add_poll_option(
+                    poll_id=record["poll_id"], 
+                    reaction=letter, 
+                    description=option
+                )
         poll = Poll(record, bot)
         await poll.fetch()
         await poll.dispatch_embed(ctx, content="")
@@ -19,7 +19,6 @@ import lightbulb
 import lightbulb.utils as lightbulb_utils
 from lightbulb import Context, SlashCommand, invoke
 import hikari
-from numpy import isin
 import apscheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
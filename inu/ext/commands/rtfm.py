@@ -13,6 +13,8 @@ import re
 import zlib
 import io
 import os
+import json
+import time
 import ssl
 ssl._create_default_https_context = ssl._create_unverified_context
 
@@ -31,7 +33,8 @@ from fuzzywuzzy import fuzz
 from cachetools import LRUCache, cached
 
 from utils import Colors
-from utils import Paginator
+from utils import Paginator, HttpClient
+from utils.rtfm_index import InventoryIndex
 
 from core import getLogger, Inu, InuContext
 
@@ -41,7 +44,15 @@ loader = lightbulb.Loader()
 bot: Inu = Inu.instance
 
 
+# docs url -> {object name: url}
 rtfm_cache = {}
+# docs url -> index of the object names
+rtfm_index: typing.Dict[str, InventoryIndex] = {}
+# parsed inventories are stored here, so that they are not fetched again after a restart
+RTFM_CACHE_DIR = os.path.join(os.getcwd(), "inu/data/bot/rtfm")
+INVENTORY_MAX_AGE = 8 * 60 * 60
+# amount of names which are scored with fuzzywuzzy per search
+MAX_CANDIDATES = 300
 DOCS = {
     'hikari-lightbulb': 'https://hikari-lightbulb.readthedocs.io/en/latest',
     'python': 'https://docs.python.org/3',
@@ -54,7 +65,7 @@ async def rtfm_autocomplete(
     docs: List[str]
 ) -> List[str]:
     if not rtfm_cache:
-        await _update_rtfm_cache()
+        await _update_rtfm_cache(max_age=INVENTORY_MAX_AGE)
     results = search(
         search_for=option.value,
         docs=tuple(docs),
@@ -176,26 +187,22 @@ class SpecificSphinxFileReader(SphinxObjectFileReader):
 
         return result
 
-@cached(LRUCache(128*1024))
+search_cache = LRUCache(128*1024)
+
+@cached(search_cache)
 def search(search_for, docs: tuple, case_sensitive=True):
-    found = []
-    # if not case_sensitive:
-    #     search_for = search_for.lower()
-    # for item in iterable:
-    #     if (start := item.lower().find(search_for)) >= 0:
-    #         found.append((start, item))
-    iterable = [item for d in docs for item in rtfm_cache[DOCS[d]]]
+    """
+    Names containing <search_for>, or if there are none, names similar to it;
+    ordered by `fuzz.token_sort_ratio`. The candidates are taken from `rtfm_index`
+    """
+    indexes = [rtfm_index[DOCS[d]] for d in docs if DOCS[d] in rtfm_index]
+    contained = [item for index in indexes for item in index.containing(search_for, MAX_CANDIDATES)]
+    candidates = contained or [item for index in indexes for item in index.similar(search_for, MAX_CANDIDATES)]
     ratios = []
-    for item in iterable:
+    for item in candidates:
         r = fuzz.token_sort_ratio(search_for, item)
-        if r > 40 or search_for in item:
+        if r > 40 or contained:
             ratios.append({"item": item, "ratio": r})
-    if (new_r := [r for r in ratios if search_for in r["item"]]):
-        ratios = new_r
-    def sort_key(tup):
-        return tup[0]
-
-    # return [name for distance, name in sorted(found, key=sort_key) if distance <= max_distance]
     ratios.sort(key=lambda d: d["ratio"], reverse=True)
     return ratios[:24]
 
@@ -205,6 +212,8 @@ def search(search_for, docs: tuple, case_sensitive=True):
 async def init_rtfm():
     try:
         await asyncio.sleep(10)
+        if not rtfm_cache:
+            await _update_rtfm_cache(max_age=INVENTORY_MAX_AGE)
         trigger = IntervalTrigger(hours=8)
         bot.scheduler.add_job(_update_rtfm_cache, trigger)
         log.info(f"scheduled {_update_rtfm_cache.__name__}: {trigger}", prefix="init")
@@ -273,7 +282,7 @@ def get_docs_name_form(url):
 
 async def send_manual(ctx, key: Union[str, list], obj):
     if not rtfm_cache:
-        await _update_rtfm_cache()
+        await _update_rtfm_cache(max_age=INVENTORY_MAX_AGE)
     keys = []
     results = []
     if isinstance(key, str):
@@ -314,22 +323,66 @@ async def send_manual(ctx, key: Union[str, list], obj):
     )
     await paginator.start(ctx)
 
-async def _update_rtfm_cache() -> None:
-    session = aiohttp.ClientSession(loop=asyncio.get_running_loop())
+def _inventory_path(name: str) -> str:
+    return os.path.join(RTFM_CACHE_DIR, f"{name}.json")
+
+
+def _load_inventory(name: str, url: str, max_age: float) -> Optional[typing.Dict[str, str]]:
+    """the stored inventory of <name>, if it's younger than <max_age> seconds"""
+    try:
+        with open(_inventory_path(name), "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored.get("url") != url or time.time() - stored.get("fetched_at", 0) > max_age:
+        return None
+    return stored["objects"]
+
+
+def _store_inventory(name: str, url: str, objects: typing.Dict[str, str]) -> None:
+    try:
+        os.makedirs(RTFM_CACHE_DIR, exist_ok=True)
+        with open(_inventory_path(name), "w", encoding="utf-8") as f:
+            json.dump({"url": url, "fetched_at": time.time(), "objects": objects}, f)
+    except OSError:
+        log.warning(f"can't store inventory of {name}", exc_info=True)
+
+
+def _parse_inventory(name: str, url: str, buffer: bytes) -> typing.Tuple[typing.Dict[str, str], InventoryIndex]:
+    objects = SpecificSphinxFileReader(buffer, url, auto=True).result
+    _store_inventory(name, url, objects)
+    return objects, InventoryIndex(objects)
+
+
+def _load_and_index(name: str, url: str, max_age: float) -> Optional[typing.Tuple[typing.Dict[str, str], InventoryIndex]]:
+    if (objects := _load_inventory(name, url, max_age)) is None:
+        return None
+    return objects, InventoryIndex(objects)
+
+
+async def _update_rtfm_cache(max_age: float = 0) -> None:
+    """
+    Fetches, parses and indexes the inventories of `DOCS`
+
+    Args:
+    -----
+    max_age : float
+        stored inventories younger than this (in seconds) are used instead of fetching them
+    """
     for name, url in DOCS.items():
         try:
-            async with session.get(url + "/objects.inv") as resp:
+            # parsing and indexing takes a while for big inventories
+            loaded = await asyncio.to_thread(_load_and_index, name, url, max_age) if max_age else None
+            if loaded is None:
+                resp = await HttpClient().fetch(url + "/objects.inv")
                 if resp.status != 200:
                     raise RuntimeError(f"{url} can't be fetched. Exited with Error code {resp.status}")
-                inv_file = SpecificSphinxFileReader(
-                    await resp.read(),
-                    url,
-                    auto=True,
-                )
-                rtfm_cache[url] = inv_file.result
+                loaded = await asyncio.to_thread(_parse_inventory, name, url, resp.body)
+            rtfm_cache[url], rtfm_index[url] = loaded
+            log.debug(f"indexed {len(rtfm_index[url])} objects of {name}", prefix="cache")
         except Exception:
             log.error(traceback.format_exc())
-    await session.close()
+    search_cache.clear()
     return
 
 
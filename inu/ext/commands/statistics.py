@@ -1,7 +1,5 @@
-from copy import deepcopy
 from datetime import datetime, timedelta
 from typing import *
-import random
 from io import BytesIO
 import traceback
 import asyncio
@@ -32,22 +30,9 @@ from lightbulb.prefab import sliding_window
 from hikari.impl import MessageActionRowBuilder
 from lightbulb import Context, Loader, Group, SubGroup, SlashCommand, invoke
 from lightbulb.prefab import sliding_window
-import matplotlib
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.patches import PathPatch
-from matplotlib.path import Path
-from matplotlib.axes import Axes
-import colorcet as cc
 import pandas as pd
-import seaborn as sn
-import mplcyberpunk
-from pandas.plotting import register_matplotlib_converters
-from matplotlib.dates import DateFormatter
-import matplotlib.ticker as plticker 
 import humanize
 from tabulate import tabulate
-from numpy import datetime64, timedelta64, uint8
 
 from utils import (
     Human, 
@@ -55,8 +40,7 @@ from utils import (
     CurrentGamesManager,
     TimezoneManager,
     SettingsManager,
-    get_date_format_by_timedelta,
-    ts_round,
+    RenderService,
     Games,
     YES, NO, YES_NO
 )
@@ -74,18 +58,10 @@ log = getLogger(__name__)
 
 loader = lightbulb.Loader()
 bot: Inu
-register_matplotlib_converters()
 
 
 # mapping from guild to list with top games in it
 top_games_cache = {}
-RC_PARAMS = deepcopy(plt.rcParams)
-def switch_backend():
-    """
-    Method for switching backend between statistics and latex
-    """
-    matplotlib.use("agg")
-    plt.rcParams.update(RC_PARAMS)
 
 
 async def maybe_raise_activity_tracking_disabled(guild_id: int):
@@ -413,41 +389,10 @@ class WeekActivity(
 class GameViews:
     """
     A class for rendering game activity graphs
-    """
-    def highlight_weekends(self, ax: Axes, df_summarized: pd.DataFrame, y_position: float, height: float) -> None:
-        """
-        Highlights the weekends in the graph as bar above the x-axis
-        """
-        min_date: pd.Series = df_summarized['r_timestamp'].min()
-        max_date: pd.Series = df_summarized['r_timestamp'].max()
-        dates: pd.DatetimeIndex = pd.date_range(start=min_date, end=max_date, freq='D')
-        
-        for date in dates:
-            if date.weekday() >= 5:  # 5 and 6 represent Saturday and Sunday
-                start: float = ax.get_xaxis().convert_units(date - pd.Timedelta(days=1))
-                end: float = ax.get_xaxis().convert_units(date)
-                width: float = end - start
-                
-                y_min, y_max = [0.95, 1]
-                height: float = y_max - y_min
-                #y_position = ax.get_ylim()[0] - ax.get_ylim()[0]*0.05
-                
-                path: Path = self.rounded_rectangle(start, y_position, width, height, radius=0)
-                patch: PathPatch = PathPatch(path, facecolor='lightgray', alpha=0.2, edgecolor='none')
-                ax.add_patch(patch)
-        
-        ax.autoscale()
-
-    def highlight_weekend_labels(self, ax: Axes) -> None:
-        """
-        highlights the x-axis labels of the weekends
-        """
-        for label in ax.get_xticklabels():
-            date: datetime = mdates.num2date(label.get_position()[0])
-            if date.weekday() >= 5:  # 5 and 6 represent Saturday and Sunday
-                label.set_color('mediumslateblue')
-
 
+    The data is fetched here, the pictures are rendered in the
+    worker processes of `RenderService` (see `utils.charts`)
+    """
     async def build_activity_graph(
         self,
         guild_id: int,
@@ -468,197 +413,19 @@ class GameViews:
         - Tuple[BytesIO, Dataset]: A tuple containing the graph image as a BytesIO object and the summarized dataset.
 
         """
-
-        picture_buffer = BytesIO()
-
         df = await CurrentGamesManager.fetch_activities(
             guild_id=guild_id, 
             since=datetime.now() - since,
             activity_filter=activities,
         )
-        old_row_amount = len(df.index)
-        # drop NaN values (r_timestamp bc of rounding issues)
-        df.dropna(axis=0, how='any', subset=None, inplace=True)
-        df.set_index(keys="r_timestamp", inplace=True)
-        if old_row_amount != (new_row_amount := len(df.index)):
-            log.warning(f"missing rows ({old_row_amount - new_row_amount}) in guild {guild_id}")
-
-        X_LABLE_AMOUNT: int = 15  # about
-        base = None
-        df_start: datetime = df.index.min()
-        until: datetime = df.index.max()
-        df_timedelta: timedelta = until - df_start
-
-        if df_timedelta >= timedelta(days=20):
-            resample_delta = df_timedelta / 20
-        elif df_timedelta >= timedelta(days=4.5):
-            resample_delta = timedelta(days=1)
-        else:
-            resample_delta = df_timedelta / 13
-        
-            if resample_delta.total_seconds() < 60*10:
-                resample_delta = timedelta(minutes=10)
-
-        def normalize_delta(delta: timedelta, resample_rate: timedelta):
-            """normalize the timedelta, to make the chart better readable"""
-            references = [
-                {timedelta(hours=6): timedelta(seconds=300)},
-                {timedelta(hours=12): timedelta(hours=0.25)},
-                {timedelta(days=1): timedelta(hours=0.5)},
-                {timedelta(days=3): timedelta(hours=1)},
-                {timedelta(days=5): timedelta(hours=3)},
-                {timedelta(days=10): timedelta(hours=6)},
-                {timedelta(days=20): timedelta(hours=12)}
-            ]
-            nearest = [list(references[0].keys())[0], list(references[0].values())[0]]
-            difference = abs(delta.total_seconds() - nearest[0].total_seconds())
-            for entry in references:
-                for key, value in entry.items():
-                    if (diff := abs(delta.total_seconds() - key.total_seconds())) < difference:
-                        difference = diff
-                        nearest = [key, value]
-            return ts_round(resample_rate, nearest[1])
-        
-        resample_delta = normalize_delta(df_timedelta, resample_delta)
-
-        # resampeling dataframe
-        # group by game 
-        # and resample hours to `resample_delta` and sum them up
-        activity_series: pd.Series = df.groupby("game")["hours"].resample(resample_delta).sum()
-        df_summarized: pd.DataFrame = activity_series.to_frame().reset_index()
-        # normalize timestamps to avoid uneven tick rates
-        df_summarized["r_timestamp"] = df_summarized["r_timestamp"].dt.round(resample_delta)
-
-        # set before and after game to 0
-        games = set(df_summarized["game"])
-        last_date = max(df_summarized["r_timestamp"])
-
-        def game_add_zero_r(game_name: str):
-            """Adds entries to the dataframe, so that chart is 0 instead of missing"""
-            nonlocal df_summarized
-            game_df: pd.DataFrame = df_summarized[df_summarized["game"] == game_name]
-            added_zero = True
-            prev_date: datetime = game_df.iloc[0]["r_timestamp"]
-            to_add: Dict[str, Any] = {
-                "game": [],
-                "hours": [],
-                "r_timestamp": [],
-            }
-            def add_row(dt: Optional[datetime] = None):
-                to_add["game"].append(game_name)
-                to_add["hours"].append(0)
-                to_add["r_timestamp"].append(dt or prev_date + resample_delta,)
-
-            for _, row in game_df.iterrows():
-                date = row["r_timestamp"]
-                if date - prev_date > resample_delta and not added_zero:
-                    # missing row of a specific time
-                    # add this row with hours=0
-                    add_row()
-                    added_zero = True
-                else:
-                    added_zero = False
-                prev_date = date
-            if last_date - prev_date >= resample_delta:
-                add_row()
-            else:
-                pass
-            df_summarized = pd.concat([df_summarized, pd.DataFrame(to_add)])
-
-        min_date = min(df_summarized["r_timestamp"])
-
-        def game_add_zero_l(game_name: str):
-            """Adds entries to the dataframe, so that chart is 0 instead of missing"""
-            nonlocal df_summarized
-            game_df: pd.DataFrame = df_summarized[df_summarized["game"] == game_name]
-            added_zero = True
-            prev_date: datetime = game_df.iloc[-1]["r_timestamp"]
-            to_add: Dict[str, Any] = {
-                "game": [],
-                "hours": [],
-                "r_timestamp": [],
-            }
-            def add_row(dt: Optional[datetime] = None):
-                to_add["game"].append(game_name)
-                to_add["hours"].append(0)
-                to_add["r_timestamp"].append(dt or prev_date - resample_delta,)
-
-            for _, row in reversed([*game_df.iterrows()]):
-                date = row["r_timestamp"]
-                if prev_date - date > resample_delta and not added_zero:
-                    # missing row of a specific time
-                    # add this row with hours=0
-                    add_row()
-                    added_zero = True
-                else:
-                    added_zero = False
-                prev_date = date
-            if prev_date - min_date >= resample_delta:
-                add_row()
-            else:
-                pass
-            df_summarized = pd.concat([df_summarized, pd.DataFrame(to_add)])
-
-        for game in games:
-            # make line graphs start at 0 and end at 0
-            game_add_zero_r(game)
-            game_add_zero_l(game)
-
-        df_summarized.reset_index(inplace=True)
-
-        # color and style preparations
-        color_paletes = ["magma_r", "rocket_r", "mako_r"]
-        clean_color_paletes = [sn.color_palette(cc.glasbey, n_colors=len(activities))]#["Set3", "Set2"]
-        color = random.choice(clean_color_paletes) if distinguishable_colors else random.choice(color_paletes)
-        
-        switch_backend()
-        plt.style.use("cyberpunk")
-        sn.set_palette("bright")
-        sn.set_context("notebook", font_scale=1.4, rc={"lines.linewidth": 1.5})
-
-        
-        #Create chart
-        fig, ax1 = plt.subplots(figsize=(21,9))
-        ax1.set_xticks(df_summarized['r_timestamp'])
-        fig.set_tight_layout(True)
-        sn.despine(offset=20)
-        ax: matplotlib.axes.Axes = sn.lineplot(
-            x='r_timestamp', 
-            y='hours', 
-            data=df_summarized,
-            hue="game", 
-            hue_order=activities,
-            legend="auto", 
-            markers=False,
-            palette=color,
-            ax=ax1,
-        )
-
-        # style chart
-        mplcyberpunk.add_glow_effects(ax=ax)
-
-        # set date formatter with guild tz
-        date_format = get_date_format_by_timedelta(df_timedelta)
         tz = await TimezoneManager.fetch_timezone(guild_or_author_id=guild_id)
-        date_form = DateFormatter(date_format, tz=tz)
-        ax.xaxis.set_major_formatter(date_form)
-
-        ax.set_ylabel("Hours")
-        ax.set_xlabel(f"Date (rounded to {humanize.naturaldelta(resample_delta)})",)
-
-        # Highlight weekend areas and labels
-        y_min, y_max = ax.get_ylim()
-        highlight_height = (y_max - y_min) * 0.05  # 5% of the plot height
-        highlight_position = y_min + (y_max - y_min) * 1  # 100% above the bottom of the plot
-        self.highlight_weekends(ax, df_summarized, highlight_position, highlight_height)
-        if resample_delta < timedelta(days=23):
-            self.highlight_weekend_labels(ax)
-        
-        # save chart
-        figure = fig.get_figure()    
-        figure.savefig(picture_buffer, dpi=100)
-        picture_buffer.seek(0)
-        return picture_buffer, df_summarized
+        picture, df_summarized = await RenderService().render_activity_chart(
+            df,
+            activities,
+            tz=tz,
+            distinguishable_colors=distinguishable_colors,
+        )
+        return BytesIO(picture), df_summarized
 
 
     async def build_week_activity_chart(
@@ -684,100 +451,6 @@ class GameViews:
             datetime.now() - since,
             ignore_activities=remove,
         )
-
-        #rolling_mean_days = 3
-        mean_hours = df["hours"].median()
-        
-        # mean hours total
-        df['mean'] = mean_hours
-
-        # mean hours per <rolling_mean_days>
-        df_dt_range = df['datetime'].max() - df['datetime'].min()
-        cols = ['mean', 'hours']
-        if since >= timedelta(days=40):
-            rolling_mean = int(df_dt_range.days / 12)
-            df['dynamic mean'] = df['hours'].rolling(window=rolling_mean, center=True).mean()
-            df['dynamic mean'].interpolate(inplace=True)
-            df['dynamic mean'].fillna(value=mean_hours, inplace=True)
-            cols.append('dynamic mean')
-            # df["dynamic mean"] = df["hours"].resample(df_dt_range / 8)
-
-        # fill in NaN values with total mean
-
-
-        # melt dataframe, that seaplot can plot all lines together
-        df = df.melt(id_vars =['datetime'], value_vars =cols, var_name ='line kind')
-
-        # sort by datetime column
-        df.sort_values(by='datetime', inplace=True)
-
-        # style preparations
-        color_paletes = ["magma", "rocket", "mako"]
-
-        switch_backend()
-        plt.style.use("cyberpunk")
-        sn.set_palette("bright")
-        sn.set_context("notebook", font_scale=1.4, rc={"lines.linewidth": 1.5})
-
-        #Create graph
-        fig, ax1 = plt.subplots(figsize=(21,9))
-        fig.set_tight_layout(True)
-        sn.despine(offset=20)
-        picture_buffer = BytesIO()
-
-        ax = sn.lineplot(
-            x = "datetime", 
-            y = 'value', 
-            data = df,
-            palette = random.choice(color_paletes),  
-            ax=ax1,
-            hue="line kind",
-            legend="brief",
-        )
-
-        X_LABLE_AMOUNT: int = 20  # about
-        base = round(df_dt_range.days / X_LABLE_AMOUNT, 0)  # base have to be .0, otherwise not matching with plot peaks
-        base = 1 if base < 1 else base
-        loc = plticker.MultipleLocator(base=base)  # this locator puts ticks at regular intervals (when float is .0)
-        ax.xaxis.set_major_locator(loc)
-        ax.figure.autofmt_xdate(rotation=45)
-
-        mplcyberpunk.add_glow_effects(ax=ax)
-        ax.set_ylabel("Hours")
-        ax.set_xlabel("")
-        date_format = get_date_format_by_timedelta(df_dt_range)
-        date_form = DateFormatter(date_format)
-        ax.xaxis.set_major_formatter(date_form)
-        
-        # save graph
-        figure = fig.get_figure()    
-        figure.savefig(picture_buffer, dpi=100)
-        picture_buffer.seek(0)
-        return picture_buffer, df
-
-
-
-    def rounded_rectangle(self, x: float, y: float, width: float, height: float, radius: float) -> Path:
-        """Generates a rounded rectangle path"""
-        path_data: List[Tuple[uint8, Tuple[float, float]]] = [
-            (Path.MOVETO, (x + radius, y)),
-            (Path.LINETO, (x + width - radius, y)),
-            (Path.CURVE4, (x + width, y)),
-            (Path.CURVE4, (x + width, y + radius)),
-            (Path.LINETO, (x + width, y + height - radius)),
-            (Path.CURVE4, (x + width, y + height)),
-            (Path.CURVE4, (x + width - radius, y + height)),
-            (Path.LINETO, (x + radius, y + height)),
-            (Path.CURVE4, (x, y + height)),
-            (Path.CURVE4, (x, y + height - radius)),
-            (Path.LINETO, (x, y + radius)),
-            (Path.CURVE4, (x, y)),
-            (Path.CURVE4, (x + radius, y)),
-            (Path.CLOSEPOLY, (x + radius, y))
-        ]
-        
-        codes, verts = zip(*path_data)
-        return Path(verts, codes)
-
-
+        picture, df = await RenderService().render_week_activity_chart(df, since)
+        return BytesIO(picture), df
 
@@ -3,7 +3,6 @@ import logging
 import typing
 from datetime import datetime
 from typing import *
-from numpy import full, isin
 
 import aiohttp
 import hikari
@@ -3,7 +3,6 @@ import logging
 import typing
 from datetime import datetime
 from typing import *
-from numpy import full, isin
 
 import aiohttp
 import hikari
@@ -28,7 +27,6 @@ from hikari.impl import MessageActionRowBuilder
 from lightbulb import commands, context, Loader, Group, SubGroup, SlashCommand, invoke
 from lightbulb.context import Context
 from lightbulb.prefab import sliding_window
-from matplotlib.style import available
 from typing_extensions import Self
 
 
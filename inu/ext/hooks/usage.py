@@ -1,12 +1,17 @@
+import logging
+import traceback
+
 import hikari
 import lightbulb
+from apscheduler.triggers.interval import IntervalTrigger
 
-from core import logging, getLogger
+from core import getLogger, Inu
 from utils import InvokationStats
 
 log = getLogger(__name__)
 
 loader = lightbulb.Loader()
+SCHEDULED = False
 
 @lightbulb.hook(lightbulb.ExecutionSteps.POST_INVOKE)
 async def record_command_metrics(_: lightbulb.ExecutionPipeline, ctx: lightbulb.Context) -> None:
@@ -14,7 +19,33 @@ async def record_command_metrics(_: lightbulb.ExecutionPipeline, ctx: lightbulb.
     try:
         cmd_name = ctx.command_data.qualified_name
         log.info(f"{cmd_name} invoked by {ctx.user.display_name}")
-        await InvokationStats.add_or_sub(cmd_name, ctx.guild_id, 1)
+        InvokationStats.increment(cmd_name, ctx.guild_id, 1)
+    except Exception:
+        log.error("Failed to record command usage", exc_info=True)
+        return
+
+
+async def flush_command_metrics():
+    try:
+        await InvokationStats.flush()
     except Exception:
-        log.error("Failed to defer command response", exc_info=True)
-        return
\ No newline at end of file
+        log.error(f"Failed to flush command usage:\n{traceback.format_exc()}")
+
+
+@loader.listener(hikari.ShardReadyEvent)
+async def load_tasks(event: hikari.ShardReadyEvent):
+    global SCHEDULED
+    if SCHEDULED:
+        return
+    SCHEDULED = True
+    # this module is imported by main.py before `Inu` is created
+    bot = Inu.instance
+    trigger = IntervalTrigger(seconds=bot.conf.commands.get("usage_flush_time", 30))
+    log.info(f"scheduled job for flushing command usage: {trigger}", prefix="init")
+    bot.scheduler.add_job(flush_command_metrics, trigger)
+    logging.getLogger('apscheduler.executors.default').setLevel(logging.WARNING)
+
+
+@loader.listener(hikari.StoppingEvent)
+async def on_stopping(event: hikari.StoppingEvent):
+    await flush_command_metrics()
@@ -11,6 +11,7 @@ import logging
 from datetime import datetime, timedelta
 import time
 import traceback
+from dataclasses import dataclass, field
 
 import lightbulb
 import hikari
@@ -19,6 +20,7 @@ import apscheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from utils.db import BoardManager
 import asyncpg
+from cachetools import LRUCache
 
 from core import Table, getLogger, Inu
 from utils import make_message_link, Colors, Multiple, Human
@@ -28,6 +30,14 @@ BOARD_SYNC_TIME = 60*60*24
 bot: Inu = Inu.instance
 BOARD_SYNC_TIME = bot.conf.commands.board_sync_time * 60 * 60
 SYNCING = False
+# the time in seconds, reactions of a message are collected before its board message is updated
+BOARD_UPDATE_DELAY = 2
+# mapping from message_id to a snapshot of recent messages in guilds with boards
+message_snapshots: LRUCache[int, Dict[str, Any]] = LRUCache(maxsize=5000)
+# mapping from (message_id, emoji) to the reaction changes, which are not applied yet
+pending_updates: Dict[Tuple[int, str], "PendingBoardUpdate"] = {}
+# mapping from (message_id, emoji) to the task, which applies its pending updates one after another
+update_tasks: Dict[Tuple[int, str], asyncio.Task] = {}
 
 plugin = lightbulb.Loader()
 
@@ -62,80 +72,166 @@ async def clean_boards():
     if records:
         log.info(f"deleted {Human.plural_('board-entry', len(records), with_number=True)}", prefix="task")
 
-@plugin.listener(hikari.GuildReactionAddEvent)
-async def on_reaction_add(event: hikari.GuildReactionAddEvent):
-    log.debug(f"REACTION ADD receiving: {event.emoji_name}")
-    # insert to board
+@dataclass
+class PendingBoardUpdate:
+    guild_id: int
+    channel_id: int
+    message_id: int
+    emoji: str
+    # mapping from user_id to whether the reaction was added (True) or removed (False)
+    reactions: Dict[int, bool] = field(default_factory=dict)
+    last_user_id: Optional[int] = None
+
+
+def make_snapshot(message: hikari.Message) -> Dict[str, Any]:
+    """Extracts everything a board entry needs from <message>"""
+    attachment_urls = [str(a.url) for a in message.attachments]
+    content = message.content or ""
+    # add first embed to content
+    if len(message.embeds) > 0:
+        if message.embeds[0].title:
+            content += f"\n**{message.embeds[0].title}**"
+        if message.embeds[0].description:
+            content += f"\n{message.embeds[0].description}"
+        if message.embeds[0].image:
+            attachment_urls.append(str(message.embeds[0].image.url))
+    # put picture things in front. Otherwise Python bug
+    attachment_urls.sort(key=lambda a: Multiple.endswith_(a, [".jpg", ".png", ".webp"]), reverse=True)
+    return {
+        "author_id": message.author.id,
+        "channel_id": message.channel_id,
+        "content": content,
+        "attachment_urls": attachment_urls,
+    }
 
-    # guild has no board with this reaction
-    if not BoardManager.has_emoji(event.guild_id, event.emoji_name):
-        log.debug(f"emoji not tracked")
+
+@plugin.listener(hikari.GuildMessageCreateEvent)
+async def on_message_create(event: hikari.GuildMessageCreateEvent):
+    # board candidates; spares fetching the message when it gets its first reaction
+    if not BoardManager.has_board(event.guild_id):
         return
-    
-    message: Optional[hikari.Message] = None
-    entry = await BoardManager.fetch_entry(event.message_id, event.emoji_name)
-    if not entry:
-        log.debug(f"no entry found => add entry")
-        message = await bot.rest.fetch_message(event.channel_id, event.message_id)
-        if not message:
-            log.debug(f"reaction message not found")
+    message_snapshots[event.message_id] = make_snapshot(event.message)
+
+
+@plugin.listener(hikari.GuildMessageUpdateEvent)
+async def on_message_update(event: hikari.GuildMessageUpdateEvent):
+    # the snapshot is outdated; the message will be fetched when it gets its first reaction
+    message_snapshots.pop(event.message_id, None)
+
+
+def queue_board_update(
+    guild_id: int,
+    channel_id: int,
+    message_id: int,
+    emoji: str,
+    user_id: int,
+    added: bool,
+) -> None:
+    """
+    Collects reaction changes of (message_id, emoji) for `BOARD_UPDATE_DELAY` seconds,
+    so that a burst of reactions results in one update of the board message
+    """
+    key = (message_id, emoji)
+    update = pending_updates.get(key)
+    if update is None:
+        update = PendingBoardUpdate(guild_id, channel_id, message_id, emoji)
+        pending_updates[key] = update
+    update.reactions[user_id] = added
+    update.last_user_id = user_id
+    if key not in update_tasks:
+        update_tasks[key] = asyncio.create_task(flush_board_updates(key))
+
+
+async def flush_board_updates(key: Tuple[int, str]):
+    """
+    Applies the updates of <key> one after another, until none is pending.
+    Reactions which arrive while an update is applied, are applied afterwards
+    """
+    try:
+        while key in pending_updates:
+            await asyncio.sleep(BOARD_UPDATE_DELAY)
+            await flush_board_update(pending_updates.pop(key))
+    finally:
+        update_tasks.pop(key, None)
+
+
+async def flush_board_update(update: PendingBoardUpdate):
+    try:
+        await apply_board_update(update)
+    except hikari.NotFoundError as e:
+        if not e.code == 10003:
+            # not a unknown channel
             return
-        attachment_urls = [str(a.url) for a in message.attachments]
-        content = message.content or ""
-        # add first embed to content
-        if len(message.embeds) > 0:
-            if message.embeds[0].title:
-                content += f"\n**{message.embeds[0].title}**"
-            if message.embeds[0].description:
-                content += f"\n{message.embeds[0].description}"
-            if message.embeds[0].image:
-                attachment_urls.append(str(message.embeds[0].image.url))
-        # put picture things in front. Otherwise Python bug
-        attachment_urls.sort(key=lambda a: Multiple.endswith_(a, [".jpg", ".png", ".webp"]), reverse=True)
-        if not message:
-            log.debug("message not found")
+        log.info(f"[Deleted] {update.emoji}-baord in guild {update.guild_id} because of unknown channel")
+        try:
+            await BoardManager.remove_board(update.guild_id, update.emoji)
+        except Exception:
+            log.error(traceback.format_exc())
+    except Exception:
+        log.error(traceback.format_exc())
+
+
+async def apply_board_update(update: PendingBoardUpdate):
+    added = [user_id for user_id, is_added in update.reactions.items() if is_added]
+    removed = [user_id for user_id, is_added in update.reactions.items() if not is_added]
+    message_id, emoji = update.message_id, update.emoji
+
+    entry = await BoardManager.fetch_entry(message_id, emoji)
+    if not entry:
+        if not added:
+            log.debug(f"message not tracked")
             return
+        log.debug(f"no entry found => add entry")
+        snapshot = message_snapshots.get(message_id)
+        if snapshot is None:
+            message = await bot.rest.fetch_message(update.channel_id, message_id)
+            if not message:
+                log.debug(f"reaction message not found")
+                return
+            snapshot = make_snapshot(message)
         # add entry
         entry = (await BoardManager.add_entry(
-            guild_id=event.guild_id,
-            message_id=event.message_id,
-            author_id=message.author.id or event.user_id,
-            channel_id=message.channel_id,
-            emoji=event.emoji_name,
-            content=content,
-            attachment_urls=attachment_urls,
+            guild_id=update.guild_id,
+            message_id=message_id,
+            author_id=snapshot["author_id"] or update.last_user_id,
+            channel_id=snapshot["channel_id"],
+            emoji=emoji,
+            content=snapshot["content"],
+            attachment_urls=list(snapshot["attachment_urls"]),
         ))[0]
 
-    # add a reaction
     log.debug(f"{entry=}")
-    log.debug("add a reaction to db")
-    try:
-        await BoardManager.add_reaction(
-            guild_id=event.guild_id,
-            message_id=event.message_id,
-            reacter_id=event.user_id,
-            emoji=event.emoji_name,
-        )
-    except asyncpg.UniqueViolationError:
-        log.debug(f"Violation error - reaction was already added")
-    try:
-        await update_message(entry, message, optional_author_id=event.user_id)
-    except hikari.NotFoundError as e:
-        if not e.code == 10003:
-            # not a unknown channel
+    await BoardManager.update_reactions(message_id, emoji, added, removed)
+    if (amount := await BoardManager.fetch_entry_reaction_amount(message_id, emoji)) == 0:
+        # delete board entry
+        log.debug(f"entry has {amount} reactions -> removing it")
+        removed_entry = await BoardManager.remove_entry(message_id, emoji)
+        if not removed_entry or not removed_entry[0]["board_message_id"]:
+            log.debug(f"No board message was deleted")
             return
-        log.info(f"[Deleted] {event.emoji_name}-baord in guild {event.guild_id} because of unknown channel")
-        await BoardManager.remove_board(event.guild_id, event.emoji_name)
-
+        board = await BoardManager.fetch_board(update.guild_id, emoji)
+        await bot.rest.delete_message(board["channel_id"], removed_entry[0]["board_message_id"])
+        log.debug(f"message {removed_entry[0]['board_message_id']} deleted")
+    else:
+        await update_message(entry, reaction_amount=amount, optional_author_id=update.last_user_id)
 
 
+@plugin.listener(hikari.GuildReactionAddEvent)
+async def on_reaction_add(event: hikari.GuildReactionAddEvent):
+    log.debug(f"REACTION ADD receiving: {event.emoji_name}")
+    # guild has no board with this reaction
+    if not BoardManager.has_emoji(event.guild_id, event.emoji_name):
+        log.debug(f"emoji not tracked")
+        return
+    queue_board_update(
+        event.guild_id, event.channel_id, event.message_id, 
+        event.emoji_name, event.user_id, added=True
+    )
 
-    # method for updating a message in a board
 
 @plugin.listener(hikari.GuildReactionDeleteEvent)
 async def on_reaction_remove(event: hikari.GuildReactionDeleteEvent):
     log = getLogger(__name__, "REACTION REMOVE")
-    # delete from board
     emoji = event.emoji_name
     log.debug(f"receiving: {emoji}")
 
@@ -143,43 +239,16 @@ async def on_reaction_remove(event: hikari.GuildReactionDeleteEvent):
     if not BoardManager.has_emoji(event.guild_id, event.emoji_name):
         log.debug(f"emoji not tracked")
         return
-
-    # board don't has this message -> create entry
-    if not BoardManager.has_message_id(event.guild_id, event.emoji_name, event.message_id):
-        log.debug(f"message not tracked")
-        return
-    try:
-        removed_records = await BoardManager.remove_reaction(
-            guild_id=event.guild_id,
-            message_id=event.message_id,
-            reacter_id=event.user_id,
-            emoji=event.emoji_name,
-        )
-    except Exception:
-        log.warning(f"insertion error, which shouldn't occure.\n{traceback.format_exc()}")
-    # TODO: when a message has no reactions any more, delete it 
-    # (db will be cleared automatically -> when updating message results in error, delete message)
-    if not removed_records:
-        return
-    
-    if (amount := await BoardManager.fetch_entry_reaction_amount(event.message_id, emoji)) == 0:
-        # delete board entry
-        log.debug(f"entry has {amount} reactions -> removing it")
-        entry = await BoardManager.remove_entry(event.message_id, emoji)
-        if not entry:
-            log.debug(f"No entry was deleted ")
-            return
-        board = await BoardManager.fetch_board(event.guild_id, emoji)
-        await bot.rest.delete_message(board["channel_id"], entry[0]["board_message_id"])
-        log.debug(f"message {entry[0]['board_message_id']} deleted")
-    else:
-        entry = await BoardManager.fetch_entry(event.message_id, emoji)
-        await update_message(entry, reaction_amount=amount, optional_author_id=event.user_id)
+    queue_board_update(
+        event.guild_id, event.channel_id, event.message_id, 
+        emoji, event.user_id, added=False
+    )
 
 
 
 @plugin.listener(hikari.GuildMessageDeleteEvent)
 async def on_message_remove(event: hikari.GuildMessageDeleteEvent):
+    message_snapshots.pop(event.message_id, None)
     if not BoardManager.has_message_id(event.guild_id, None, event.message_id):
         return
     await BoardManager.remove_entry(event.message_id, None)
@@ -273,11 +342,6 @@ async def update_message(
 
     if not board_entry["board_message_id"]:
         # create new message and add message_id to entry
-        if not message:
-            raise RuntimeError(
-                "in update_message:\nif board entry gets created first time, a message musst be passed in"
-            )
-
         kwargs = {
             "attachments": board_entry['attachment_urls'],
             "embeds": embeds,
@@ -15,12 +15,11 @@ from hikari.presences import ActivityType
 import lightbulb
 import apscheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from asyncpg import StringDataRightTruncationError
 
 from utils import Reddit
 from core.db import Database
 from core import Inu
-from utils import CurrentGamesManager, Games
+from utils import CurrentGamesManager, Games, SettingsManager
 from utils import Columns as Col
 
 
@@ -34,36 +33,43 @@ bot = Inu.instance
 games: Dict[int, Dict[str, int]] = {}
 banned_act_names = ["Custom Status", "Hang Status", *Games.DONT_RECORD]
 
-async def fetch_current_games(bot: Inu):
+def sample_activities(bot: Inu, guild_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Counts the activities of the members of <guild_ids>.
+    The presences are taken from the gateway cache, hence no REST calls are made.
+
+    Returns:
+    --------
+    Dict[int, Dict[str, int]]
+        Mapping from guild_id to a mapping from activity name to amount of members doing it
+    """
     games: Dict[int, Dict[str, int]] = {}
-    guild: hikari.OwnGuild
-    now = datetime.now()
-    if now.hour == 0:
-        # TODO: write games to database
-        games = {}
-    for guild in await bot.rest.fetch_my_guilds():
-        for member in await bot.rest.fetch_members(guild.id):
-            if (presence := member.get_presence()) and not member.is_bot:
-                for activity in presence.activities:
-                    act_name = activity.name
-                    if act_name in banned_act_names:
-                        continue
-                    if act_name in Games.EMULATORS and activity.details:
-                        # if the activity is an emulator, add the game name to the activity name
-                        act_name = emulation_format(act_name, activity)
-                    if not games.get(guild.id):
-                        games[guild.id] = {}
-                    if act_name in games[guild.id]:
-                        games[guild.id][act_name] += 1
-                    else:
-                        games[guild.id][act_name] = 1
-    for guild_id, game_dict in games.items():
-        for game, amount in game_dict.items():
-            try:
-                await CurrentGamesManager.add(guild_id, game, amount)
-            except StringDataRightTruncationError:
-                log.warning(f"Current Games ignored: `{game}` with len of {len(game)}", prefix="task")
-                banned_act_names.append(game)
+    for guild_id in guild_ids:
+        for user_id, presence in bot.cache.get_presences_view_for_guild(guild_id).items():
+            if (user := bot.cache.get_user(user_id)) and user.is_bot:
+                continue
+            for activity in presence.activities:
+                act_name = activity.name
+                if act_name in banned_act_names:
+                    continue
+                if act_name in Games.EMULATORS and activity.details:
+                    # if the activity is an emulator, add the game name to the activity name
+                    act_name = emulation_format(act_name, activity)
+                guild_games = games.setdefault(guild_id, {})
+                guild_games[act_name] = guild_games.get(act_name, 0) + 1
+    return games
+
+
+async def fetch_current_games(bot: Inu):
+    tracking = await SettingsManager.fetch_activity_tracking_all()
+    guild_ids = [
+        guild_id for guild_id in bot.cache.get_guilds_view()
+        if tracking.get(guild_id)
+    ]
+    games = sample_activities(bot, guild_ids)
+    for game in await CurrentGamesManager.add_many(games):
+        log.warning(f"Current Games ignored: `{game}` with len of {len(game)}", prefix="task")
+        banned_act_names.append(game)
 
 def emulation_format(emulator: str, activity: hikari.RichActivity) -> str:
     """Goes through EmulationFormats to properly format to Game (Emulator)"""
@@ -127,6 +133,14 @@ class YuzuFormat(EmulationFormat):
         return ["Yuzu", "Citron", "Sudachi", "Suyu", "Eden"]
 
 
+async def rollup_current_games():
+    try:
+        await CurrentGamesManager.rollup()
+        log.debug("rolled up current games", prefix="task")
+    except Exception:
+        log.error(f"Failed to roll up current games:\n{traceback.format_exc()}")
+
+
 async def log_current_activity(bot: Inu):
     for _, guild in bot.cache.get_guilds_view().items():
         log.debug(f"activity for {guild.name}: {await CurrentGamesManager.fetch_games(guild.id, datetime.now() - timedelta(days=30))}")
@@ -154,6 +168,10 @@ async def load_tasks(event: ShardReadyEvent):
         trigger = IntervalTrigger(minutes=10)
         log.info(f"scheduled fetch_current_games: {trigger}", prefix="init")
         bot.scheduler.add_job(fetch_current_games, trigger, args=[bot])
+        rollup_trigger = IntervalTrigger(hours=1)
+        log.info(f"scheduled rollup_current_games: {rollup_trigger}", prefix="init")
+        bot.scheduler.add_job(rollup_current_games, rollup_trigger)
+        await rollup_current_games()
        # log.info("scheduled fetch_current_games every 10 minutes", prefix="init")
     except Exception:
         log.critical(traceback.format_exc())
\ No newline at end of file
@@ -11,6 +11,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 from core import Table, getLogger, Inu
 from utils import MusicHistoryHandler
+from ext.commands.music_utils import TrackCache
 
 log = getLogger(__name__)
 METHOD_SYNC_TIME: int = 12*60*60 # 12 hours
@@ -40,3 +41,4 @@ async def init_method():
 
 async def method():
     await MusicHistoryHandler.clean()
+    await TrackCache.clean()
@@ -50,7 +50,7 @@ async def initial_load_all_polls():
     count = 0
     for record in records_polls:
         count += 1
-        PollManager.message_id_cache.add(record["message_id"])
+        PollManager.message_id_cache.setdefault(record["message_id"], None)
     log.info(f"Added {count} polls to cache", prefix="cache")
 
     sql = """
@@ -33,6 +33,8 @@ async def update_qalc_currency():
     global i
     # -e = updating currency
     result = await Bash.execute(["qalc", "-t", "-e", "x EUR = 1 BTC"])
+    # let the long living workers load the new exchange rates
+    await Bash.qalc_pool().restart()
     i += 1
     if i % 5 == 0:
         log.info(f"Updated qalculate currencies ({i}th time)", prefix="Cache")
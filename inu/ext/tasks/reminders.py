@@ -30,6 +30,10 @@ async def load_tasks(event: hikari.ShardReadyEvent):
     logging.getLogger('apscheduler.executors.default').setLevel(logging.WARNING)
 
 async def load_upcoming_reminders():
+    """
+    Schedules reminders of the next `REMINDER_UPDATE` seconds which are not scheduled yet.
+    All reminders are scheduled on startup; this only reconciles the scheduler with the DB
+    """
     sql = """
     SELECT * FROM reminders
     WHERE remind_time < $1
@@ -39,4 +43,4 @@ async def load_upcoming_reminders():
         sql,
         timestamp,
     )
-    Reminders.add_reminders_to_set(records)
\ No newline at end of file
+    Reminders.add_reminders_to_scheduler(records)
\ No newline at end of file
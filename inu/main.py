@@ -7,6 +7,7 @@ import os
 import re
 from pprint import pprint 
 import asyncio
+from typing import *
 
 import aiohttp
 import miru
@@ -16,13 +17,13 @@ logging.setLoggerClass(LoggingHandler)
 import hikari
 import miru
 import lightbulb
-from core import Inu, Table
+from core import Inu, Table, StartupProfiler, DebouncedFlush
 from utils import (
     tmdb_setup, InvokationStats, Reminders, 
     TagManager, PollManager, Urban, 
     MyAnimeListAIOClient, CurrentGamesManager,
     BoardManager, set_bot, AutoroleManager,
-    check_unimplemented_methods
+    check_unimplemented_methods, RenderService, HttpClient
 )
 import lavalink_rs
 from core import getLogger, InuContext
@@ -83,6 +84,7 @@ def main():
                 stop = True
             else:
                 log.info(f"Rebooting bot")
+                StartupProfiler.reset()
     log.info(f"Bot shutted down!")
 
 
@@ -109,19 +111,38 @@ async def on_ready(event : hikari.StartingEvent):
     log.info("Connecting Database to classes", prefix="init")
     try:
         set_bot(inu)
-        await inu.init_db()
+        with StartupProfiler.measure("init", "database"):
+            await inu.init_db()
         InvokationStats.init_db(inu)
-        await Reminders.init_bot(inu)
         TagManager.init_db(inu)
-        await PollManager.init_bot(inu)
         Urban.init_bot(inu)
-        await BoardManager.init_bot(inu)
         MyAnimeListAIOClient.set_credentials(inu.db.bot.conf.MAL.id)
-        await tmdb_setup()
         AutoroleManager.set_bot(inu)
     except Exception:
         log.critical(f"Can't connect Database to classes: {traceback.format_exc()}")
 
+    async def init_step(name: str, coro: Awaitable[Any]) -> None:
+        try:
+            with StartupProfiler.measure("init", name):
+                await coro
+        except Exception:
+            log.critical(f"Can't initialize {name}: {traceback.format_exc()}")
+
+    # these steps don't depend on each other
+    await asyncio.gather(
+        init_step("reminders", Reminders.init_bot(inu)),
+        init_step("tag names", TagManager.load_name_index()),
+        init_step("polls", PollManager.init_bot(inu)),
+        init_step("boards", BoardManager.init_bot(inu)),
+        init_step("tmdb", tmdb_setup()),
+    )
+    log.info(StartupProfiler.table("init"), multiline=True, prefix="init")
+
+    try:
+        await RenderService().start()
+    except Exception:
+        log.error(f"Can't start render workers: {traceback.format_exc()}")
+
     await inu.load_tasks_and_commands(["tasks", "hooks"])
     # update bot start value
     try:
@@ -142,13 +163,20 @@ async def on_ready(event : hikari.StartingEvent):
     
 
 
+@inu.listen(hikari.StoppingEvent)
+async def on_stopping(event: hikari.StoppingEvent):
+    # write buffered votes and caches while the database is still connected
+    await DebouncedFlush.flush_all()
+    RenderService().shutdown()
+    await HttpClient().close()
+
+
 @inu.listen(hikari.StartedEvent)
 async def on_bot_ready(event : hikari.StartedEvent):
+    StartupProfiler.ready()
     async def fetch_response(number: int):
         """Fetches a response from the numbersapi.com API"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://numbersapi.com/{number}") as resp:
-                return (await resp.read()).decode("utf-8")
+        return (await HttpClient().fetch(f"http://numbersapi.com/{number}")).text()
             
     log.info("Loading start number", prefix="init")
     table = Table("bot")
@@ -8,7 +8,8 @@ from .string_crumbler import crumble, StringCutter, WordIterator
 from .language import Human, Multiple, get_date_format_by_timedelta
 from .string_calculator import NumericStringParser, calc
 from .list_parser import ListParser
-from .latex import latex2image, evaluation2image, prepare_for_latex
+from .latex import latex2image, evaluation2image, evaluation2latex, latex2png, prepare_for_latex
+from .render import RenderService
 
 from .grid import Grid
 from .rest import *
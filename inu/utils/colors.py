@@ -1,13 +1,20 @@
 import random
-from typing import Optional, List, overload
+from functools import lru_cache
+from typing import Dict, Optional, List, overload
 
 import hikari
-from matplotlib.colors import cnames
 from colormap import rgb2hex, rgb2hls, hls2rgb
 
 from core import ConfigProxy
 
 
+@lru_cache(maxsize=None)
+def named_colors() -> Dict[str, str]:
+    """matplotlib's color names to hex codes; matplotlib is imported on the first call"""
+    from matplotlib.colors import cnames
+    return cnames
+
+
 embeds: List[hikari.Embed] = []
 colors = [  "orange", "darkorange", "firebrick", "yellowgreen", "limegreen", "mediumturquoise",
             "teal", "deepskyblue", "steelblue", "royalblue", "midnightblue",
@@ -15,7 +22,7 @@ colors = [  "orange", "darkorange", "firebrick", "yellowgreen", "limegreen", "me
 ]
 def random_color() -> str:
     
-    return cnames[random.choice(colors)]
+    return named_colors()[random.choice(colors)]
 
 class Colors():
 
@@ -57,7 +64,7 @@ class Colors():
     @classmethod
     def random_hex(cls) -> str:
         """returns a hexlike string (#000000)"""
-        return cnames[random.choice(cls.neon_colors)]
+        return named_colors()[random.choice(cls.neon_colors)]
 
     @classmethod
     def random_color(cls) -> hikari.Color:
@@ -79,11 +86,11 @@ class Colors():
     @classmethod
     def from_name(cls, color: str, as_hex: bool = False):
         if as_hex:
-            hex_ = cnames.get(str(color), None)
+            hex_ = named_colors().get(str(color), None)
             if not isinstance(hex_, str):
                 raise ColorNotFoundError(f"A color with name '{color}' wasn't found")  
             return hex_  
-        hex_ = cnames.get(str(color), None)
+        hex_ = named_colors().get(str(color), None)
         if not isinstance(hex_, str):
             raise ColorNotFoundError(f"A color with name '{color}' wasn't found")
         return hikari.Color.from_hex_code(str(hex_))  
@@ -158,7 +165,7 @@ class ColorNotFoundError(Exception):
 class Color():
     @staticmethod
     def from_name(color: str) -> hikari.Color:
-        hex_ = cnames.get(str(color), None)
+        hex_ = named_colors().get(str(color), None)
         if not isinstance(hex_, str):
             raise ColorNotFoundError(f"A color with name '{color}' wasn't found")
         return hikari.Color.from_hex_code(str(hex_))
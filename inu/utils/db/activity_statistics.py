@@ -10,6 +10,26 @@ from core import Database, Table
 # how many minutes does python takes the records?
 # which is the value in minutes for user_amount = 1?
 USER_AMOUNT_TO_MINUTES = 10
+# length of `current_games.game`
+GAME_NAME_MAX_LENGTH = 100
+# how long rows are kept after they are rolled up into the next coarser table.
+# `CurrentGamesManager.resolution_for` only uses a table within its retention
+RAW_RETENTION = timedelta(days=7)
+HOURLY_RETENTION = timedelta(days=30)
+
+# columns of every activity source: guild_id, game, timestamp, user_minutes.
+# The sources are restricted to the window after `$2` (since) of the query.
+_RAW_ROWS = (
+    f"SELECT guild_id, game, timestamp, user_amount * {USER_AMOUNT_TO_MINUTES} AS user_minutes\n"
+    f"FROM current_games"
+)
+_HOURLY_ROWS = "SELECT guild_id, game, bucket AS timestamp, user_minutes FROM current_games_hourly"
+_DAILY_ROWS = "SELECT guild_id, game, bucket AS timestamp, user_minutes FROM current_games_daily"
+_ROLLED_UNTIL = "(SELECT rolled_until FROM current_games_rollups WHERE name = '{}')"
+# supported bucket sizes of the sources
+ACTIVITY_RESOLUTIONS: List[timedelta] = [
+    timedelta(days=1), timedelta(hours=1), timedelta(minutes=USER_AMOUNT_TO_MINUTES)
+]
 
 
 class GameCategories:
@@ -75,6 +95,85 @@ class Games:
 
 class CurrentGamesManager:
 
+    @classmethod
+    def resolution_for(cls, since: datetime, resolution: timedelta) -> timedelta:
+        """
+        Returns the coarsest bucket size which is at least as fine as <resolution>
+        and which is still stored for the time since <since>
+        """
+        age = datetime.now() - since
+        for bucket in ACTIVITY_RESOLUTIONS:
+            if bucket > resolution:
+                continue
+            if bucket == timedelta(hours=1) and age > HOURLY_RETENTION:
+                continue
+            if bucket < timedelta(hours=1) and age > RAW_RETENTION:
+                continue
+            return bucket
+        # the requested resolution isn't stored anymore
+        return timedelta(days=1)
+
+    @classmethod
+    def chart_resolution(cls, since: datetime) -> timedelta:
+        """the resolution the activity charts need for the time since <since>"""
+        span = datetime.now() - since
+        if span >= timedelta(days=4.5):
+            return timedelta(days=1)
+        if span >= timedelta(days=3):
+            return timedelta(hours=1)
+        return timedelta(minutes=USER_AMOUNT_TO_MINUTES)
+
+    @classmethod
+    def activity_source(cls, since: datetime, resolution: timedelta) -> str:
+        """
+        Builds the source for activity queries, which use <since> as `$2`.
+
+        Buckets which lie completely after <since> are read from the coarsest matching table.
+        The partly covered first bucket and rows, which are not rolled up yet,
+        are read from the finer tables. If the finer rows are already deleted
+        (see `RAW_RETENTION` and `HOURLY_RETENTION`), the whole first bucket is used.
+
+        Returns:
+        --------
+        str
+            a subquery with the columns guild_id, game, timestamp, user_minutes
+        """
+        bucket = cls.resolution_for(since, resolution)
+        age = datetime.now() - since
+        raw = f"{_RAW_ROWS}\nWHERE timestamp > $2::TIMESTAMP"
+        if bucket < timedelta(hours=1):
+            return f"({raw}) AS activity"
+
+        # start of the first hour which is completely covered by the hourly table
+        if age < RAW_RETENTION:
+            hours_from = "date_trunc('hour', $2::TIMESTAMP) + INTERVAL '1 hour'"
+        else:
+            hours_from = "date_trunc('hour', $2::TIMESTAMP)"
+        raw += f" AND (timestamp < {hours_from} OR timestamp >= {_ROLLED_UNTIL.format('hourly')})"
+        if bucket < timedelta(days=1):
+            hourly = f"{_HOURLY_ROWS}\nWHERE bucket >= {hours_from}"
+            return f"({hourly}\nUNION ALL\n{raw}) AS activity"
+
+        if age < HOURLY_RETENTION:
+            days_from = "date_trunc('day', $2::TIMESTAMP) + INTERVAL '1 day'"
+        else:
+            days_from = "date_trunc('day', $2::TIMESTAMP)"
+        daily = f"{_DAILY_ROWS}\nWHERE bucket >= {days_from}"
+        hourly = (
+            f"{_HOURLY_ROWS}\nWHERE bucket >= {hours_from}"
+            f" AND (bucket < {days_from} OR bucket >= {_ROLLED_UNTIL.format('daily')})"
+        )
+        return f"({daily}\nUNION ALL\n{hourly}\nUNION ALL\n{raw}) AS activity"
+
+    @classmethod
+    async def rollup(cls) -> None:
+        """rolls up the samples into the hourly and daily tables and compacts the old rows"""
+        table = Table("current_games")
+        await table.execute(
+            "SELECT rollup_current_games($1, $2, $3, $4)",
+            datetime.now(), USER_AMOUNT_TO_MINUTES, RAW_RETENTION, HOURLY_RETENTION
+        )
+
     @classmethod
     async def add(
         cls,
@@ -97,6 +196,56 @@ class CurrentGamesManager:
             values=[guild_id, game, amount, about_now],
         )
 
+    @classmethod
+    async def add_many(
+        cls,
+        games: Mapping[int, Mapping[str, int]],
+    ) -> List[str]:
+        """
+        inserts a whole snapshot with one statement. Timestamp will be time of method call
+
+        Args:
+        -----
+        games : Mapping[int, Mapping[str, int]]
+            Mapping from guild_id to a mapping from game name to amount of users playing it
+
+        Returns:
+        --------
+        List[str]
+            game names which were ignored, because they are too long for the column
+        """
+        now = datetime.now()
+        about_now = datetime(
+            year=now.year,
+            month=now.month,
+            day=now.day,
+            hour=now.hour,
+            minute=now.minute,
+        )
+        guild_ids: List[int] = []
+        game_names: List[str] = []
+        amounts: List[int] = []
+        ignored: List[str] = []
+        for guild_id, game_dict in games.items():
+            for game, amount in game_dict.items():
+                if len(game) > GAME_NAME_MAX_LENGTH:
+                    ignored.append(game)
+                    continue
+                guild_ids.append(guild_id)
+                game_names.append(game)
+                amounts.append(amount)
+        if not game_names:
+            return ignored
+        table = Table("current_games")
+        sql = (
+            f"INSERT INTO {table.name} (guild_id, game, user_amount, timestamp)\n"
+            f"SELECT guild_id, game, user_amount, $4\n"
+            f"FROM unnest($1::BIGINT[], $2::VARCHAR[], $3::BIGINT[]) AS t(guild_id, game, user_amount)\n"
+            f"ON CONFLICT DO NOTHING"
+        )
+        await table.execute(sql, guild_ids, game_names, amounts, about_now)
+        return ignored
+
     @classmethod
     async def delete(cls, when_older_than: datetime) -> Optional[List[Mapping[str, Any]]]:
         """deletes all records which are older than <`when_older_than`>"""
@@ -126,9 +275,10 @@ class CurrentGamesManager:
         """
         table = Table("current_games")
         sql = (
-            f"SELECT game, SUM(user_amount) AS amount, MIN(timestamp) AS first_occurrence\n"
-            f"FROM {table.name}\n"
-            f"WHERE guild_id = $1 AND timestamp > $2\n"
+            f"SELECT game, SUM(user_minutes) / {USER_AMOUNT_TO_MINUTES} AS amount, MIN(timestamp) AS first_occurrence\n"
+            # the finest stored resolution, for an exact first_occurrence
+            f"FROM {cls.activity_source(since, timedelta(minutes=USER_AMOUNT_TO_MINUTES))}\n"
+            f"WHERE guild_id = $1\n"
             f"GROUP BY game"
         )
         return await table.fetch(sql, guild_id, since)
@@ -148,12 +298,16 @@ class CurrentGamesManager:
         --------
         Dict[str, int]: 
             Mapping from game name to the time in minutes/10 played it
+
+        Note:
+        -----
+            - older than `RAW_RETENTION`, the rows are hourly or daily sums
         """
         table = Table("current_games")
         sql = (
-            f"SELECT game, user_amount, timestamp\n"
-            f"FROM {table.name}\n"
-            f"WHERE guild_id = $1 AND timestamp > $2"
+            f"SELECT game, user_minutes / {USER_AMOUNT_TO_MINUTES} AS user_amount, timestamp\n"
+            f"FROM {cls.activity_source(since, timedelta(minutes=USER_AMOUNT_TO_MINUTES))}\n"
+            f"WHERE guild_id = $1"
         )
         return await table.fetch(sql, guild_id, since)
 
@@ -175,9 +329,9 @@ class CurrentGamesManager:
         """
         table = Table("current_games")
         sql = (
-            f"SELECT ts_round(timestamp, 300) AS round_timestamp, SUM(user_amount) AS total_user_amount\n"
-            f"FROM {table.name}\n"
-            f"WHERE guild_id = $1 AND timestamp > $2\n"
+            f"SELECT ts_round(timestamp, 300) AS round_timestamp, SUM(user_minutes) / {USER_AMOUNT_TO_MINUTES} AS total_user_amount\n"
+            f"FROM {cls.activity_source(since, cls.chart_resolution(since))}\n"
+            f"WHERE guild_id = $1\n"
             f"GROUP BY round_timestamp\n"
             f"ORDER BY round_timestamp"
         )
@@ -209,9 +363,9 @@ class CurrentGamesManager:
         table = Table("current_games")
         table.return_as_dataframe(True)
         sql = (
-            f"SELECT ts_round(timestamp, 300) AS round_timestamp, SUM(user_amount) AS total_user_amount\n"
-            f"FROM {table.name}\n"
-            f"WHERE guild_id = $1 AND timestamp > $2 AND game = $3\n"
+            f"SELECT ts_round(timestamp, 300) AS round_timestamp, SUM(user_minutes) / {USER_AMOUNT_TO_MINUTES} AS total_user_amount\n"
+            f"FROM {cls.activity_source(since, cls.chart_resolution(since))}\n"
+            f"WHERE guild_id = $1 AND game = $3\n"
             f"GROUP BY round_timestamp\n"
             f"ORDER BY round_timestamp"
         )
@@ -256,9 +410,9 @@ class CurrentGamesManager:
         optional_arg = [activity_filter] if activity_filter else []
         # ts_round(timestamp, 300) -> round timestamp to nearest 10 minutes
         sql = ( 
-            f"SELECT ts_round(timestamp, 300) AS r_timestamp, game, CAST(user_amount AS FLOAT)*{USER_AMOUNT_TO_MINUTES}/60 AS hours\n"
-            f"FROM {table.name}\n"
-            f"WHERE guild_id = $1 AND timestamp > $2 {additional_activity_filter}\n"
+            f"SELECT ts_round(timestamp, 300) AS r_timestamp, game, CAST(user_minutes AS FLOAT)/60 AS hours\n"
+            f"FROM {cls.activity_source(since, cls.chart_resolution(since))}\n"
+            f"WHERE guild_id = $1 {additional_activity_filter}\n"
         )
         return await table.fetch(sql, guild_id, since, *optional_arg)
 
@@ -292,9 +446,9 @@ class CurrentGamesManager:
         additional_filter = f"AND game != ALL($4)" if remove_activities else ""
         optional_arg = [remove_activities] if remove_activities else []
         sql = (
-            f"SELECT game, SUM(user_amount) AS amount\n"
-            f"FROM {table.name}\n"
-            f"WHERE guild_id = $1 AND timestamp > $2 {additional_filter}\n"
+            f"SELECT game, SUM(user_minutes) / {USER_AMOUNT_TO_MINUTES} AS amount\n"
+            f"FROM {cls.activity_source(since, cls.chart_resolution(since))}\n"
+            f"WHERE guild_id = $1 {additional_filter}\n"
             f"GROUP BY game\n"
             f"ORDER BY amount DESC\n"
             f"LIMIT $3"
@@ -327,9 +481,9 @@ class CurrentGamesManager:
         additional_filter = f"AND game != ALL($3)" if ignore_activities else ""
         additional_args = [ignore_activities] if ignore_activities else []
         sql = f"""
-        SELECT date_trunc('day', timestamp)::TIMESTAMP WITH TIME ZONE AS datetime, SUM(user_amount)/6 AS hours\n
-        FROM current_games\n
-        WHERE guild_id = $1 AND timestamp > $2 {additional_filter}\n
+        SELECT date_trunc('day', timestamp)::TIMESTAMP WITH TIME ZONE AS datetime, SUM(user_minutes)/60 AS hours\n
+        FROM {cls.activity_source(since, timedelta(days=1))}\n
+        WHERE guild_id = $1 {additional_filter}\n
         GROUP BY datetime \n
         ORDER BY datetime ASC
         """
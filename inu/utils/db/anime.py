@@ -1,3 +1,4 @@
+import asyncio
 import json
 from pprint import pformat
 from shutil import which
@@ -9,12 +10,18 @@ from urllib.parse import quote
 
 import aiohttp
 from jikanpy import AioJikan
+from cachetools import TTLCache
 
-from core import Database, Table, getLogger
+from core import Database, Table, getLogger, DebouncedFlush
 from utils import Multiple, MyAnimeListAIOClient, MALRatings
 
 log = getLogger(__name__)
 
+# seconds, in which fetched anime are collected before they are written to the db
+ANIME_CACHE_FLUSH_DELAY = 5
+# concurrent background requests of `MyAnimeList.prefetch`
+PREFETCH_CONCURRENCY = 2
+
 
 class Anime:
     """A data class for Anime"""
@@ -470,6 +477,25 @@ class Anime:
 
 class MyAnimeList:
     """A class, which stores MyAnimeList data for caching purposes in a Database, or fetches it from jikan"""
+    # anime which were loaded recently; page flips are served from here
+    _anime_cache: TTLCache = TTLCache(maxsize=2048, ttl=60*60)
+    # mal_id -> task, which loads this anime; concurrent requests share it
+    _loading: Dict[int, asyncio.Task] = {}
+    _prefetching: Set[asyncio.Task] = set()
+    _prefetch_slots: Optional[asyncio.Semaphore] = None
+    # mal_id -> anime, which is not stored in the db yet
+    _pending_cache: Dict[int, Anime] = {}
+    cache_flush: DebouncedFlush
+    CACHE_COLUMNS: List[str] = [
+        "mal_id", "title", "title_english", 
+        "title_japanese", "title_synonyms", "synopsis", 
+        "background", "related",
+        "genres", "type", "episodes", "ending_themes", 
+        "opening_themes", "duration", "rating", "rank", 
+        "score", "popularity", "source", 
+        "status", "airing_start", "airing_stop", 
+        "image_url", "studios", "cached_until", "statistics", "recommendations"
+    ]
 
     @classmethod
     async def search_anime(cls, query: str) -> Dict[str, Any]:
@@ -489,19 +515,57 @@ class MyAnimeList:
         Note:
         -----
             - The `Anime` will be stored in a database for caching puprposes
+            - Recently loaded anime are returned from memory
             - The internal db/cache will be checked first, before making a request to jikan
+            - concurrent calls with the same mal_id share one lookup
         """
+        anime: Optional[Anime] = cls._anime_cache.get(mal_id)
+        if anime and not anime.needs_update:
+            return anime
+        if (task := cls._loading.get(mal_id)) is None:
+            task = asyncio.create_task(cls._load_anime(mal_id))
+            cls._loading[mal_id] = task
+            task.add_done_callback(lambda _: cls._loading.pop(mal_id, None))
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _load_anime(cls, mal_id: int) -> Anime:
         anime = await cls._fetch_anime_by_id_db(mal_id)
         if anime:
             if anime.needs_update:
                 log.debug(f"update anime cache: {anime}")
                 anime = await cls._fetch_anime_by_id_rest(mal_id)
-                await cls._cache_anime(anime)
+                cls._queue_cache(anime)
         else:
             anime = await cls._fetch_anime_by_id_rest(mal_id)
-            await cls._cache_anime(anime)
+            cls._queue_cache(anime)
+        cls._anime_cache[mal_id] = anime
         return anime
 
+    @classmethod
+    def prefetch(cls, mal_ids: Iterable[int]) -> None:
+        """
+        Loads the anime of <mal_ids> in the background, so that a later
+        `fetch_anime_by_id` is served from memory.
+        At most `PREFETCH_CONCURRENCY` anime are loaded at once.
+        """
+        if cls._prefetch_slots is None:
+            cls._prefetch_slots = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+        for mal_id in mal_ids:
+            if mal_id in cls._anime_cache or mal_id in cls._loading:
+                continue
+            task = asyncio.create_task(cls._prefetch(mal_id))
+            cls._prefetching.add(task)
+            task.add_done_callback(cls._prefetching.discard)
+
+    @classmethod
+    async def _prefetch(cls, mal_id: int) -> None:
+        async with cls._prefetch_slots:  # type: ignore
+            try:
+                await cls.fetch_anime_by_id(mal_id)
+            except Exception:
+                log.warning(f"prefetching anime {mal_id} failed:\n{traceback.format_exc()}")
+
     @classmethod
     async def _fetch_anime_by_id_rest(
         cls,
@@ -528,6 +592,8 @@ class MyAnimeList:
         -------
             - (`Anime` | `None`) the coresponding `Anime` to the id or `None` if not cached
         """
+        if (anime := cls._pending_cache.get(mal_id)):
+            return anime
         table = Table("myanimelist")
         record = await table.fetch_by_id("mal_id", mal_id)
         if not record:
@@ -540,6 +606,32 @@ class MyAnimeList:
     async def _update_anime_by_id(cls, mal_id: int):
         pass
 
+    @classmethod
+    def _queue_cache(cls, anime: Anime) -> None:
+        """
+        Queues <anime> to be stored in the db.
+        Anime are collected for `ANIME_CACHE_FLUSH_DELAY` seconds and then written with `flush_cache`
+        """
+        cls._pending_cache[anime.mal_id] = anime
+        cls.cache_flush.schedule()
+
+    @classmethod
+    async def flush_cache(cls):
+        """writes all queued anime to the db"""
+        await cls.cache_flush.flush()
+
+    @classmethod
+    async def _write_cache(cls):
+        if not cls._pending_cache:
+            return
+        pending, cls._pending_cache = cls._pending_cache, {}
+        try:
+            await cls._cache_animes(list(pending.values()))
+        except Exception:
+            # keep them for the next flush; newer anime win
+            cls._pending_cache = {**pending, **cls._pending_cache}
+            raise
+
     @classmethod
     async def _cache_anime(cls, anime: Anime):
         """
@@ -547,30 +639,46 @@ class MyAnimeList:
         ----
             - (`Anime`) the `Anime` which should be stored in the db
         """
-        table = Table("myanimelist")
-        r = await table.upsert(
-            which_columns=[
-                "mal_id", "title", "title_english", 
-                "title_japanese", "title_synonyms", "synopsis", 
-                "background", "related",
-                "genres", "type", "episodes", "ending_themes", 
-                "opening_themes", "duration", "rating", "rank", 
-                "score", "popularity", "source", 
-                "status", "airing_start", "airing_stop", 
-                "image_url", "studios", "cached_until", "statistics", "recommendations"
-            ],
-            values=[
-                anime.mal_id, anime.origin_title, anime.title_english, anime.title_japanese,
-                anime.title_synonyms, anime.synopsis, anime.background,
-                json.dumps(anime.related),
-                [json.dumps(x) for x in anime.genres], anime.type_, 
-                anime.episodes, anime.ending_themes, anime.opening_themes, anime.duration, 
-                anime._rating, anime.rank, anime.score, anime.popularity, anime._source,
-                anime.status,
-                anime.airing_start, anime.airing_stop, anime.image_url,
-                [json.dumps(x) for x in anime.studios], 
-                anime.create_cached_until, json.dumps(anime._statistics), 
-                [json.dumps(r) for r in anime._recommendations]
-            ]
+        await cls._cache_animes([anime])
+
+    @classmethod
+    async def _cache_animes(cls, animes: List[Anime]):
+        """
+        Args:
+        ----
+            - (`List[Anime]`) the `Anime`s which should be stored in the db; sent as one batch
+        """
+        values_chain = [f"${num}" for num in range(1, len(cls.CACHE_COLUMNS) + 1)]
+        sql = (
+            f"INSERT INTO myanimelist ({', '.join(cls.CACHE_COLUMNS)}) \n"
+            f"VALUES ({', '.join(values_chain)}) \n"
+            f"ON CONFLICT (mal_id) DO UPDATE \n"
+            f"SET {', '.join(f'{c}=EXCLUDED.{c}' for c in cls.CACHE_COLUMNS[1:])} \n"
         )
-        log.debug(f"cached anime: {anime}")
\ No newline at end of file
+        await Database().execute_many(sql, [cls._cache_values(anime) for anime in animes])
+        log.debug(f"cached {len(animes)} anime: {', '.join(str(anime) for anime in animes)}")
+
+    @staticmethod
+    def _cache_values(anime: Anime) -> List[Any]:
+        """the values of <anime> in the order of `CACHE_COLUMNS`"""
+        return [
+            anime.mal_id, anime.origin_title, anime.title_english, anime.title_japanese,
+            anime.title_synonyms, anime.synopsis, anime.background,
+            json.dumps(anime.related),
+            [json.dumps(x) for x in anime.genres], anime.type_, 
+            anime.episodes, anime.ending_themes, anime.opening_themes, anime.duration, 
+            anime._rating, anime.rank, anime.score, anime.popularity, anime._source,
+            anime.status,
+            anime.airing_start, anime.airing_stop, anime.image_url,
+            [json.dumps(x) for x in anime.studios], 
+            anime.create_cached_until, json.dumps(anime._statistics), 
+            [json.dumps(r) for r in anime._recommendations]
+        ]
+
+
+MyAnimeList.cache_flush = DebouncedFlush(
+    "anime cache",
+    MyAnimeList._write_cache,
+    lambda: bool(MyAnimeList._pending_cache),
+    delay=ANIME_CACHE_FLUSH_DELAY,
+)
@@ -100,6 +100,11 @@ class BoardManager:
            cls._cache.get(guild_id, {}).get(emoji) != None
         )
 
+    @classmethod
+    def has_board(cls, guild_id: int) -> bool:
+        """whether <guild_id> has at least one board"""
+        return bool(cls._cache.get(guild_id))
+
     @classmethod
     def has_message_id(cls, guild_id: int, emoji:str, message_id: int) -> bool:
         return message_id in cls._cache.get(guild_id, {}).get(emoji, [])   
@@ -396,6 +401,47 @@ class BoardManager:
             cls._cache_remove_entry(guild_id, r["emoji"], message_id)
         return records
 
+    @classmethod
+    async def update_reactions(
+        cls,
+        message_id: int,
+        emoji: str,
+        added: List[int],
+        removed: List[int],
+    ) -> None:
+        """
+        Adds and removes reactions of an entry with one statement each
+
+        Args:
+        -----
+        message_id : `int`
+            the message_id of the entry
+        emoji : `str`
+            the emoji of the entry
+        added : `List[int]`
+            ids of the users who added the reaction
+        removed : `List[int]`
+            ids of the users who removed the reaction
+        """
+        table = Table("board.reactions")
+        if added:
+            await table.execute(
+                (
+                    f"INSERT INTO {table.name} (message_id, reacter_id, emoji)\n"
+                    f"SELECT $1, reacter_id, $3 FROM unnest($2::BIGINT[]) AS reacter_id\n"
+                    f"ON CONFLICT DO NOTHING"
+                ),
+                message_id, added, emoji
+            )
+        if removed:
+            await table.execute(
+                (
+                    f"DELETE FROM {table.name}\n"
+                    f"WHERE message_id = $1 AND emoji = $3 AND reacter_id = ANY($2::BIGINT[])"
+                ),
+                message_id, removed, emoji
+            )
+
     @classmethod
     async def fetch_entry_reaction_amount(
         cls,
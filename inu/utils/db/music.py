@@ -4,7 +4,7 @@ from typing import *
 from cachetools import TTLCache
 from asyncache import cached
 
-from core import Table, getLogger
+from core import Table, Database, getLogger
 
 
 log = getLogger(__name__)
@@ -72,4 +72,64 @@ class MusicHistoryHandler:
         del_oder_than = datetime.datetime.now() - max_age
         deleted = await cls.table.execute(f"DELETE FROM {cls.table.name} WHERE played_on < $1", del_oder_than)
         if deleted:
-            log.info(f"Cleaned {len(deleted)} music history entries", "cache")
\ No newline at end of file
+            log.info(f"Cleaned {len(deleted)} music history entries", "cache")
+
+
+
+class TrackCacheStore:
+    """
+    Persists resolved Lavalink tracks (`music_track_cache`), so that the track cache
+    of the music player survives restarts
+    """
+    table = Table("music_track_cache")
+
+    @classmethod
+    async def get(cls, query: str, max_age: datetime.timedelta) -> Optional[Tuple[str, List[str]]]:
+        """
+        Args:
+        -----
+        `query : str`
+            the key: `<search engine>:<normalized query or URL>`
+        `max_age : datetime.timedelta`
+            older entries are ignored
+
+        Returns:
+        --------
+        `Optional[Tuple[str, List[str]]] :`
+            the load type (`track` or `search`) and the encoded tracks
+        """
+        records = await cls.table.fetch(
+            f"SELECT load_type, encoded FROM {cls.table.name} WHERE query = $1 AND resolved_at > $2",
+            query, datetime.datetime.now() - max_age
+        )
+        if not records:
+            return None
+        return records[0]["load_type"], list(records[0]["encoded"])
+
+    @classmethod
+    async def add_many(cls, entries: List[Tuple[str, str, List[str]]]) -> None:
+        """
+        Args:
+        -----
+        `entries : List[Tuple[str, str, List[str]]]`
+            query, load type and encoded tracks of each entry
+        """
+        now = datetime.datetime.now()
+        await Database().execute_many(
+            f"""
+            INSERT INTO {cls.table.name} (query, load_type, encoded, resolved_at)
+            VALUES ($1, $2, $3, $4)
+            ON CONFLICT (query) DO UPDATE 
+            SET load_type = EXCLUDED.load_type, encoded = EXCLUDED.encoded, resolved_at = EXCLUDED.resolved_at
+            """,
+            [(query, load_type, encoded, now) for query, load_type, encoded in entries]
+        )
+
+    @classmethod
+    async def clean(cls, max_age: datetime.timedelta):
+        deleted = await cls.table.execute(
+            f"DELETE FROM {cls.table.name} WHERE resolved_at < $1", 
+            datetime.datetime.now() - max_age
+        )
+        if deleted:
+            log.info(f"Cleaned {len(deleted)} cached tracks", prefix="cache")
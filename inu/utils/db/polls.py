@@ -18,7 +18,7 @@ import asyncpg
 import pandas
 
 from core.bot import Inu
-from core import Database, Table
+from core import Database, Table, DebouncedFlush
 from core import getLogger, Table
 
 if TYPE_CHECKING:
@@ -29,11 +29,18 @@ log = getLogger(__name__)
 
 # the time in seconds, after the next sql statement, to get further reminders, will be executed
 POLL_SYNC_TIME = 5*60
+# the time in seconds, votes are collected before they are written to the db
+VOTE_FLUSH_DELAY = 2
 
 class PollManager:
     bot: Inu
     db: Database
-    message_id_cache: Set[int] = set()
+    # mapping from message_id to the poll. The poll is None until it was loaded with `Poll.from_message_id`
+    message_id_cache: Dict[int, Optional["Poll"]] = {}
+    # mapping from (poll_id, user_id) to the option_id the user voted for
+    _pending_votes: Dict[Tuple[int, int], int] = {}
+    # set below the class
+    vote_flush: DebouncedFlush
 
     @classmethod
     async def init_bot(cls, bot: Inu):
@@ -49,12 +56,12 @@ class PollManager:
         """delete polls older than `datetime.now()`"""
         sql = (
             "DELETE FROM polls "
-            "WHERE expires < $1"
+            "WHERE expires < $1 "
+            "RETURNING poll_id, message_id"
         )
         table = Table("polls")
         records = await table.fetch(sql, datetime.now())
-        for record in records:
-            cls.message_id_cache.remove(record["message_id"])
+        cls._forget_polls(records)
         log.info(f"Deleted {len(records)} old polls", prefix="task")
         
 
@@ -151,7 +158,7 @@ class PollManager:
             description, expires, 
             poll_type, anonymous
         ))[0]
-        cls.message_id_cache.add(message_id)
+        cls.message_id_cache[message_id] = None
         return record
 
     @classmethod
@@ -187,8 +194,17 @@ class PollManager:
             columns=cols,
             matching_values=vals
         )
+        cls._forget_polls(poll_records)
+
+    @classmethod
+    def _forget_polls(cls, poll_records: List[Mapping[str, Any]]) -> None:
+        """removes deleted polls from the cache and drops their queued votes"""
+        poll_ids = {p["poll_id"] for p in poll_records}
         for p in poll_records:
-            cls.message_id_cache.remove(p["message_id"])
+            cls.message_id_cache.pop(p["message_id"], None)
+        # votes of a deleted poll can't be stored anymore
+        for key in [key for key in cls._pending_votes if key[0] in poll_ids]:
+            del cls._pending_votes[key]
 
     @classmethod
     async def add_vote(cls, poll_id: int, user_id: int, option_id: str):
@@ -200,6 +216,50 @@ class PollManager:
         table = Table("poll_votes")
         await table.delete(columns=["poll_id", "user_id"], matching_values=[poll_id, user_id])
 
+    @classmethod
+    def queue_vote(cls, poll_id: int, user_id: int, option_id: int):
+        """
+        Replaces the vote of <user_id> in <poll_id> with <option_id>.
+        Votes are collected for `VOTE_FLUSH_DELAY` seconds and then written with `flush_votes`
+        """
+        cls._pending_votes[(poll_id, user_id)] = option_id
+        cls.vote_flush.schedule()
+
+    @classmethod
+    async def flush_votes(cls):
+        """writes all queued votes with one statement"""
+        await cls.vote_flush.flush()
+
+    @classmethod
+    async def _write_votes(cls):
+        if not cls._pending_votes:
+            return
+        pending, cls._pending_votes = cls._pending_votes, {}
+        poll_ids = [poll_id for poll_id, _ in pending.keys()]
+        user_ids = [user_id for _, user_id in pending.keys()]
+        option_ids = list(pending.values())
+        # delete other votes of the users and insert the new ones.
+        # votes of polls, which were deleted in the meantime, are dropped
+        sql = """
+        WITH changes AS (
+            SELECT c.* FROM unnest($1::BIGINT[], $2::BIGINT[], $3::BIGINT[]) AS c(poll_id, user_id, option_id)
+            JOIN polls p ON p.poll_id = c.poll_id
+        ), deleted AS (
+            DELETE FROM poll_votes v
+            USING changes c
+            WHERE v.poll_id = c.poll_id AND v.user_id = c.user_id AND v.option_id != c.option_id
+        )
+        INSERT INTO poll_votes (poll_id, option_id, user_id)
+        SELECT poll_id, option_id, user_id FROM changes
+        ON CONFLICT DO NOTHING
+        """
+        try:
+            await Table("poll_votes").execute(sql, poll_ids, user_ids, option_ids)
+        except Exception:
+            # keep them for the next flush; newer votes win
+            cls._pending_votes = {**pending, **cls._pending_votes}
+            raise
+
     @classmethod
     async def add_poll_option(cls, poll_id: int, reaction: str, description: str) -> int:
         table = Table("poll_options")
@@ -276,3 +336,10 @@ class PollManager:
         # resample to 1d (code from inu/commands/statistics)
         # upsert with addition in column amount
 
+
+PollManager.vote_flush = DebouncedFlush(
+    "poll votes",
+    PollManager._write_votes,
+    lambda: bool(PollManager._pending_votes),
+    delay=VOTE_FLUSH_DELAY,
+)
@@ -17,7 +17,6 @@ from asyncache import cached
 from cachetools import TTLCache, LRUCache
 import hikari
 from hikari import User, Member
-from numpy import column_stack
 
 
 from core.db import Database, Table
@@ -8,6 +8,8 @@ import asyncio
 from enum import Enum
 import time
 import re
+import heapq
+import itertools
 
 import hikari
 from hikari import ApplicationContextType
@@ -432,7 +434,7 @@ class HikariReminder(BaseReminder):
                 loop = asyncio.get_event_loop()
                 asyncio.Task(self.store_reminder(), loop=loop)
             else:
-                asyncio.Task(self.schedule())
+                self.schedule()
     
 
 
@@ -444,10 +446,16 @@ class HikariReminder(BaseReminder):
         return ch.guild_id
 
     async def store_reminder(self):
+        """stores the reminder, so that it survives restarts, and schedules it"""
         self.id = await Reminders.add_reminder(self)
+        self.schedule()
 
-    async def schedule(self):
-        await asyncio.sleep(self.remaining_time)
+    def schedule(self):
+        """adds the reminder to the `ReminderScheduler`"""
+        Reminders.scheduler.schedule(self)
+
+    async def fire(self):
+        """called by the `ReminderScheduler` when the reminder is due"""
         await self.destroy_reminder()
         await self.send_message()
 
@@ -502,17 +510,16 @@ class HikariReminder(BaseReminder):
             loop = asyncio.get_event_loop()
             asyncio.Task(reminder.store_reminder(), loop=loop)
         else:
-            asyncio.Task(reminder.schedule())
+            reminder.schedule()
         
         
     async def destroy_reminder(self):
         """
-        Deleting the DB entry, and the element in the set
+        Deleting the DB entry
         """
         if not self.id:
             return  # reminder was to short to being stored
-        record = await Reminders.delete_reminder_by_id(self.id)
-        Reminders.delete_from_set(record)
+        await Reminders.delete_reminder_by_id(self.id)
 
     def from_database(
         self,
@@ -524,10 +531,7 @@ class HikariReminder(BaseReminder):
         self.datetime = timestamp
         self.remind_text = remind_text
         self.wait_until = self.datetime.timestamp()
-        asyncio.Task(
-            self.schedule(),
-            loop=asyncio.get_running_loop(),
-        )
+        self.schedule()
         
 
 
@@ -549,10 +553,108 @@ class HikariReminder(BaseReminder):
         if len(matches) > 1:
             raise RuntimeError(f"Found multiple time units ({matches}) with the given unit `{unit}`")
 
+class ReminderScheduler:
+    """
+    Min-heap of all pending reminders, ordered by the time they are due.
+
+    One dispatcher task sleeps until the first reminder is due
+    and fires all reminders which are due at that point.
+
+    Note:
+    -----
+        - canceled reminders are only marked and skipped when they reach the top of the heap;
+          the heap is rebuilt when most of it consists of canceled entries
+        - stored reminders are known by their id, hence a reminder can't be scheduled twice;
+          the id is kept while the reminder fires, until its row is deleted
+    """
+    def __init__(self) -> None:
+        # (wait_until, sequence number, reminder)
+        self._heap: List[Tuple[float, int, "HikariReminder"]] = []
+        self._counter = itertools.count()
+        # reminder_id -> sequence number of the entry
+        self._ids: Dict[int, int] = {}
+        self._canceled: Set[int] = set()
+        # ids of reminders which are firing right now
+        self._firing: Set[int] = set()
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._heap) - len(self._canceled)
+
+    def __contains__(self, reminder_id: int) -> bool:
+        return reminder_id in self._ids or reminder_id in self._firing
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch())
+
+    def schedule(self, reminder: "HikariReminder") -> None:
+        if reminder.id is not None and reminder.id in self:
+            return
+        entry = (reminder.wait_until, next(self._counter), reminder)
+        heapq.heappush(self._heap, entry)
+        if reminder.id is not None:
+            self._ids[reminder.id] = entry[1]
+        if self._heap[0] is entry:
+            # the dispatcher sleeps too long
+            self._changed.set()
+
+    def cancel(self, reminder_id: int) -> bool:
+        """
+        Returns:
+        --------
+        bool
+            whether a scheduled reminder was canceled
+        """
+        sequence = self._ids.pop(reminder_id, None)
+        if sequence is None:
+            return False
+        self._canceled.add(sequence)
+        if len(self._canceled) > 64 and len(self._canceled) > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if entry[1] not in self._canceled]
+            heapq.heapify(self._heap)
+            self._canceled.clear()
+        return True
+
+    def _pop_due(self, now: float) -> List["HikariReminder"]:
+        due: List[HikariReminder] = []
+        while self._heap and self._heap[0][0] <= now:
+            _, sequence, reminder = heapq.heappop(self._heap)
+            if sequence in self._canceled:
+                self._canceled.discard(sequence)
+                continue
+            if reminder.id is not None:
+                self._ids.pop(reminder.id, None)
+                self._firing.add(reminder.id)
+            due.append(reminder)
+        return due
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._changed.clear()
+            for reminder in self._pop_due(time.time()):
+                asyncio.create_task(self._fire(reminder))
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, reminder: "HikariReminder") -> None:
+        try:
+            await reminder.fire()
+        except Exception:
+            log.error(f"failed to send reminder {reminder.id}:\n{traceback.format_exc()}")
+        finally:
+            if reminder.id is not None:
+                self._firing.discard(reminder.id)
+
+
 class Reminders:
     db: Database
     bot: Inu
-    running_reminders = set()
+    scheduler: ReminderScheduler = ReminderScheduler()
     REMINDER_UPDATE = REMINDER_UPDATE
     
     def __init__(self, key: Optional[str] = None):
@@ -563,6 +665,17 @@ class Reminders:
         cls.bot = bot
         cls.db = bot.db
         await cls.clean_up_reminders()
+        await cls.load_reminders()
+        cls.scheduler.start()
+
+    @classmethod
+    async def load_reminders(cls):
+        """
+        Schedules all stored reminders
+        """
+        records = await cls.db.fetch("SELECT * FROM reminders")
+        cls.add_reminders_to_scheduler(records)
+        log.info(f"Scheduled {len(records)} reminders", prefix="init")
 
     @classmethod
     async def clean_up_reminders(cls):
@@ -578,20 +691,18 @@ class Reminders:
         log.info(f"Cleaned up reminders: {len(records)} reminders where removed", prefix="task")
 
     @classmethod
-    def add_reminders_to_set(cls, records: List[asyncpg.Record]):
+    def add_reminders_to_scheduler(cls, records: List[asyncpg.Record]):
         """
-        Add a reminder to the set of running reminders.
-        Used as cache to avoid duplicates.
+        Add reminders to the scheduler. Already scheduled reminders are skipped.
 
         Args:
         -----
         records: List[asyncpg.Record]
-            The records which contain the reminder data which should be added to the set.
+            The records which contain the reminder data which should be scheduled.
         """
         for r in records:
-            if r["reminder_id"] in cls.running_reminders:
+            if r["reminder_id"] in cls.scheduler:
                 continue
-            cls.running_reminders.add(r["reminder_id"])
             log.debug(f"add reminder | id: {r['reminder_id']}; text: {'remind_text'}")
             reminder = HikariReminder(
                 channel_id=r["channel_id"],
@@ -604,17 +715,6 @@ class Reminders:
                 r["remind_text"],
             )
 
-    @classmethod
-    def delete_from_set(cls, reminder: asyncpg.Record):
-        """
-        remove a reminder form the cache set.
-        """
-        log.debug(f"del: {reminder}")
-        try:
-            cls.running_reminders.remove(reminder["reminder_id"])
-        except Exception:
-            log.warning(f"utils.Reminders - delte_from_set \n {traceback.format_exc()}")
-
     @classmethod
     async def add_reminder(cls, reminder: HikariReminder) -> int:
         """
@@ -633,7 +733,7 @@ class Reminders:
         VALUES($1, $2, $3, $4, $5)
         RETURNING reminder_id
         """
-        id = await cls.db.row(
+        id = await cls.db.val(
             sql,
             reminder.remind_text, 
             reminder.channel_id, 
@@ -686,6 +786,7 @@ class Reminders:
         record = await cls.db.row(sql, id)
         if not record:
             return None
+        cls.scheduler.cancel(id)
         return record
 
     @classmethod
@@ -2,6 +2,7 @@ from typing import *
 import json
 import typing as t
 import logging
+from collections import defaultdict
 
 from core.db import Database
 
@@ -12,8 +13,29 @@ log = getLogger(__name__)
 T = t.TypeVar("T")
 
 class InvokationStats:
+    """
+    Command usage counters per guild, stored as JSONB in table `stats`.
+
+    Invocations are counted in memory with `increment` and written
+    with `flush` as one batched statement, which merges the deltas
+    atomically into the stored JSON.
+    """
     db: Database
     bot: Inu
+    # guild_id -> command_name -> delta which is not yet written
+    _pending: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    _merge_sql: str = """
+    INSERT INTO stats (guild_id, cmd_json)
+    VALUES ($1, $2::JSONB)
+    ON CONFLICT (guild_id) DO UPDATE
+    SET cmd_json = COALESCE(stats.cmd_json, '{}'::JSONB) || (
+        SELECT jsonb_object_agg(
+            delta.key, 
+            COALESCE((stats.cmd_json->>delta.key)::BIGINT, 0) + delta.value::BIGINT
+        )
+        FROM jsonb_each_text(EXCLUDED.cmd_json) AS delta
+    )
+    """
 
     def __init__(self, key: Optional[str] = None):
         self.key = key
@@ -99,6 +121,7 @@ class InvokationStats:
     ):
         """
         Adds the value of <value> to the command <command_name> from the specific guild with id <guild_id>
+        and writes it immediately
 
         Args:
         -----
@@ -106,19 +129,62 @@ class InvokationStats:
             - guild_id: (int) the id of the guild
             - value: (int, default=1) the value which should be added to <command_name> for guild with id <guild_id>
         """
-        sql = """
-        SELECT * FROM stats
-        WHERE guild_id = $1
+        if guild_id is None:
+            guild_id = -1
+        await cls.db.execute(cls._merge_sql, guild_id, json.dumps({command_name: value}))
+
+    @classmethod
+    def increment(
+        cls,
+        command_name: str,
+        guild_id: Optional[int] = None,
+        value: int = 1,
+    ) -> None:
+        """
+        Adds the value of <value> to the in memory counter of <command_name>.
+        The counters are written with the next `flush`
+
+        Args:
+        -----
+            - command_name: (str) the name of the command, where <value> should be added
+            - guild_id: (int | None) the id of the guild; None for private chats
+            - value: (int, default=1) the value which should be added
         """
         if guild_id is None:
             guild_id = -1
-        record = await cls.db.row(sql, guild_id)
-        if record:
-            json_ = record["cmd_json"]
-        else:
-            json_ = cls.bare_bone_json(command_name, guild_id)
-        json_ = cls.manipulate_json_value(json_, command_name, value)
-        await cls.update_json(json_, guild_id)
+        cls._pending[guild_id][command_name] += value
+
+    @classmethod
+    async def flush(cls) -> int:
+        """
+        Writes all pending counters with one batched statement
+
+        Returns:
+        --------
+            - (int) the amount of guilds which were written
+
+        Note:
+        -----
+            - if writing fails, the counters are added back to the pending ones
+        """
+        if not cls._pending:
+            return 0
+        pending = cls._pending
+        cls._pending = defaultdict(lambda: defaultdict(int))
+        valueset = [
+            (guild_id, json.dumps(counters)) 
+            for guild_id, counters in pending.items() 
+            if counters
+        ]
+        try:
+            await cls.db.execute_many(cls._merge_sql, valueset)
+        except Exception:
+            for guild_id, counters in pending.items():
+                for command_name, value in counters.items():
+                    cls._pending[guild_id][command_name] += value
+            raise
+        log.debug(f"flushed command usage of {len(valueset)} guilds")
+        return len(valueset)
 
     @classmethod
     async def fetch_json(cls, guild_id: Optional[int]) -> Optional[Dict]:
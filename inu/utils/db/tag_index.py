@@ -0,0 +1,271 @@
+from typing import (
+    Dict,
+    Optional,
+    List,
+    Iterable,
+    Mapping,
+    Any,
+    Set,
+    Tuple,
+)
+from dataclasses import dataclass, field
+from datetime import datetime
+import heapq
+
+from core import getLogger
+
+log = getLogger(__name__)
+
+__all__ = ["TagNameIndex", "trigrams", "similarity"]
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Returns the trigrams of <text> the same way `pg_trgm` creates them:
+    lowercased alphanumeric words, each padded with two spaces in front and one after
+    """
+    result: Set[str] = set()
+    word: List[str] = []
+    for char in f"{text.lower()} ":
+        if char.isalnum():
+            word.append(char)
+            continue
+        if word:
+            padded = f"  {''.join(word)} "
+            result.update(padded[i:i+3] for i in range(len(padded) - 2))
+            word.clear()
+    return result
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """`pg_trgm` similarity of two trigram sets"""
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+@dataclass
+class _IndexedTag:
+    tag_id: int
+    tag_key: str
+    aliases: List[str]
+    guild_ids: List[int]
+    last_use: datetime
+    trigrams: Dict[str, Set[str]] = field(default_factory=dict)
+
+    @property
+    def names(self) -> List[str]:
+        return [self.tag_key, *self.aliases]
+
+
+class _TrieNode:
+    __slots__ = ("children", "tag_ids")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.tag_ids: Set[int] = set()
+
+
+class _PrefixTrie:
+    """A trie which maps names to the tag ids having this name"""
+    def __init__(self) -> None:
+        self.root = _TrieNode()
+
+    def add(self, name: str, tag_id: int) -> None:
+        node = self.root
+        for char in name:
+            node = node.children.setdefault(char, _TrieNode())
+        node.tag_ids.add(tag_id)
+
+    def remove(self, name: str, tag_id: int) -> None:
+        path: List[Tuple[_TrieNode, str]] = []
+        node = self.root
+        for char in name:
+            if char not in node.children:
+                return
+            path.append((node, char))
+            node = node.children[char]
+        node.tag_ids.discard(tag_id)
+        # remove empty branches
+        for parent, char in reversed(path):
+            child = parent.children[char]
+            if child.tag_ids or child.children:
+                break
+            del parent.children[char]
+
+    def startswith(self, prefix: str) -> Set[int]:
+        node = self.root
+        for char in prefix:
+            if char not in node.children:
+                return set()
+            node = node.children[char]
+        tag_ids: Set[int] = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            tag_ids.update(node.tag_ids)
+            stack.extend(node.children.values())
+        return tag_ids
+
+
+class _ScopeIndex:
+    """Prefix trie and trigram inverted index of all tag names of one scope"""
+    def __init__(self) -> None:
+        self.tag_ids: Set[int] = set()
+        self.trie = _PrefixTrie()
+        self.trigram_index: Dict[str, Set[int]] = {}
+
+    def add(self, tag: _IndexedTag) -> None:
+        self.tag_ids.add(tag.tag_id)
+        for name in tag.names:
+            self.trie.add(name, tag.tag_id)
+            for trigram in tag.trigrams[name]:
+                self.trigram_index.setdefault(trigram, set()).add(tag.tag_id)
+
+    def remove(self, tag: _IndexedTag) -> None:
+        self.tag_ids.discard(tag.tag_id)
+        for name in tag.names:
+            self.trie.remove(name, tag.tag_id)
+            for trigram in tag.trigrams[name]:
+                ids = self.trigram_index.get(trigram)
+                if ids is None:
+                    continue
+                ids.discard(tag.tag_id)
+                if not ids:
+                    del self.trigram_index[trigram]
+
+    def sharing_trigrams(self, query_trigrams: Iterable[str]) -> Set[int]:
+        tag_ids: Set[int] = set()
+        for trigram in query_trigrams:
+            tag_ids.update(self.trigram_index.get(trigram, ()))
+        return tag_ids
+
+
+class TagNameIndex:
+    """
+    In-memory index of tag names and aliases, used for autocompletion.
+
+    Tags are indexed per scope (guild or channel id; 0 for global tags).
+    The results and their order match the SQL queries of `TagManager`:
+
+        - `similar`: `TagManager.find_similar`
+        - `startswith`: `TagManager.startswith`
+        - `recent`: `TagManager.get_tags` with `TagScope.SCOPE`
+
+    Note:
+    -----
+        - the index is empty until `load` was called
+        - `TagManager.set`, `edit` and `remove` keep it up to date
+    """
+    def __init__(self) -> None:
+        self.loaded: bool = False
+        self._tags: Dict[int, _IndexedTag] = {}
+        self._scopes: Dict[int, _ScopeIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def load(self, records: Iterable[Mapping[str, Any]]) -> None:
+        """
+        Builds the index from <records>
+
+        Args:
+        -----
+        records : Iterable[Mapping[str, Any]]
+            records with the columns `tag_id`, `tag_key`, `aliases`, `guild_ids`, `last_use`
+        """
+        self._tags.clear()
+        self._scopes.clear()
+        for record in records:
+            self.add(record)
+        self.loaded = True
+        log.info(f"indexed {len(self._tags)} tag names in {len(self._scopes)} scopes", prefix="cache")
+
+    def add(self, record: Mapping[str, Any]) -> None:
+        """adds or replaces the tag of <record>"""
+        self.remove(record["tag_id"])
+        aliases = [alias for alias in (record["aliases"] or []) if alias]
+        tag = _IndexedTag(
+            tag_id=record["tag_id"],
+            tag_key=record["tag_key"] or "",
+            aliases=aliases,
+            guild_ids=[guild_id for guild_id in (record["guild_ids"] or []) if guild_id is not None],
+            last_use=record["last_use"],
+        )
+        tag.trigrams = {name: trigrams(name) for name in tag.names}
+        self._tags[tag.tag_id] = tag
+        for guild_id in tag.guild_ids:
+            self._scopes.setdefault(guild_id, _ScopeIndex()).add(tag)
+
+    def remove(self, tag_id: int) -> None:
+        tag = self._tags.pop(tag_id, None)
+        if tag is None:
+            return
+        for guild_id in tag.guild_ids:
+            if (scope := self._scopes.get(guild_id)):
+                scope.remove(tag)
+                if not scope.tag_ids:
+                    del self._scopes[guild_id]
+
+    def touch(self, tag_id: int, last_use: datetime) -> None:
+        """updates the last use of a tag"""
+        if (tag := self._tags.get(tag_id)):
+            tag.last_use = last_use
+
+    def _scopes_of(self, guild_id: Optional[int]) -> List[_ScopeIndex]:
+        return [
+            scope for scope_id in {guild_id, 0}
+            if (scope := self._scopes.get(scope_id)) is not None  # type: ignore
+        ]
+
+    def similar(self, query: str, guild_id: Optional[int], accuracy: float, limit: int = 20) -> List[str]:
+        """
+        Returns:
+        --------
+            - (List[str]) tag keys with a key or alias more similar than <accuracy> to <query>,
+              ordered by similarity of the key
+        """
+        query_trigrams = trigrams(query)
+        candidates: Set[int] = set()
+        for scope in self._scopes_of(guild_id):
+            candidates.update(scope.sharing_trigrams(query_trigrams))
+        matches: List[Tuple[float, int]] = []
+        for tag_id in candidates:
+            tag = self._tags[tag_id]
+            if any(similarity(trigram_set, query_trigrams) > accuracy for trigram_set in tag.trigrams.values()):
+                matches.append((similarity(tag.trigrams[tag.tag_key], query_trigrams), tag_id))
+        best = heapq.nlargest(limit, matches)
+        return [self._tags[tag_id].tag_key for _, tag_id in best]
+
+    def startswith(self, prefix: str, guild_id: Optional[int], limit: int = 25) -> List[str]:
+        """
+        Returns:
+        --------
+            - (List[str]) aliases and keys starting with <prefix>
+              of the <limit> latest used matching tags
+        """
+        candidates: Set[int] = set()
+        for scope in self._scopes_of(guild_id):
+            candidates.update(scope.trie.startswith(prefix))
+        tags = heapq.nlargest(limit, (self._tags[tag_id] for tag_id in candidates), key=lambda t: t.last_use)
+        return [
+            name for name in
+            [
+                *[alias for tag in tags for alias in tag.aliases],
+                *[tag.tag_key for tag in tags]
+            ]
+            if name.startswith(prefix)
+        ]
+
+    def recent(self, guild_id: Optional[int], limit: int = 25) -> List[str]:
+        """
+        Returns:
+        --------
+            - (List[str]) the keys of the <limit> latest used tags
+        """
+        tag_ids: Set[int] = set()
+        for scope in self._scopes_of(guild_id):
+            tag_ids.update(scope.tag_ids)
+        tags = heapq.nlargest(limit, (self._tags[tag_id] for tag_id in tag_ids), key=lambda t: t.last_use)
+        return [tag.tag_key for tag in tags]
@@ -24,7 +24,6 @@ import hikari
 from hikari import ButtonStyle, Embed
 from hikari import Snowflake, User, Member
 from hikari.impl import MessageActionRowBuilder
-from numpy import column_stack
 from asyncache import cached
 from cachetools import TTLCache
 from tabulate import tabulate
@@ -32,6 +31,7 @@ from tabulate import tabulate
 from ..shortcuts import guild_name_or_id, get_guild_or_channel_id, user_name_or_id
 from ..language import Human, Multiple
 from core.db import Database, Table
+from .tag_index import TagNameIndex
 from core import Inu, BotResponseError, getLogger
 
 log = getLogger(__name__)
@@ -239,28 +239,30 @@ class Tag():
         """
         if not self.name or not self.value:
             raise RuntimeError("I can't store a tag without a name and value")
-        if self.is_stored:
-            await TagManager.edit(
-                key=self.name,
-                value=[value for value in self.value if value],  # remove empty pages
-                author_ids=list(self.owners),
-                tag_id=self.id,
-                guild_ids=list(self.guild_ids),
-                aliases=list(self.aliases),
-                tag_type=self.tag_type.value,
-                info_visible=self.info_visible,
-            )
-        else:
-            tag_id = await TagManager.set(
-                key=self.name,
-                value=self.value,
-                author_ids=list(self.owners),
-                guild_ids=list(self.guild_ids),
-                aliases=list(self.aliases),
-                tag_type=self.tag_type.value,
-                info_visible=self.info_visible,
-            )
-            self.id = tag_id
+        # the taken-checks and the write share one connection and transaction
+        async with Database().unit_of_work():
+            if self.is_stored:
+                await TagManager.edit(
+                    key=self.name,
+                    value=[value for value in self.value if value],  # remove empty pages
+                    author_ids=list(self.owners),
+                    tag_id=self.id,
+                    guild_ids=list(self.guild_ids),
+                    aliases=list(self.aliases),
+                    tag_type=self.tag_type.value,
+                    info_visible=self.info_visible,
+                )
+            else:
+                tag_id = await TagManager.set(
+                    key=self.name,
+                    value=self.value,
+                    author_ids=list(self.owners),
+                    guild_ids=list(self.guild_ids),
+                    aliases=list(self.aliases),
+                    tag_type=self.tag_type.value,
+                    info_visible=self.info_visible,
+                )
+                self.id = tag_id
         self.is_stored = True
 
     @classmethod
@@ -534,6 +536,8 @@ class TagManager():
     db: Database
     bot: Inu
     table: Table
+    # tag names and aliases for autocompletion
+    name_index: TagNameIndex = TagNameIndex()
 
     def __init__(self, key: Optional[str] = None):
         self.key = key
@@ -562,6 +566,16 @@ class TagManager():
         cls.bot = bot
         cls.table = Table("tags")
 
+    @classmethod
+    async def load_name_index(cls) -> None:
+        """Builds `name_index` with one query over all tags"""
+        records = await cls.db.fetch(
+            """
+            SELECT tag_id, tag_key, aliases, guild_ids, last_use 
+            FROM tags
+            """
+        )
+        cls.name_index.load(records)
 
     @classmethod
     async def set(
@@ -617,6 +631,13 @@ class TagManager():
             tag_type,
             info_visible,
         )
+        cls.name_index.add({
+            "tag_id": record["tag_id"],
+            "tag_key": key,
+            "aliases": aliases,
+            "guild_ids": guild_ids,
+            "last_use": datetime.now(),
+        })
         return record["tag_id"]
 
     @classmethod
@@ -685,7 +706,9 @@ class TagManager():
             WHERE tag_id = $1
             RETURNING *
             """
-        return await cls.db.fetch(sql, id)
+        records = await cls.db.fetch(sql, id)
+        cls.name_index.remove(id)
+        return records
 
     @classmethod
     async def get(
@@ -725,14 +748,13 @@ class TagManager():
             WHERE
                 ( 
                     tag_key = $1 
-                    OR $1 = ANY(aliases) 
+                    OR aliases @> ARRAY[$1::TEXT]
                     OR $4::INT = tag_id
                 ) 
                 AND 
                 ( 
-                    $2::BIGINT = ANY(guild_ids) 
-                    OR 0 = ANY(guild_ids)
-                    OR $3::BIGINT = ANY(author_ids)
+                    guild_ids && ARRAY[$2::BIGINT, 0]
+                    OR author_ids @> ARRAY[$3::BIGINT]
                 ) 
             """
         if key is None and tag_id == -1:
@@ -773,6 +795,7 @@ class TagManager():
             record["type"],
             record["info_visible"],
         )
+        cls.name_index.add(record)
     @classmethod
     async def fetch_by_id(cls, tag_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -847,7 +870,7 @@ class TagManager():
         """
         sql = """
             SELECT * FROM tags
-            WHERE tag_key = $1 OR $1 = ANY(aliases)
+            WHERE tag_key = $1 OR aliases @> ARRAY[$1::TEXT]
             """
         if guild_id is None:
             guild_id = 0
@@ -900,8 +923,9 @@ class TagManager():
     @classmethod
     async def _update_tag_last_use(cls, tag_id: int, tag_uses: int):
         table = Table("tags")
-        
-        await table.update({"last_use": datetime.now(), "uses": tag_uses}, {"tag_id": tag_id})
+        last_use = datetime.now()
+        await table.update({"last_use": last_use, "uses": tag_uses}, {"tag_id": tag_id})
+        cls.name_index.touch(tag_id, last_use)
     
     @classmethod
     async def get_tags(
@@ -936,22 +960,22 @@ class TagManager():
         if limit:
             after_sql += f" LIMIT {limit}"
         if type == TagScope.GLOBAL:
-            sql = f"{sql} WHERE 0 = ANY(guild_ids) {after_sql}"
+            sql = f"{sql} WHERE guild_ids @> ARRAY[0::BIGINT] {after_sql}"
             return await cls.db.fetch(sql)
         elif type == TagScope.GUILD:
             if guild_id is None:
                 raise RuntimeError("Can't fetch tags of a guild without an id (id is None)")
-            sql = f"{sql} WHERE $1 = ANY(guild_ids) {after_sql}"
+            sql = f"{sql} WHERE guild_ids @> ARRAY[$1::BIGINT] {after_sql}"
             return await cls.db.fetch(sql, guild_id)
         elif type == TagScope.YOUR:
             if author_id is None:
                 raise RuntimeError("Can't fetch tags of a creator without an id (id is None)")
-            sql = f"{sql} WHERE $1 = ANY(author_ids) {after_sql}"
+            sql = f"{sql} WHERE author_ids @> ARRAY[$1::BIGINT] {after_sql}"
             return await cls.db.fetch(sql, author_id)
         elif type == TagScope.SCOPE:
             if guild_id is None:
                 raise RuntimeError("Can't fetch tags of a guild without an id (id is None)")
-            sql = f"{sql} WHERE $1 = ANY(guild_ids) OR 0 = ANY(guild_ids) {after_sql}"
+            sql = f"{sql} WHERE guild_ids && ARRAY[$1::BIGINT, 0] {after_sql}"
             return await cls.db.fetch(sql, guild_id)
         raise RuntimeError(f"TagType unmatched - {type}")
     
@@ -999,7 +1023,7 @@ class TagManager():
         dollar = (f'${num}' for num in range(3,99))
         if creator_id:
             vals.append(creator_id)
-            extra_where_statement.append(f"{next(dollar)} = ANY(creator_ids) ")
+            extra_where_statement.append(f"author_ids @> ARRAY[{next(dollar)}::BIGINT] ")
 
         if tag_type is not None:
             vals.append(tag_type.value)
@@ -1015,8 +1039,7 @@ class TagManager():
             FROM tags
             WHERE 
                 (
-                    ($1 = ANY(guild_ids)
-                    OR 0 = ANY(guild_ids))
+                    guild_ids && ARRAY[$1::BIGINT, 0]
                     {extra_where_statement}
                 ) 
                     AND
@@ -1076,7 +1099,7 @@ class TagManager():
             FROM tags
             WHERE 
                 (
-                    ($1 = ANY(guild_ids) or 0 = ANY(guild_ids)) 
+                    guild_ids && ARRAY[$1::BIGINT, 0]
                     AND 
                     (
                         starts_with(tag_key, $2) 
@@ -1132,8 +1155,23 @@ class TagManager():
         - Fuzzy search for 3+ characters
         - Prefix matching for 1-2 characters 
         - Recent tags for empty input
+
+        When `name_index` is loaded, it answers without querying the database.
         """
         guild_or_channel = get_guild_or_channel_id(interaction)
+        if cls.name_index.loaded:
+            try:
+                value = str(option.value or "")
+                if len(value) > 2:
+                    return cls.name_index.similar(
+                        value, guild_or_channel, float(cls.bot.conf.tags.prediction_accuracy)
+                    )[:24]
+                elif len(value) in [1, 2]:
+                    return cls.name_index.startswith(value, guild_or_channel)[:24]
+                else:
+                    return cls.name_index.recent(guild_or_channel)[:24]
+            except Exception:
+                log.error(traceback.format_exc())
         try:
             if option.value and len(str(option.value)) > 2:
                 tags = await cls.find_similar(option.value, guild_id=guild_or_channel)
@@ -1173,7 +1211,7 @@ class TagManager():
         return (await table.fetch(
             f"""
             SELECT COUNT(*) as tag_amount FROM tags
-            WHERE $1 = any(guild_ids) 
+            WHERE guild_ids @> ARRAY[$1::BIGINT]
             """,
             guild_id
         ))[0]["tag_amount"]
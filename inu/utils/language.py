@@ -7,7 +7,6 @@ import random
 import os
 
 import hikari
-from numpy import isin, real
 import inspect
 import textwrap
 from pprint import pprint
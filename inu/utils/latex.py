@@ -23,14 +23,11 @@ from pyparsing import (
 )
 import math
 import operator
-import matplotlib
 from pprint import pformat
 import traceback
 from abc import ABC, abstractmethod
-# switch to pgf backend
+# matplotlib is imported on first use, it's expensive and only needed for rendering
 
-
-import matplotlib.pyplot as plt
 from io import BytesIO
 import re
 from PIL import Image
@@ -51,12 +48,14 @@ def swtich_backend():
     This function sets the necessary rcParams for using LaTeX with matplotlib's 'pgf' backend.
     It configures the LaTeX system, font, array stretch, and includes the eurosym package.
 
-    Note: This function assumes that matplotlib and plt have been imported.
+    Note: matplotlib is imported here and not at module level, to keep it out of the startup.
 
     Example usage:
     >>> swtich_backend()
 
     """
+    import matplotlib
+    import matplotlib.pyplot as plt
     plt.switch_backend('pgf')
     matplotlib.use('pgf')
     plt.rcParams.update({
@@ -930,6 +929,7 @@ def latex2image(
 
 
     swtich_backend()
+    import matplotlib.pyplot as plt
     try:
         fig = plt.figure(figsize=image_size_in, dpi=dpi)
         fig.patch.set_alpha(0)
@@ -951,6 +951,7 @@ def latex2image(
         fig.set_size_inches(image_size_in)
         buffer = BytesIO()
         plt.savefig(buffer, format='png', bbox_inches='tight', pad_inches=0.0)
+        plt.close(fig)
         buffer.seek(0)
 
         return buffer
@@ -972,15 +973,39 @@ def evaluation2image(evaluation: str, multiline: bool = False) -> BytesIO:
     Returns:
         BytesIO: The image representation of the evaluation in LaTeX format.
     """
+    latex = evaluation2latex(evaluation)
+    if latex is None:
+        return None
+    image = latex2image(latex, multiline=multiline)
+    return image
+
+def evaluation2latex(evaluation: str) -> str | None:
+    """
+    Converts a mathematical evaluation string into LaTeX.
+
+    Args:
+        evaluation (str): The mathematical evaluation string.
+
+    Returns:
+        str | None: The LaTeX string or None, if the evaluation doesn't need LaTeX.
+    """
     evaluations = [ev for ev in evaluation.splitlines()] if len(evaluation.splitlines()) > 1 else [evaluation]
     parser = NumericStringParser()
     evaluations = [parser.eval(ev) for ev in evaluations]
     if not parser.needs_latex:
         log.debug("No latex needed")
         return None
-    latex = "\n".join(evaluations)
+    return "\n".join(evaluations)
+
+def latex2png(latex: str, multiline: bool = False) -> bytes | None:
+    """
+    Renders <latex> with `latex2image` and returns the PNG as bytes,
+    so that it can be returned from a worker process.
+    """
     image = latex2image(latex, multiline=multiline)
-    return image
+    if image is None:
+        return None
+    return image.getvalue()
 
 def prepare_for_latex(result: str) -> str:
     """prepares the result for latex by removing unicode characters like √ or π"""
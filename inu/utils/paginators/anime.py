@@ -15,7 +15,6 @@ from hikari import ButtonStyle, ComponentInteraction, Embed, ResponseType
 from hikari.impl import MessageActionRowBuilder
 
 import lightbulb
-from numpy import longdouble, sort
 from pyparsing import CloseMatch
 from tabulate import tabulate
 
@@ -364,6 +363,12 @@ class AnimePaginator(Paginator):
         if not (anime := self._results[self._position].get("anime")):
             anime = await MyAnimeList.fetch_anime_by_id(mal_id)
             self._results[self._position]["anime"] = anime
+            # the neighbours are likely the next pages
+            MyAnimeList.prefetch(
+                self._results[position]["node"]["id"] 
+                for position in (self._position + 1, self._position - 1)
+                if 0 <= position < len(self._results)
+            )
         log.debug(f"fetched anime: {anime}")
         return anime
 
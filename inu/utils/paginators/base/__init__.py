@@ -4,6 +4,7 @@ from .observer import (
     BaseObserver, EventObserver, InteractionObserver,
     listener, button
 )
+from .router import InteractionRouter
 from .base import (
     Paginator, 
     StatelessPaginator, 
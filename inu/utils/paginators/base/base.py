@@ -40,6 +40,7 @@ import lightbulb
 from lightbulb.context import Context
 
 from . import EventListener, InteractionListener, ButtonListener, EventObserver, InteractionObserver, PaginatorReadyEvent, PaginatorTimeoutEvent
+from .router import InteractionRouter
 from core import InuContext, get_context, BotResponseError, getLogger, ResponseProxy, Inu, Interaction, InuContextBase
 from utils import add_row_when_filled, Multiple
 
@@ -1243,64 +1244,77 @@ class Paginator(Generic[PageType]):
                     )
             
 
-            while not self._stop.is_set():
-                self.log.debug(f"re-enter pagination loop - status: {self._stop.is_set()}, {self.timeout=}")
-                done, pending = [], []
-                try:
-                    # default events
-                    events = [
-                        create_event(InteractionCreateEvent),
-                        self._stop.wait()
-                    ]
-                    # adding user specific events
-                    for event in self.listen_to_events:
-                        events.append(create_event(event))
-                    # wait for first incoming event
-                    done, pending = await asyncio.wait(
-                        [asyncio.create_task(task) for task in events],
-                        return_when=asyncio.FIRST_COMPLETED,
-                        timeout=self.timeout - (time.time() - self._last_used)
-                    )
-                except Exception:
-                    log.error(traceback.format_exc())
+            # component interactions are routed by message id through the `InteractionRouter`
+            router = InteractionRouter(self.bot)
+            interactions: asyncio.Queue[InteractionCreateEvent] = asyncio.Queue()
+            if self._message is None:
+                self.log.error("pagination loop started without a message - no interactions can be routed to it")
+                return
+            message_id = self._message.id
+            router.register(interactions, message_id)
+            try:
+                while not self._stop.is_set():
+                    self.log.debug(f"re-enter pagination loop - status: {self._stop.is_set()}, {self.timeout=}")
+                    done, pending = [], []
+                    try:
+                        # default events
+                        events = [
+                            interactions.get(),
+                            self._stop.wait()
+                        ]
+                        # adding user specific events; interactions are already routed
+                        for event in self.listen_to_events:
+                            if issubclass(event, InteractionCreateEvent):
+                                continue
+                            events.append(create_event(event))
+                        # wait for first incoming event
+                        done, pending = await asyncio.wait(
+                            [asyncio.create_task(task) for task in events],
+                            return_when=asyncio.FIRST_COMPLETED,
+                            timeout=self.timeout - (time.time() - self._last_used)
+                        )
+                    except Exception:
+                        log.error(traceback.format_exc())
                 
-                # timeout - no tasks done - stop
-                if len(done) == 0:
-                    self.log.debug(f"no done tasks - stop")
-                    await self.dispatch_event(PaginatorTimeoutEvent(self.bot))
-                    self._stop.set()
+                    # timeout - no tasks done - stop
+                    if len(done) == 0:
+                        self.log.debug(f"no done tasks - stop")
+                        await self.dispatch_event(PaginatorTimeoutEvent(self.bot))
+                        self._stop.set()
                 
-                # cancel all other tasks
-                for e in pending:
-                    e.cancel()
-                if self._stop.is_set():
-                    continue
-
-                # unpack Event
-                event = done.pop().result()
-                if not isinstance(event, hikari.Event):
-                    log.error(f"Unknown result - not an instance of `hikari.Event`")
-                    self._stop.set()
-                    continue
-
-                if isinstance(event, hikari.InteractionCreateEvent) and isinstance(event.interaction, hikari.ComponentInteraction):
-                    custom_id = event.interaction.custom_id
-                    if (
-                        self.interaction_pred(event.interaction)
-                        and (
-                            custom_id in [  # pagination buttons
-                                "first", "previous", "search",
-                                "stop", "next", "last", 
-                            ]
-                            or custom_id.startswith(NUMBER_BUTTON_PREFIX)  # pagination button
-                            or Multiple.startswith_(custom_id, self.get_button_custom_ids())  # user defined buttons
-                        )
-                    ):
-                        # pagination event
-                        self.set_context(interaction=event.interaction)  # type: ignore
-
-                self.log.debug(f"dispatch event | {self.count}")
-                await self.dispatch_event(event)
+                    # cancel all other tasks
+                    for e in pending:
+                        e.cancel()
+                    if self._stop.is_set():
+                        continue
+
+                    # unpack Event
+                    event = done.pop().result()
+                    if not isinstance(event, hikari.Event):
+                        log.error(f"Unknown result - not an instance of `hikari.Event`")
+                        self._stop.set()
+                        continue
+
+                    if isinstance(event, hikari.InteractionCreateEvent) and isinstance(event.interaction, hikari.ComponentInteraction):
+                        custom_id = event.interaction.custom_id
+                        if (
+                            self.interaction_pred(event.interaction)
+                            and (
+                                custom_id in [  # pagination buttons
+                                    "first", "previous", "search",
+                                    "stop", "next", "last", 
+                                ]
+                                or custom_id.startswith(NUMBER_BUTTON_PREFIX)  # pagination button
+                                or Multiple.startswith_(custom_id, self.get_button_custom_ids())  # user defined buttons
+                            )
+                        ):
+                            # pagination event
+                            self.set_context(interaction=event.interaction)  # type: ignore
+
+                    self.log.debug(f"dispatch event | {self.count}")
+                    await self.dispatch_event(event)
+            finally:
+                router.unregister(interactions, message_id)
             await self.stop()
             return
         except BotResponseError as e:
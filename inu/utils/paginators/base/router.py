@@ -0,0 +1,77 @@
+import asyncio
+from typing import *
+
+import hikari
+from hikari import ComponentInteraction, InteractionCreateEvent
+
+from core import Inu, getLogger, Singleton
+
+log = getLogger(__name__)
+
+__all__: Final[List[str]] = ["InteractionRouter"]
+
+
+class InteractionRouter(metaclass=Singleton):
+    """
+    Routes component interactions to the paginators which own them.
+
+    The router subscribes once to `InteractionCreateEvent` and looks up the
+    owners of an interaction by its message id, instead of letting every open
+    paginator evaluate its own `bot.wait_for` predicate.
+
+    Note:
+    -----
+        - paginators register a queue; the router only puts events into it
+        - more than one paginator can own a message (e.g. a rebuilt `StatelessPaginator`);
+          each of them gets the event and unregisters only its own queue
+        - unknown interactions are ignored, so other listeners
+          (e.g. stateless paginators) still receive them as usual
+    """
+    def __init__(self, bot: Inu):
+        self.bot = bot
+        self._by_message: Dict[int, List[asyncio.Queue[InteractionCreateEvent]]] = {}
+        self.bot.subscribe(InteractionCreateEvent, self.on_interaction)
+        log.debug("subscribed interaction router to InteractionCreateEvent")
+
+    @property
+    def size(self) -> int:
+        """the amount of registered routes"""
+        return sum(len(queues) for queues in self._by_message.values())
+
+    def register(self, queue: asyncio.Queue[InteractionCreateEvent], message_id: int) -> None:
+        """
+        Args:
+        -----
+        queue : asyncio.Queue[InteractionCreateEvent]
+            the queue where matching events will be put in
+        message_id : int
+            route all component interactions of this message to <queue>
+        """
+        self._by_message.setdefault(message_id, []).append(queue)
+
+    def unregister(self, queue: asyncio.Queue[InteractionCreateEvent], message_id: int) -> None:
+        """removes the route of <queue> which was added with `register`"""
+        queues = self._by_message.get(message_id)
+        if not queues:
+            return
+        try:
+            queues.remove(queue)
+        except ValueError:
+            return
+        if not queues:
+            del self._by_message[message_id]
+
+    def route(self, interaction: ComponentInteraction) -> List[asyncio.Queue[InteractionCreateEvent]]:
+        """
+        Returns:
+        --------
+        List[asyncio.Queue[InteractionCreateEvent]]
+            the queues of the owners of <interaction>; empty if there is no owner
+        """
+        return self._by_message.get(interaction.message.id, [])
+
+    async def on_interaction(self, event: InteractionCreateEvent) -> None:
+        if not isinstance(event.interaction, ComponentInteraction):
+            return
+        for queue in self.route(event.interaction):
+            queue.put_nowait(event)
@@ -12,6 +12,7 @@ from lightbulb import Context
 from tmdb import route
 from tabulate import tabulate
 from fuzzywuzzy import fuzz
+from cachetools import TTLCache
 
 from .base import Paginator, listener
 
@@ -26,6 +27,8 @@ config = ConfigProxy(ConfigType.YAML)
 size = "/original"
 base_url = f"https://image.tmdb.org/t/p{size}"
 base = None
+# `tmdb.route` uses its own session, hence the responses are cached here and not by `HttpClient`
+tmdb_cache: TTLCache = TTLCache(maxsize=1024, ttl=24*60*60)
 
 async def tmdb_setup():
     base = route.Base()
@@ -164,10 +167,12 @@ class ShowPaginator(Paginator):
         search : str
             the name of the tv show to get results from
         """
-        show_route = route.Show()
-        show_json = await show_route.search(search)
-        self._results = show_json["results"]
-        await show_route.session.close()
+        if (show_json := tmdb_cache.get(("search", search))) is None:
+            show_route = route.Show()
+            show_json = await show_route.search(search)
+            await show_route.session.close()
+            tmdb_cache[("search", search)] = show_json
+        self._results = list(show_json["results"])
         embeds = [Embed(description="spaceholder") for _ in range(len(self._results))]
         if len(embeds) == 0:
             raise BotResponseError("Seems like your given TV show doesn't exist", ephemeral=True)
@@ -182,12 +187,16 @@ class ShowPaginator(Paginator):
             return
         
         try:
-            show_route = route.Show()
-            details = await show_route.details(self._results[self._position]["id"])
+            show_id = self._results[self._position]["id"]
         except IndexError:
             raise BotResponseError("Seems like your given TV show doesn't exist", ephemeral=True)
-        finally:
-            await show_route.session.close()
+        if (details := tmdb_cache.get(("show", show_id))) is None:
+            show_route = route.Show()
+            try:
+                details = await show_route.details(show_id)
+            finally:
+                await show_route.session.close()
+            tmdb_cache[("show", show_id)] = details
         
         # otherwise not accessible for season button
         self._results[self._position] = details
@@ -337,10 +346,13 @@ class ShowSeasonPaginator(Paginator):
         try:
             if not self._pages[self._position].description == "spaceholder":
                 return
-            show_route = route.Season()
-            details = await show_route.details(self._tv_show_id, self._results[self._position]["season_number"])
+            season = self._results[self._position]["season_number"]
+            if (details := tmdb_cache.get(("season", self._tv_show_id, season))) is None:
+                show_route = route.Season()
+                details = await show_route.details(self._tv_show_id, season)
+                await show_route.session.close()
+                tmdb_cache[("season", self._tv_show_id, season)] = details
             self._detail_cache[self._position] = details
-            await show_route.session.close()
         except IndexError:
             await self.ctx.respond("Seems like there is no season preview for this TV show", ephemeral=True)
             return 
@@ -12,9 +12,6 @@ import hikari
 from hikari import ButtonStyle
 import lightbulb
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import mplcyberpunk
 
 from utils.db import PollManager
 from utils import Colors
@@ -23,6 +20,8 @@ from core import Table, Inu, getLogger, ConfigProxy, ConfigType, InuContext
 log = getLogger(__name__)
 conf = ConfigProxy(ConfigType.YAML)
 POLL_SYNC_TIME = conf.commands.poll_sync_time
+# the minimum time in seconds between two edits of a poll message
+EMBED_UPDATE_INTERVAL = 0.5
 PIE_CHART_COLORS = [
     "tab:blue", "tab:orange", "tab:green",
     "tab:red", "tab:purple", "tab:brown",
@@ -169,6 +168,8 @@ class Poll():
     _creator_id: int
     # list with poll ids
     _finalizing: Set[int] = set()
+    # message_id -> task, which loads this poll; concurrent first clicks share it
+    _loading: Dict[int, asyncio.Task] = {}
 
     def __init__(
         self, 
@@ -197,9 +198,9 @@ class Poll():
         ]
         self._reaction_letter: Dict[str, str] = {r: l for r, l in zip(self.letter_emojis, "ABCDEFGHIJKLMNOPQRSTUVWXYZ")}
         self.bot = bot
-        # mapping from option id to a list with user ids
-        # Dict[option_id, List[user_id]]
-        self._poll: Dict[int, List[int]] = {}
+        # mapping from option id to a set with user ids
+        # Dict[option_id, Set[user_id]]
+        self._poll: Dict[int, Set[int]] = {}
         # mapping from option id to the option title
         self._options: Dict[int, str] = {}
         # mapping from option id to reaction/letter/partial custom id e.g. 1 -> A
@@ -218,6 +219,35 @@ class Poll():
         self._channel_id = record["channel_id"]
         self._creator_id = record["creator_id"]
 
+        self._embed_outdated: bool = False
+        self._embed_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def from_message_id(cls, message_id: int, bot: Inu) -> Optional["Poll"]:
+        """
+        Returns the poll of <message_id> from `PollManager.message_id_cache`.
+        The poll is loaded from the db, if it is not in memory yet.
+        """
+        if message_id not in PollManager.message_id_cache:
+            return None
+        if (poll := PollManager.message_id_cache[message_id]) is not None:
+            return poll
+        if (task := cls._loading.get(message_id)) is None:
+            task = asyncio.create_task(cls._load(message_id, bot))
+            cls._loading[message_id] = task
+            task.add_done_callback(lambda _: cls._loading.pop(message_id, None))
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _load(cls, message_id: int, bot: Inu) -> Optional["Poll"]:
+        record = await PollManager.fetch_poll(message_id=message_id)
+        if not record:
+            return None
+        poll = cls(record, bot)
+        await poll.fetch()
+        if message_id in PollManager.message_id_cache:
+            PollManager.message_id_cache[message_id] = poll
+        return poll
 
         # f"{int(time.time)}{ctx.author.id}{ctx.guild_id}"
     @property 
@@ -249,7 +279,7 @@ class Poll():
                     "votes": self._poll[id],
                 }
             )
-        options.sort(key=lambda d: d["votes"], reverse=True)
+        options.sort(key=lambda d: len(d["votes"]), reverse=True)
         for option, _, emoji_or_name in zip(options, PIE_CHART_COLORS, COLOR_TO_EMOJI):
             option["color"] = emoji_or_name or "/"
 
@@ -438,6 +468,54 @@ class Poll():
         option_filled_blocks = int(round(option_perc * str_len, 0))
         return f"{option_filled_blocks * '█'}{int(str_len - option_filled_blocks) * '░'}"
 
+    def option_id_by_reaction(self, reaction: str) -> Optional[int]:
+        """returns the option id for a reaction/letter"""
+        for option_id, option_reaction in self._id_reaction.items():
+            if option_reaction == reaction:
+                return option_id
+        return None
+
+    def vote(self, user_id: int, option_id: int) -> bool:
+        """
+        Replaces the vote of <user_id> with <option_id> in memory
+        and queues it for `PollManager.flush_votes`
+
+        Returns:
+        --------
+        bool
+            whether the vote changed
+        """
+        if user_id in self._poll.get(option_id, ()):
+            return False
+        for voters in self._poll.values():
+            voters.discard(user_id)
+        self._poll.setdefault(option_id, set()).add(user_id)
+        PollManager.queue_vote(self.id, user_id, option_id)
+        return True
+
+    def schedule_embed_update(self) -> None:
+        """
+        Edits the poll message.
+        Edits are coalesced, so that the message is edited at most every `EMBED_UPDATE_INTERVAL` seconds
+        """
+        self._embed_outdated = True
+        if self._embed_task is None or self._embed_task.done():
+            self._embed_task = asyncio.create_task(self._update_embed())
+
+    async def _update_embed(self) -> None:
+        while self._embed_outdated:
+            self._embed_outdated = False
+            try:
+                await self.bot.rest.edit_message(
+                    self.channel_id,
+                    self.message_id,
+                    embed=self.embed,
+                    components=self.components,
+                )
+            except Exception:
+                log.error(f"Failed to update poll {self._id}", exc_info=True)
+            await asyncio.sleep(EMBED_UPDATE_INTERVAL)
+
     def _reaction_by_id(self, id: int) -> str:
         """
         returns the emoji for the given id
@@ -461,15 +539,12 @@ class Poll():
             self._id_reaction[option_record["option_id"]] = option_record["reaction"]
 
         for k in self._options.keys():
-            self._poll[k] = []
+            self._poll[k] = set()
 
         # fetch votes
         for vote_record in await PollManager.fetch_votes(self.id):
-            # insert votes into polls - mapping from option_id to a list of user_ids
-            if vote_record['option_id'] in self._poll.keys():
-                self._poll[vote_record['option_id']].append(vote_record['user_id'])
-            else:
-                self._poll[vote_record['option_id']] = [vote_record['user_id']]
+            # insert votes into polls - mapping from option_id to a set of user_ids
+            self._poll.setdefault(vote_record['option_id'], set()).add(vote_record['user_id'])
 
     async def dispatch_embed(
         self, 
@@ -510,6 +585,7 @@ class Poll():
             return
         self.__class__._finalizing.add(self.id)
         await asyncio.sleep(self.expires.timestamp() - tm.time())
+        await PollManager.flush_votes()
         await self.fetch()
         await self.bot.rest.create_message(
             channel=self.channel_id,
@@ -520,6 +596,10 @@ class Poll():
         self.__class__._finalizing.remove(self.id)
 
     def _make_pie_chart(self) -> BytesIO:
+        # imported on first use to keep them out of the startup
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        import mplcyberpunk  # registers the `cyberpunk` style
         #Using matplotlib
         plt.style.use("cyberpunk")
         sns.set_palette("Set2")
@@ -0,0 +1,303 @@
+"""
+Renders matplotlib charts and LaTeX in worker processes, so that the event loop
+(and with it the gateway heartbeat) is not blocked while a picture is drawn.
+"""
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta, tzinfo
+from typing import *
+
+import pandas as pd
+from cachetools import LRUCache
+
+from core import getLogger, Singleton, BotResponseError, ConfigProxy, ConfigType, forward_logs, receive_logs
+from core._log_writer import LogReceiver
+from .latex import evaluation2latex
+
+log = getLogger(__name__)
+
+__all__: Final[List[str]] = ["RenderService", "LatexCache"]
+
+
+def _init_worker(log_queue: "multiprocessing.Queue") -> None:
+    """
+    Pre-imports the heavy modules in every worker process,
+    so that the first job of a worker doesn't pay for it.
+    Records logged in the worker are written by the main process
+    """
+    forward_logs(log_queue)
+    import matplotlib
+    import matplotlib.pyplot as plt
+    import matplotlib.backends.backend_pgf
+    import seaborn
+    import mplcyberpunk
+    from . import charts, latex
+    matplotlib.use("agg")
+    plt.style.use("cyberpunk")
+
+
+def _warm_up() -> None:
+    pass
+
+
+def _render_latex(latex: str, multiline: bool) -> bytes | None:
+    from .latex import latex2png
+    return latex2png(latex, multiline=multiline)
+
+
+def _render_activity_chart(
+    df: pd.DataFrame,
+    activities: List[str],
+    tz: Optional[tzinfo],
+    distinguishable_colors: bool,
+) -> Tuple[bytes, pd.DataFrame]:
+    from .charts import activity_chart
+    return activity_chart(df, activities, tz=tz, distinguishable_colors=distinguishable_colors)
+
+
+def _render_week_activity_chart(df: pd.DataFrame, since: timedelta) -> Tuple[bytes, pd.DataFrame]:
+    from .charts import week_activity_chart
+    return week_activity_chart(df, since)
+
+
+class LatexCache:
+    """
+    Content addressed cache for rendered LaTeX.
+
+    The key is the sha256 of the LaTeX string and the multiline flag.
+    Pictures are kept in a LRU which is limited by the size of the PNGs in bytes.
+    Optionally they are also stored in <directory>, which survives restarts.
+    The directory is limited to <max_disk_size> bytes; the least recently used files are removed first.
+    Disk I/O runs in a thread.
+    """
+    def __init__(self, max_size: int, directory: str | None = None, max_disk_size: int = 256 * 1024**2) -> None:
+        self._cache: LRUCache[str, bytes] = LRUCache(maxsize=max_size, getsizeof=len)
+        self.directory = directory
+        self.max_disk_size = max_disk_size
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        # size of <directory>; None until it was measured
+        self._disk_size: int | None = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<LatexCache hits={self.hits} disk_hits={self.disk_hits} misses={self.misses} "
+            f"entries={len(self._cache)} size={self._cache.currsize}/{self._cache.maxsize}>"
+        )
+
+    @staticmethod
+    def key(latex: str, multiline: bool) -> str:
+        return hashlib.sha256(f"{int(multiline)}:{latex}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")  # type: ignore
+
+    async def get(self, key: str) -> bytes | None:
+        if (picture := self._cache.get(key)) is not None:
+            self.hits += 1
+            return picture
+        if self.directory and (picture := await asyncio.to_thread(self._read, key)) is not None:
+            self.disk_hits += 1
+            self._put_memory(key, picture)
+            return picture
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, picture: bytes) -> None:
+        self._put_memory(key, picture)
+        if not self.directory:
+            return
+        try:
+            await asyncio.to_thread(self._write, key, picture)
+        except OSError:
+            log.warning(f"can't store rendered LaTeX {key} on disk", exc_info=True)
+
+    def _read(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                picture = f.read()
+            # the modification time is used as last access for the eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return picture
+
+    def _write(self, key: str, picture: bytes) -> None:
+        with open(self._path(key), "wb") as f:
+            f.write(picture)
+        if self._disk_size is None:
+            self._evict()
+        else:
+            self._disk_size += len(picture)
+            if self._disk_size > self.max_disk_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        """removes the oldest files until <directory> is smaller than 90% of `max_disk_size`"""
+        files: List[Tuple[float, int, str]] = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".png"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum(file_size for _, file_size, _ in files)
+        if size > self.max_disk_size:
+            for _, file_size, path in sorted(files):
+                if size <= self.max_disk_size * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                    size -= file_size
+                except FileNotFoundError:
+                    pass
+        self._disk_size = size
+
+    def _put_memory(self, key: str, picture: bytes) -> None:
+        try:
+            self._cache[key] = picture
+        except ValueError:
+            # picture is bigger than the whole cache
+            pass
+
+
+class RenderService(metaclass=Singleton):
+    """
+    Process pool for rendering pictures.
+
+    Every method returns the rendered PNG as bytes.
+
+    Config (section `render`):
+    -------------------------
+        - workers: amount of worker processes
+        - timeout: seconds until a job is cancelled and the pool is restarted
+        - queue_size: maximum amount of pending jobs
+        - latex_cache_size: size of the LaTeX picture cache in bytes
+        - latex_cache_dir: directory where rendered LaTeX is stored; disabled if not set
+        - latex_cache_dir_size: maximum size of <latex_cache_dir> in bytes
+
+    Note:
+    -----
+        - the pool is started lazily with the first job, or with `start`
+        - if the queue is full, a `BotResponseError` is raised
+    """
+    def __init__(self) -> None:
+        try:
+            options = ConfigProxy(ConfigType.YAML).render.options
+        except AttributeError:
+            # config without `render` section
+            options = {}
+        self.workers: int = int(options.get("workers", 2))
+        self.timeout: float = float(options.get("timeout", 30))
+        self.queue_size: int = int(options.get("queue_size", 16))
+        self.latex_cache = LatexCache(
+            max_size=int(options.get("latex_cache_size", 32 * 1024**2)),
+            directory=options.get("latex_cache_dir") or None,
+            max_disk_size=int(options.get("latex_cache_dir_size", 256 * 1024**2)),
+        )
+        self._pool: ProcessPoolExecutor | None = None
+        self._log_receiver: LogReceiver | None = None
+        self._slots = asyncio.BoundedSemaphore(self.queue_size)
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # a new queue for every pool; a terminated worker could leave the old one locked
+            log_queue: multiprocessing.Queue = multiprocessing.Queue()
+            self._log_receiver = receive_logs(log_queue)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(log_queue,)
+            )
+        return self._pool
+
+    async def start(self) -> None:
+        """starts the pool and waits until every worker has imported its modules"""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.pool, _warm_up) for _ in range(self.workers)
+        ])
+        log.info(f"started {self.workers} render workers", prefix="init")
+
+    def _restart(self) -> None:
+        """terminates the current pool; a new one is created with the next job"""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if self._log_receiver is not None:
+            self._log_receiver.stop()
+        # a hanging worker would never finish, hence kill the processes
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._slots.locked():
+            raise BotResponseError("I am rendering too many pictures right now. Try again in a few seconds", ephemeral=True)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(self.pool, fn, *args),
+                    timeout=self.timeout,
+                )
+            except asyncio.TimeoutError:
+                log.warning(f"{fn.__name__} took longer than {self.timeout}s - restarting render pool")
+                self._restart()
+                raise
+            except BrokenProcessPool:
+                log.error(f"render pool broke while executing {fn.__name__} - restarting render pool")
+                self._restart()
+                raise
+
+    async def render_latex(self, latex: str, multiline: bool = False) -> bytes | None:
+        """renders <latex> to PNG; cached pictures are returned without rendering"""
+        key = LatexCache.key(latex, multiline)
+        if (picture := await self.latex_cache.get(key)) is not None:
+            return picture
+        picture = await self._submit(_render_latex, latex, multiline)
+        if picture is not None:
+            await self.latex_cache.put(key, picture)
+        return picture
+
+    async def render_evaluation(self, evaluation: str, multiline: bool = False) -> bytes | None:
+        """
+        renders a mathematical evaluation to PNG
+
+        Returns:
+        --------
+        bytes | None
+            the PNG or None, if the evaluation doesn't need LaTeX
+        """
+        # parsing is cheap compared to rendering and gives the cache key
+        latex = evaluation2latex(evaluation)
+        if latex is None:
+            return None
+        return await self.render_latex(latex, multiline)
+
+    async def render_activity_chart(
+        self,
+        df: pd.DataFrame,
+        activities: List[str],
+        tz: Optional[tzinfo] = None,
+        distinguishable_colors: bool = False,
+    ) -> Tuple[bytes, pd.DataFrame]:
+        """renders the activity graph of `/current-games`; see `charts.activity_chart`"""
+        return await self._submit(_render_activity_chart, df, activities, tz, distinguishable_colors)
+
+    async def render_week_activity_chart(self, df: pd.DataFrame, since: timedelta) -> Tuple[bytes, pd.DataFrame]:
+        """renders the chart of `/week-activity`; see `charts.week_activity_chart`"""
+        return await self._submit(_render_week_activity_chart, df, since)
+
+    def shutdown(self) -> None:
+        """stops the worker processes"""
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        log.info("stopped render workers")
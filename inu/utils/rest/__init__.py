@@ -1,3 +1,4 @@
+from .http import *
 from .urban import *
 from .bored import *
 from .my_anime_list import MALTypes, MyAnimeListAIOClient, MALRatings
@@ -1,18 +1,18 @@
-from selenium.webdriver import Firefox
-from selenium.webdriver.firefox.options import Options
 from pprint import pprint
 from datetime import timedelta
 import re
 import asyncio
 from typing import *
 
-import selenium_async
 from expiring_dict import ExpiringDict
 
 
 from core import stopwatch
 from core.api import PartialAnimeMatch, AnimeMatch
 
+if TYPE_CHECKING:
+    from selenium.webdriver import Firefox
+
 
 # from utils.db import MyAnimeList
 
@@ -29,11 +29,11 @@ class AnimeCornerAPI:
 
     def __init__(self) -> None:
         self.link = "https://animecorner.me/spring-2023-anime-rankings-week-12/"
-        opts = Options()
-        opts.add_argument('--headless')
-        opts.log.level = "trace"
 
-    def create_browser(self) -> Firefox:
+    def create_browser(self) -> "Firefox":
+        # selenium is imported on first use to keep it out of the startup
+        from selenium.webdriver import Firefox
+        from selenium.webdriver.firefox.options import Options
         opts = Options()
         opts.add_argument('--headless')
         opts.log.level = "trace"
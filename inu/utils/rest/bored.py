@@ -3,6 +3,7 @@ import aiohttp
 import hikari
 
 from utils import Colors
+from .http import HttpClient
 {
   "activity": "Make a couch fort",
   "type": "recreational",
@@ -36,9 +37,7 @@ class BoredAPI:
     @classmethod
     async def fetch_idea(cls, ssl: bool = True) -> BoredIdea:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(cls.Endpoint, ssl=ssl) as resp:
-                    json_resp = await resp.json()
+            json_resp = await HttpClient().fetch_json(cls.Endpoint, ssl=ssl)
             return BoredIdea(json_resp)
         except aiohttp.ClientConnectorCertificateError as e:
             if not ssl:
@@ -6,11 +6,11 @@ import asyncio
 import aiohttp
 
 from core import ConfigProxy, ConfigType
+from .http import HttpClient
 
 class RESTFacts():
     _key = (ConfigProxy(ConfigType.YAML)).api_ninjas.SECRET
     _base_url = "https://api.api-ninjas.com/v1/"
-    _session = None
 
     @classmethod
     async def fetch_facts(cls, amount: int = 30) -> List[Dict[str, str]]:
@@ -28,13 +28,6 @@ class RESTFacts():
 
 
 
-    @classmethod
-    def session(cls) -> aiohttp.ClientSession:
-        """Get AioHTTP session by creating it if it doesn't already exist"""
-        if not cls._session or cls._session.closed:
-            cls._session = aiohttp.ClientSession()
-        return cls._session
-
     @classmethod
     async def _make_request(
         cls,
@@ -48,12 +41,10 @@ class RESTFacts():
         if optional_query:
             query = f"?{urlencode(optional_query)}"
         url = f"{cls._base_url}/{endpoint}{value or ''}{query or ''}"
-        async with cls.session().get(url, headers=cls.headers()) as resp:
-            json = await resp.json(encoding="utf-8")
-        await cls._session.close()
+        resp = await HttpClient().fetch(url, headers=cls.headers())
         if not resp.ok:
             raise RuntimeError(f"{url} returned status code {resp.status}")
-        return json
+        return resp.json()
 
     @classmethod
     def headers(cls) -> Dict[str, str]:
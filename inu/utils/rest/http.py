@@ -0,0 +1,553 @@
+import asyncio
+import hashlib
+import os
+import pickle
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from typing import *
+from urllib.parse import urlsplit
+import json
+
+import aiohttp
+from cachetools import LRUCache
+from multidict import CIMultiDict
+
+from core import getLogger, Singleton, ConfigProxy, ConfigType
+
+log = getLogger(__name__)
+
+__all__: Final[List[str]] = ["HttpClient", "HttpResponse", "HostMetrics", "CachePolicy", "ResponseCache"]
+
+
+@dataclass(frozen=True)
+class HttpResponse:
+    """A fully read response, which can be shared between coalesced requests"""
+    url: str
+    status: int
+    reason: Optional[str]
+    headers: CIMultiDict[str]
+    body: bytes
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding)
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+@dataclass
+class HostMetrics:
+    requests: int = 0
+    errors: int = 0
+    coalesced: int = 0
+    cache_hits: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    def record(self, latency: float, status: Optional[int]) -> None:
+        self.requests += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        if status is None:
+            self.errors += 1
+        else:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+
+class TokenBucket:
+    """Allows <rate> requests per second with bursts up to <capacity>"""
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    How long responses of an endpoint are cached
+
+    Args:
+    -----
+    ttl : float
+        seconds a response is fresh and returned without a request
+    stale_while_revalidate : float
+        seconds after <ttl>, in which the stale response is returned
+        and revalidated in the background
+    """
+    ttl: float
+    stale_while_revalidate: float = 0
+
+
+@dataclass
+class CacheEntry:
+    response: HttpResponse
+    stored_at: float
+    policy: CachePolicy
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.age < self.policy.ttl
+
+    @property
+    def is_usable(self) -> bool:
+        """whether the entry can be returned while it's revalidated"""
+        return self.age < self.policy.ttl + self.policy.stale_while_revalidate
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if (etag := self.response.headers.get("ETag")):
+            headers["If-None-Match"] = etag
+        if (last_modified := self.response.headers.get("Last-Modified")):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.response.url,
+            "status": self.response.status,
+            "reason": self.response.reason,
+            "headers": list(self.response.headers.items()),
+            "body": self.response.body,
+            "stored_at": self.stored_at,
+            "ttl": self.policy.ttl,
+            "stale_while_revalidate": self.policy.stale_while_revalidate,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "CacheEntry":
+        return cls(
+            response=HttpResponse(
+                url=d["url"],
+                status=d["status"],
+                reason=d["reason"],
+                headers=CIMultiDict(d["headers"]),
+                body=d["body"],
+            ),
+            stored_at=d["stored_at"],
+            policy=CachePolicy(d["ttl"], d["stale_while_revalidate"]),
+        )
+
+
+class ResponseCache:
+    """
+    Cache for responses of GET requests.
+
+    Entries are kept in a LRU which is limited by the size of the bodies in bytes.
+    Optionally they are also stored in <directory>, which survives restarts.
+    The key is the sha256 of url, params and headers, hence API keys are not part of file names.
+    The modification time of a file is the time its entry expires. Expired files are removed
+    every `CLEAN_INTERVAL` seconds and when they are read; the directory is limited to
+    <max_disk_size> bytes, the entries which expire first are removed first.
+    Disk I/O runs in a thread.
+    """
+    CLEAN_INTERVAL = 60 * 60
+
+    def __init__(self, max_size: int, directory: str | None = None, max_disk_size: int = 256 * 1024**2) -> None:
+        self._cache: LRUCache[str, CacheEntry] = LRUCache(
+            maxsize=max_size, 
+            getsizeof=lambda entry: len(entry.response.body) or 1
+        )
+        self.directory = directory
+        self.max_disk_size = max_disk_size
+        self.hits: int = 0
+        self.stale_hits: int = 0
+        self.revalidated: int = 0
+        self.misses: int = 0
+        # size of <directory>; None until it was measured
+        self._disk_size: int | None = None
+        self._cleaned_at: float = 0.0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ResponseCache hits={self.hits} stale_hits={self.stale_hits} revalidated={self.revalidated} "
+            f"misses={self.misses} entries={len(self._cache)} size={self._cache.currsize}/{self._cache.maxsize}>"
+        )
+
+    @staticmethod
+    def key(url: str, params: Optional[Mapping[str, Any]], headers: Optional[Mapping[str, str]]) -> str:
+        raw = repr((url, sorted((params or {}).items()), sorted((headers or {}).items())))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pickle")  # type: ignore
+
+    async def get(self, key: str) -> CacheEntry | None:
+        if (entry := self._cache.get(key)) is not None:
+            return entry
+        if not self.directory:
+            return None
+        try:
+            entry = await asyncio.to_thread(self._read, key)
+        except Exception:
+            log.warning(f"can't load cached response {key} from disk", exc_info=True)
+            return None
+        if entry is not None:
+            self._put_memory(key, entry)
+        return entry
+
+    async def put(self, key: str, entry: CacheEntry) -> None:
+        self._put_memory(key, entry)
+        if not self.directory:
+            return
+        try:
+            await asyncio.to_thread(self._write, key, entry)
+        except OSError:
+            log.warning(f"can't store cached response {key} on disk", exc_info=True)
+
+    def _read(self, key: str) -> CacheEntry | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = CacheEntry.from_dict(pickle.load(f))
+        except FileNotFoundError:
+            return None
+        if not entry.is_usable:
+            self._remove(path)
+            return None
+        return entry
+
+    def _write(self, key: str, entry: CacheEntry) -> None:
+        path = self._path(key)
+        with open(path, "wb") as f:
+            pickle.dump(entry.to_dict(), f)
+        expires_at = entry.stored_at + entry.policy.ttl + entry.policy.stale_while_revalidate
+        os.utime(path, (expires_at, expires_at))
+        if self._disk_size is None or time.time() - self._cleaned_at > self.CLEAN_INTERVAL:
+            self._clean()
+        else:
+            # an overwritten file is counted twice until the next clean
+            self._disk_size += os.path.getsize(path)
+            if self._disk_size > self.max_disk_size:
+                self._clean()
+
+    def _clean(self) -> None:
+        """
+        removes expired files, and the files which expire first until <directory>
+        is smaller than 90% of `max_disk_size`
+        """
+        now = time.time()
+        files: List[Tuple[float, int, str]] = []
+        for dir_entry in os.scandir(self.directory):
+            if dir_entry.is_file() and dir_entry.name.endswith(".pickle"):
+                stat = dir_entry.stat()
+                files.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        size = sum(file_size for _, file_size, _ in files)
+        for expires_at, file_size, path in sorted(files):
+            if expires_at > now and size <= self.max_disk_size * 0.9:
+                break
+            self._remove(path)
+            size -= file_size
+        self._disk_size = size
+        self._cleaned_at = now
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _put_memory(self, key: str, entry: CacheEntry) -> None:
+        try:
+            self._cache[key] = entry
+        except ValueError:
+            # response is bigger than the whole cache
+            pass
+
+
+class HttpClient(metaclass=Singleton):
+    """
+    The HTTP client of the bot, used by the REST wrappers.
+
+    - one `aiohttp.ClientSession` with keep-alive connections and a DNS cache
+    - concurrency limit per host and optional token bucket per host (`HOST_RATE_LIMITS`)
+    - identical GET requests which are in flight at the same time are sent only once
+      (except `NOT_COALESCED` endpoints)
+    - latency and status metrics per host (`metrics`)
+    - GET responses of endpoints in `CACHE_POLICIES` are cached (`response_cache`)
+      and revalidated with `If-None-Match`/`If-Modified-Since`
+
+    Config (section `http`):
+    -----------------------
+        - cache_size: size of the response cache in bytes
+        - cache_dir: directory where cached responses are stored; disabled if not set
+        - cache_dir_size: size of <cache_dir> in bytes
+    """
+    MAX_CONNECTIONS = 100
+    MAX_PER_HOST = 10
+    DNS_CACHE_TTL = 300
+    TIMEOUT = aiohttp.ClientTimeout(total=30)
+    # host -> (requests per second, burst)
+    HOST_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+        "api.github.com": (1, 5),
+        "mashape-community-urban-dictionary.p.rapidapi.com": (5, 5),
+        "numbersapi.com": (2, 2),
+        "api.myanimelist.net": (3, 3),
+    }
+    # url prefix -> policy; the longest matching prefix is used
+    CACHE_POLICIES: Dict[str, CachePolicy] = {
+        "https://xkcd.com/": CachePolicy(ttl=30 * 24 * 60 * 60),
+        "https://xkcd.com/info.0.json": CachePolicy(ttl=60 * 60, stale_while_revalidate=24 * 60 * 60),
+        "https://mashape-community-urban-dictionary.p.rapidapi.com/": CachePolicy(
+            ttl=24 * 60 * 60, stale_while_revalidate=7 * 24 * 60 * 60
+        ),
+        "https://api.github.com/": CachePolicy(ttl=10 * 60, stale_while_revalidate=24 * 60 * 60),
+        "https://api.myanimelist.net/": CachePolicy(ttl=60 * 60, stale_while_revalidate=24 * 60 * 60),
+    }
+    # url prefixes of endpoints, where every request needs its own response (e.g. random results)
+    NOT_COALESCED: Tuple[str, ...] = (
+        "https://bored-api.appbrewery.com/random",
+    )
+
+    def __init__(self) -> None:
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {
+            host: TokenBucket(rate, burst) for host, (rate, burst) in self.HOST_RATE_LIMITS.items()
+        }
+        self._in_flight: Dict[Hashable, asyncio.Future[HttpResponse]] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.metrics: Dict[str, HostMetrics] = {}
+        try:
+            options = ConfigProxy(ConfigType.YAML).http.options
+        except AttributeError:
+            # config without `http` section
+            options = {}
+        self.response_cache = ResponseCache(
+            max_size=int(options.get("cache_size", 64 * 1024**2)),
+            directory=options.get("cache_dir") or None,
+            max_disk_size=int(options.get("cache_dir_size", 256 * 1024**2)),
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """the shared session. Don't close it"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.MAX_CONNECTIONS,
+                limit_per_host=self.MAX_PER_HOST,
+                ttl_dns_cache=self.DNS_CACHE_TTL,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.TIMEOUT)
+        return self._session
+
+    async def close(self) -> None:
+        for task in self._background:
+            task.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def _metrics_for(self, host: str) -> HostMetrics:
+        if (metrics := self.metrics.get(host)) is None:
+            metrics = self.metrics[host] = HostMetrics()
+        return metrics
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Sends a request with the limits of the host of <url>.
+        <kwargs> are passed to `aiohttp.ClientSession.request`
+
+        Example:
+        --------
+        ```py
+        async with HttpClient().request("GET", url) as resp:
+            data = await resp.json()
+        ```
+        """
+        host = urlsplit(url).hostname or ""
+        if (bucket := self._buckets.get(host)):
+            await bucket.acquire()
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.MAX_PER_HOST))
+        metrics = self._metrics_for(host)
+        async with slots:
+            start = time.perf_counter()
+            status: Optional[int] = None
+            try:
+                async with self.session.request(method, url, **kwargs) as resp:
+                    status = resp.status
+                    yield resp
+            finally:
+                metrics.record(time.perf_counter() - start, status)
+
+    def cache_policy(self, url: str) -> CachePolicy | None:
+        """the policy of the longest prefix in `CACHE_POLICIES` matching <url>"""
+        matches = [prefix for prefix in self.CACHE_POLICIES if url.startswith(prefix)]
+        if not matches:
+            return None
+        return self.CACHE_POLICIES[max(matches, key=len)]
+
+    async def fetch(
+        self, 
+        url: str, 
+        method: str = "GET", 
+        cache: CachePolicy | None = None, 
+        **kwargs: Any
+    ) -> HttpResponse:
+        """
+        Sends a request and reads the whole response.
+        <kwargs> are passed to `aiohttp.ClientSession.request`
+
+        Args:
+        -----
+        cache : CachePolicy | None
+            overrides the policy from `CACHE_POLICIES` for this request
+
+        Note:
+        -----
+            - GET requests with the same url and kwargs, which are in flight at
+              the same time, share one request; except urls in `NOT_COALESCED`
+            - GET requests with a cache policy are answered from `response_cache` when possible
+        """
+        if (
+            method != "GET" or "data" in kwargs or "json" in kwargs
+            or url.startswith(self.NOT_COALESCED)
+        ):
+            return await self._fetch(method, url, **kwargs)
+        key = ResponseCache.key(url, kwargs.get("params"), kwargs.get("headers"))
+        flight_key = self._flight_key(key, kwargs)
+        policy = cache or self.cache_policy(url)
+        if policy is None:
+            return await self._single_flight(flight_key, url, lambda: self._fetch(method, url, **kwargs))
+
+        entry = await self.response_cache.get(key)
+        if entry is not None and entry.is_fresh:
+            self.response_cache.hits += 1
+            self._metrics_for(urlsplit(url).hostname or "").cache_hits += 1
+            return entry.response
+        if entry is not None and entry.is_usable:
+            self.response_cache.stale_hits += 1
+            self._metrics_for(urlsplit(url).hostname or "").cache_hits += 1
+            if flight_key not in self._in_flight:
+                task = asyncio.create_task(
+                    self._revalidate_in_background(key, flight_key, url, policy, entry, kwargs)
+                )
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return entry.response
+        return await self._single_flight(flight_key, url, lambda: self._revalidate(key, url, policy, entry, kwargs))
+
+    @staticmethod
+    def _flight_key(key: str, kwargs: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        <key> of the response cache with the remaining request options (e.g. `ssl`, `timeout`),
+        since requests with other options can have another result
+        """
+        options = sorted((name, value) for name, value in kwargs.items() if name not in ("params", "headers"))
+        return key, repr(options)
+
+    async def _single_flight(
+        self, 
+        key: Hashable, 
+        url: str, 
+        factory: Callable[[], Awaitable[HttpResponse]]
+    ) -> HttpResponse:
+        if (future := self._in_flight.get(key)) is not None:
+            self._metrics_for(urlsplit(url).hostname or "").coalesced += 1
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await factory()
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # the exception is raised here; waiters get it from the future
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _revalidate(
+        self, 
+        key: str, 
+        url: str, 
+        policy: CachePolicy, 
+        entry: CacheEntry | None, 
+        kwargs: Dict[str, Any],
+    ) -> HttpResponse:
+        """
+        fetches <url>; with <entry> as a conditional request.
+        If the request fails while <entry> is usable, <entry> is returned and kept
+        """
+        if entry is not None:
+            kwargs = {**kwargs, "headers": {**(kwargs.get("headers") or {}), **entry.conditional_headers()}}
+        try:
+            response = await self._fetch("GET", url, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if entry is None or not entry.is_usable:
+                raise
+            log.warning(f"revalidating {url} failed - using stale response", exc_info=True)
+            return entry.response
+        if response.status >= 500 and entry is not None and entry.is_usable:
+            log.warning(f"revalidating {url} failed with {response.status} - using stale response")
+            return entry.response
+        if response.status == 304 and entry is not None:
+            self.response_cache.revalidated += 1
+            await self.response_cache.put(key, replace(entry, stored_at=time.time(), policy=policy))
+            return entry.response
+        self.response_cache.misses += 1
+        if response.status == 200:
+            await self.response_cache.put(key, CacheEntry(response, time.time(), policy))
+        return response
+
+    async def _revalidate_in_background(
+        self, 
+        key: str, 
+        flight_key: Hashable,
+        url: str, 
+        policy: CachePolicy, 
+        entry: CacheEntry, 
+        kwargs: Dict[str, Any],
+    ) -> None:
+        try:
+            await self._single_flight(flight_key, url, lambda: self._revalidate(key, url, policy, entry, kwargs))
+        except Exception:
+            log.warning(f"revalidating {url} failed", exc_info=True)
+
+    async def _fetch(self, method: str, url: str, **kwargs: Any) -> HttpResponse:
+        async with self.request(method, url, **kwargs) as resp:
+            return HttpResponse(
+                url=str(resp.url),
+                status=resp.status,
+                reason=resp.reason,
+                headers=CIMultiDict(resp.headers),
+                body=await resp.read(),
+            )
+
+    async def fetch_json(self, url: str, method: str = "GET", **kwargs: Any) -> Any:
+        return (await self.fetch(url, method, **kwargs)).json()
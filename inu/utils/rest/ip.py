@@ -4,6 +4,7 @@ import traceback
 import aiohttp
 
 from core import getLogger
+from .http import HttpClient
 
 
 log = getLogger(__name__)
@@ -14,10 +15,12 @@ class IP:
     async def fetch_public_ip(cls, ssl: bool = True, timeout: int = 4) -> str:
         """Returns the public IP"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get("https://api.ipify.org?format=json", ssl=ssl, timeout=timeout) as resp:
-                    data = await resp.json()
-                    return data["ip"]
+            data = await HttpClient().fetch_json(
+                "https://api.ipify.org?format=json", 
+                ssl=ssl, 
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            )
+            return data["ip"]
         except Exception:
             if ssl:
                 return await cls.fetch_public_ip(ssl=False, timeout=2)
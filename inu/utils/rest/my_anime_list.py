@@ -15,9 +15,9 @@ import aiohttp
 import dotenv
 import asyncio
 from fuzzywuzzy import fuzz
-from expiring_dict import ExpiringDict
 
 from core import getLogger, stopwatch
+from .http import HttpClient
 
 log = getLogger(__name__)
 
@@ -39,8 +39,6 @@ class MALTypes(Enum):
 class MyAnimeListAIOClient:
     """Wrapper for MyAnimeList API Endpoint"""
     client_id: str = ""
-    TTL = 60*60
-    response_cache = ExpiringDict(ttl=TTL)
 
 
     def __init__(
@@ -56,20 +54,12 @@ class MyAnimeListAIOClient:
                 "Client id has to be passed into the constructor or in the .env file under key `ID`. Consider calling `set_credentails`"
             )
         self._base_url = r"https://api.myanimelist.net/v2"
-        self._session = None
 
     @classmethod
     def set_credentials(cls, client_id: str):
         """"set the client id"""
         cls.client_id = client_id
 
-    @property
-    def session(self) -> aiohttp.ClientSession:
-        """Get AioHTTP session by creating it if it doesn't already exist"""
-        if not self._session or self._session.closed:
-            self._session = aiohttp.ClientSession()
-        return self._session
-
     async def _make_request(
         self,
         endpoint: str,
@@ -82,9 +72,8 @@ class MyAnimeListAIOClient:
         if optional_query:
             query = f"?{urlencode(optional_query)}"
         url = f"{self._base_url}/{endpoint}{value or ''}{query or ''}"
-        async with self.session.get(url, headers=self.headers) as resp:
-            json = await resp.json(encoding="utf-8")
-        await self._session.close()
+        resp = await HttpClient().fetch(url, headers=self.headers)
+        json = resp.json()
         self.log.debug(f"request: {url}")
         self.log.debug(f"response: {pf(json)}")
         if not resp.ok:
@@ -144,11 +133,7 @@ class MyAnimeListAIOClient:
         Dict[str, Any]
             the response json
         """
-        try:
-            resp = self.response_cache[query]
-            return deepcopy(resp)
-        except KeyError:
-            pass
+        # responses are cached by `HttpClient`
         fields = (
             "id,title,main_picture,alternative_titles,"
             "start_date,end_date,synopsis,mean,rank,popularity,"
@@ -179,8 +164,7 @@ class MyAnimeListAIOClient:
                 log.warning(f"fallback search for title {query}")
                 return await self.search_anime(query[:50], include_nsfw, True)
         log.info(f"fetched {len(resp['data'])} anime in {(datetime.now() - a).total_seconds():.2f}s")
-        self.response_cache.ttl(query, deepcopy(resp), self.TTL)
-        return deepcopy(resp)
+        return resp
 
 
 
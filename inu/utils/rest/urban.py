@@ -8,6 +8,7 @@ from pprint import *
 from collections.abc import Iterable
 
 from core import Inu, BotResponseError, getLogger
+from .http import HttpClient
 log = getLogger(__name__)
 
 class UrbanIterator(Iterable):
@@ -77,10 +78,7 @@ class Urban:
             'x-rapidapi-key': str(cls.bot.conf.rapid.SECRET)
             }
 
-        r = None
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=querystring) as resp:
-                r = await resp.json(encoding="utf-8")
+        r = await HttpClient().fetch_json(url, headers=headers, params=querystring)
         if not r:
             raise RuntimeError(f"no response received from {headers['x-rapidapi-host']}")
         if not r['list']:
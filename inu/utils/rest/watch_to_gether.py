@@ -7,10 +7,10 @@ import json
 
 import asyncio
 import aiohttp
-from matplotlib.pyplot import get
 
 from core import Table, Inu, ConfigProxy, getLogger
 from utils import Colors
+from .http import HttpClient
 
 log = getLogger(__name__)   
 
@@ -50,13 +50,11 @@ class Watch2Gether:
             the response. Dict contains key "streamkey" which is an id for the room.
             - room-link key will be added in method which is the direct link the the room
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{cls._conf.w2g.api_url}/rooms/create.json", 
-                data=json.dumps(cls._make_body(link)), 
-                headers=cls._headers
-            ) as resp:
-                ## log.debug(f"w2g resp: {await resp.json()}")
-                resp_json = await resp.json()
-                resp_json["room-link"] = f"https://w2g.tv/rooms/{resp_json['streamkey']}"  # uses still the old link
-                return resp_json
\ No newline at end of file
+        resp_json = await HttpClient().fetch_json(
+            f"{cls._conf.w2g.api_url}/rooms/create.json", 
+            method="POST",
+            data=json.dumps(cls._make_body(link)), 
+            headers=cls._headers
+        )
+        resp_json["room-link"] = f"https://w2g.tv/rooms/{resp_json['streamkey']}"  # uses still the old link
+        return resp_json
\ No newline at end of file
@@ -20,6 +20,7 @@ class xkcdComicDict(TypedDict):
     explanation_url: str
 
 from utils import Colors
+from .http import HttpClient
 
 class xkcdAPI:
     BaseEndpoint = "https://xkcd.com/"
@@ -47,16 +48,15 @@ class xkcdAPI:
         """
         json_resp = None
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(comic_url) as resp:
-                    if resp.status >= 400:
-                        return None
-                    json_resp = await resp.json()
-                    if not json_resp.get("link"):
-                        if json_resp.get("num"):
-                            json_resp["link"] = cls.BaseEndpoint + str(json_resp["num"])
-                    if (num := json_resp.get("num")):
-                        json_resp["explanation_url"] = f"https://www.explainxkcd.com/wiki/index.php/{num}"
-                    return json_resp
+            resp = await HttpClient().fetch(comic_url)
+            if resp.status >= 400:
+                return None
+            json_resp = resp.json()
+            if not json_resp.get("link"):
+                if json_resp.get("num"):
+                    json_resp["link"] = cls.BaseEndpoint + str(json_resp["num"])
+            if (num := json_resp.get("num")):
+                json_resp["explanation_url"] = f"https://www.explainxkcd.com/wiki/index.php/{num}"
+            return json_resp
         except aiohttp.ClientConnectorCertificateError as e:
                 raise e
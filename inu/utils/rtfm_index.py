@@ -0,0 +1,95 @@
+from typing import (
+    Dict,
+    List,
+    Mapping,
+    Set,
+    Tuple,
+)
+from bisect import bisect_left
+from collections import Counter
+import heapq
+import re
+
+__all__ = ["InventoryIndex"]
+
+_PART_SEPARATORS = re.compile(r"[^0-9a-zA-Z]+")
+
+
+def _raw_trigrams(text: str) -> Set[str]:
+    return {text[i:i+3] for i in range(len(text) - 2)}
+
+
+def _parts(name: str) -> Set[str]:
+    """lowercased parts of a dotted name, e.g. `std:label:asyncio.Task` -> std, label, asyncio, task"""
+    return {part for part in _PART_SEPARATORS.split(name.lower()) if part}
+
+
+class InventoryIndex:
+    """
+    Index of the object names of one Sphinx inventory, used by `/rtfm`.
+
+    - trigram index over the raw names: narrows down names containing a query
+    - trigram index over the lowercased names: names which are similar to a query
+    - sorted prefix table over the parts of the dotted names: names with a part
+      starting with a word of the query
+
+    Only the few candidates returned here need to be scored with `fuzzywuzzy`.
+    """
+    def __init__(self, objects: Mapping[str, str]) -> None:
+        self.names: List[str] = list(objects)
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._lower_trigrams: Dict[str, Set[int]] = {}
+        parts: Set[Tuple[str, int]] = set()
+        for i, name in enumerate(self.names):
+            for trigram in _raw_trigrams(name):
+                self._trigrams.setdefault(trigram, set()).add(i)
+            for trigram in _raw_trigrams(name.lower()):
+                self._lower_trigrams.setdefault(trigram, set()).add(i)
+            parts.update((part, i) for part in _parts(name))
+        self._parts: List[Tuple[str, int]] = sorted(parts)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def containing(self, text: str, limit: int) -> List[str]:
+        """
+        Returns:
+        --------
+            - (List[str]) up to <limit> names containing <text>; the shortest ones, if there are more
+        """
+        if len(text) < 3:
+            matches = [i for i, name in enumerate(self.names) if text in name]
+        else:
+            trigram_sets = sorted((self._trigrams.get(t, set()) for t in _raw_trigrams(text)), key=len)
+            candidates = set(trigram_sets[0])
+            for trigram_set in trigram_sets[1:]:
+                if not candidates:
+                    break
+                candidates &= trigram_set
+            matches = [i for i in candidates if text in self.names[i]]
+        if len(matches) > limit:
+            matches = heapq.nsmallest(limit, matches, key=lambda i: (len(self.names[i]), i))
+        return [self.names[i] for i in sorted(matches)]
+
+    def starting_with(self, prefix: str) -> Set[int]:
+        """indices of names with a part starting with <prefix>"""
+        result: Set[int] = set()
+        for part, i in self._parts[bisect_left(self._parts, (prefix, -1)):]:
+            if not part.startswith(prefix):
+                break
+            result.add(i)
+        return result
+
+    def similar(self, text: str, limit: int) -> List[str]:
+        """
+        Returns:
+        --------
+            - (List[str]) up to <limit> names which share the most trigrams or name parts with <text>
+        """
+        counts: Counter[int] = Counter()
+        for trigram in _raw_trigrams(text.lower()):
+            counts.update(self._lower_trigrams.get(trigram, ()))
+        for word in _parts(text):
+            # a matching part weighs as much as its trigrams
+            counts.update({i: max(len(word) - 2, 1) for i in self.starting_with(word)})
+        return [self.names[i] for i, _ in counts.most_common(limit)]
@@ -97,10 +97,11 @@ async def check_website(url: str) -> Tuple[int, Optional[str]]:
     Tuple[int, Optional[str]]
         the status code and an optional error message
     """
+    # utils.rest needs utils to be initialized
+    from utils.rest.http import HttpClient
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                return response.status, response.reason
+        async with HttpClient().request("GET", url) as response:
+            return response.status, response.reason
     except aiohttp.ClientError as e:
         return 0, str(e)
     
@@ -0,0 +1,10 @@
+"""
+The bot is started with `python inu/main.py` from the repository root,
+hence `inu/` is the import root (`core`, `utils`, `ext`) and `config.yaml` is read from the cwd.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "inu"))
+os.chdir(ROOT)
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import *
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from core import Singleton
+from utils.rest.http import HttpClient, CachePolicy, ResponseCache
+
+
+class StandIn:
+    """local stand-in for the external APIs; counts the requests it answered"""
+    def __init__(self) -> None:
+        self.requests: Dict[str, int] = {}
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self.fail = False
+        self.app = web.Application()
+        self.app.router.add_get("/slow", self.slow)
+        self.app.router.add_get("/random", self.random)
+        self.app.router.add_get("/etag", self.etag)
+
+    def count(self, request: web.Request) -> int:
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+        return self.requests[request.path]
+
+    async def slow(self, request: web.Request) -> web.Response:
+        number = self.count(request)
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        await asyncio.sleep(0.1)
+        self.concurrent -= 1
+        return web.json_response({"number": number})
+
+    async def random(self, request: web.Request) -> web.Response:
+        number = self.count(request)
+        await asyncio.sleep(0.05)
+        return web.json_response({"number": number})
+
+    async def etag(self, request: web.Request) -> web.Response:
+        self.count(request)
+        if self.fail:
+            return web.Response(status=503)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(body=b"v1", headers={"ETag": '"v1"'})
+
+
+def run(test: Callable[[HttpClient, StandIn, str], Awaitable[None]]) -> None:
+    async def main() -> None:
+        Singleton._instances.pop(HttpClient, None)
+        client = HttpClient()
+        client.response_cache = ResponseCache(max_size=1024**2)
+        stand_in = StandIn()
+        server = TestServer(stand_in.app)
+        await server.start_server()
+        try:
+            await test(client, stand_in, str(server.make_url("")))
+        finally:
+            await client.close()
+            await server.close()
+            Singleton._instances.pop(HttpClient, None)
+    asyncio.run(main())
+
+
+def test_identical_requests_are_coalesced():
+    async def test(client: HttpClient, stand_in: StandIn, base: str):
+        results = await asyncio.gather(*[client.fetch_json(f"{base}/slow") for _ in range(10)])
+        assert stand_in.requests["/slow"] == 1
+        assert all(result == {"number": 1} for result in results)
+        assert client.metrics["127.0.0.1"].coalesced == 9
+    run(test)
+
+
+def test_requests_with_other_options_are_not_coalesced():
+    async def test(client: HttpClient, stand_in: StandIn, base: str):
+        await asyncio.gather(
+            client.fetch(f"{base}/slow"),
+            client.fetch(f"{base}/slow", ssl=False),
+            client.fetch(f"{base}/slow", params={"page": 2}),
+        )
+        assert stand_in.requests["/slow"] == 3
+    run(test)
+
+
+def test_not_coalesced_endpoints():
+    async def test(client: HttpClient, stand_in: StandIn, base: str):
+        client.NOT_COALESCED = (f"{base}/random",)
+        results = await asyncio.gather(*[client.fetch_json(f"{base}/random") for _ in range(5)])
+        assert stand_in.requests["/random"] == 5
+        assert sorted(result["number"] for result in results) == [1, 2, 3, 4, 5]
+    run(test)
+
+
+def test_concurrency_limit_per_host():
+    async def test(client: HttpClient, stand_in: StandIn, base: str):
+        client.MAX_PER_HOST = 2
+        start = time.perf_counter()
+        await asyncio.gather(*[client.fetch(f"{base}/slow", params={"i": i}) for i in range(6)])
+        assert stand_in.max_concurrent == 2
+        # 3 rounds of 0.1 s
+        assert time.perf_counter() - start >= 0.3
+    run(test)
+
+
+def test_cached_response_is_revalidated_with_etag():
+    async def test(client: HttpClient, stand_in: StandIn, base: str):
+        policy = CachePolicy(ttl=0, stale_while_revalidate=0)
+        first = await client.fetch(f"{base}/etag", cache=policy)
+        second = await client.fetch(f"{base}/etag", cache=policy)
+        assert stand_in.requests["/etag"] == 2
+        assert first.body == second.body == b"v1"
+        assert client.response_cache.revalidated == 1
+    run(test)
+
+
+def test_failed_revalidation_returns_stale_response():
+    async def test(client: HttpClient, stand_in: StandIn, base: str):
+        policy = CachePolicy(ttl=0, stale_while_revalidate=60)
+        await client.fetch(f"{base}/etag", cache=policy)
+        stand_in.fail = True
+        response = await client.fetch(f"{base}/etag", cache=policy)
+        # wait for the revalidation in the background
+        await asyncio.gather(*client._background)
+        assert stand_in.requests["/etag"] == 2
+        assert response.status == 200 and response.body == b"v1"
+    run(test)
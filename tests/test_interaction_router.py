@@ -0,0 +1,63 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core import Singleton
+from utils.paginators.base.router import InteractionRouter
+
+
+class FakeBot:
+    def subscribe(self, event, callback):
+        pass
+
+
+@pytest.fixture
+def router():
+    Singleton._instances.pop(InteractionRouter, None)
+    yield InteractionRouter(FakeBot())
+    Singleton._instances.pop(InteractionRouter, None)
+
+
+def interaction(message_id: int) -> SimpleNamespace:
+    return SimpleNamespace(message=SimpleNamespace(id=message_id), custom_id="next")
+
+
+def test_route_by_message_id(router):
+    queue = asyncio.Queue()
+    router.register(queue, 1)
+    assert router.route(interaction(1)) == [queue]
+    assert router.route(interaction(2)) == []
+
+
+def test_unregister_keeps_other_owner_of_message(router):
+    old, new = asyncio.Queue(), asyncio.Queue()
+    router.register(old, 1)
+    # e.g. a rebuilt stateless paginator on the same message
+    router.register(new, 1)
+    router.unregister(old, 1)
+    assert router.route(interaction(1)) == [new]
+    router.unregister(old, 1)
+    assert router.route(interaction(1)) == [new]
+    router.unregister(new, 1)
+    assert router.size == 0
+
+
+def test_dispatch_latency_is_flat(router):
+    """routing a click takes about the same time with 10 and with 10,000 open paginators"""
+    clicks = 20_000
+    latencies = {}
+    registered = 0
+    for open_paginators in (10, 100, 1_000, 10_000):
+        for message_id in range(registered, open_paginators):
+            router.register(asyncio.Queue(), message_id)
+        registered = open_paginators
+        targets = [interaction(i % open_paginators) for i in range(clicks)]
+        start = time.perf_counter()
+        for target in targets:
+            router.route(target)
+        latencies[open_paginators] = (time.perf_counter() - start) / clicks
+    print("\n" + "\n".join(f"{n:>6} paginators: {t * 1e9:.0f} ns/click" for n, t in latencies.items()))
+    # a scan over all paginators would be ~1000x slower at 10,000 than at 10
+    assert latencies[10_000] < latencies[10] * 5
@@ -0,0 +1,70 @@
+import asyncio
+import gc
+import time
+from types import SimpleNamespace
+
+from ext.commands.music_utils import player as player_module
+from ext.commands.music_utils.player import MusicPlayer
+
+
+class FakeLoader:
+    """stands in for the Lavalink search; every search takes <latency> seconds"""
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def __call__(self, query: str) -> SimpleNamespace:
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.concurrent -= 1
+        return SimpleNamespace(query=query)
+
+
+def make_player(loader: FakeLoader) -> MusicPlayer:
+    player = MusicPlayer.__new__(MusicPlayer)
+    player._load_tracks = loader  # type: ignore
+    return player
+
+
+def test_200_line_playlist_is_loaded_concurrently_in_order():
+    lines = [f"scsearch:song {i}" for i in range(200)]
+    latency = 0.02
+    loader = FakeLoader(latency)
+
+    async def main():
+        start = time.perf_counter()
+        results = [await task for task in make_player(loader)._load_lines(lines)]
+        return results, time.perf_counter() - start
+
+    results, wall_time = asyncio.run(main())
+    sequential = len(lines) * latency
+    print(f"\n200 lines: {wall_time:.2f} s (sequential: {sequential:.2f} s)")
+    assert [result.query for result in results] == lines
+    assert loader.max_concurrent == player_module.TRACK_LOAD_CONCURRENCY
+    assert wall_time < sequential / player_module.TRACK_LOAD_CONCURRENCY * 1.5
+
+
+def test_stop_loading_retrieves_failed_searches():
+    unhandled = []
+
+    async def fail():
+        raise RuntimeError("search failed")
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda _, context: unhandled.append(context))
+        failed = asyncio.create_task(fail())
+        running = asyncio.create_task(asyncio.sleep(10))
+        await asyncio.sleep(0)
+        MusicPlayer._stop_loading([None, failed, running])
+        await asyncio.sleep(0)
+        assert running.cancelled()
+        del failed, running
+        gc.collect()
+
+    asyncio.run(main())
+    assert not unhandled